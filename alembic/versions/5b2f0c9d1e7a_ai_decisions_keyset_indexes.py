@@ -0,0 +1,30 @@
+"""ai_decisions keyset indexes
+
+Revision ID: 5b2f0c9d1e7a
+Revises: c4465bffdfdd
+Create Date: 2026-10-17 04:05:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f0c9d1e7a'
+down_revision: Union[str, Sequence[str], None] = 'c4465bffdfdd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_ai_decisions_event_type_id', 'ai_decisions', ['event_type', 'id'], unique=False)
+    op.create_index('ix_ai_decisions_created_at_id', 'ai_decisions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_decisions_created_at_id', table_name='ai_decisions')
+    op.drop_index('ix_ai_decisions_event_type_id', table_name='ai_decisions')
@@ -5,23 +5,36 @@ import hashlib
 import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from .audit_log import AIAuditLogger, AuditConfig, minimal_observation_for_audit
-from .decision_logic import build_default_rules, evaluate_observation
 from .metrics import AgentMetrics, timer
 from .observation import Observation
 from .recommendations import DecisionResult
+from .triage import build_default_rules, score_observation
+from .triage_columnar import score_batch
+
+# Below this, per-observation scoring beats packing NumPy columns
+VECTORIZE_MIN_BATCH = 32
+
+
+_ID_ENCODER = json.JSONEncoder(sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stable_decision_ids(created_at: datetime, items: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """Decision ids for many (patient_id, payload) pairs; one encoder, one timestamp."""
+    created = created_at.isoformat()
+    encode = _ID_ENCODER.encode
+    return [
+        hashlib.sha256(
+            encode({"patient_id": pid, "created_at": created, "payload": payload}).encode("utf-8")
+        ).hexdigest()[:16]
+        for pid, payload in items
+    ]
 
 
 def _stable_decision_id(patient_id: str, created_at: datetime, payload: Dict[str, Any]) -> str:
-    raw = json.dumps(
-        {"patient_id": patient_id, "created_at": created_at.isoformat(), "payload": payload},
-        sort_keys=True,
-        ensure_ascii=False,
-        separators=(",", ":"),
-    ).encode("utf-8")
-    return hashlib.sha256(raw).hexdigest()[:16]
+    return _stable_decision_ids(created_at, [(patient_id, payload)])[0]
 
 
 @dataclass
@@ -33,74 +46,104 @@ class AgentConfig:
 class RuleBasedAgent:
     """
     Advanced deterministic decision engine wrapper.
-    Public API: agent.decide(Observation) -> DecisionResult
+    Public API:
+      agent.decide(Observation) -> DecisionResult
+      agent.decide_batch([Observation, ...]) -> [DecisionResult, ...]
     """
 
-    def _init_(self, config: Optional[AgentConfig] = None) -> None:
+    def __init__(self, config: Optional[AgentConfig] = None) -> None:
         self.config = config or AgentConfig()
         self.audit = AIAuditLogger(self.config.audit)
         self.metrics = AgentMetrics()
         self._rules = build_default_rules()
 
     def decide(self, obs: Observation) -> DecisionResult:
-        t = timer()
-        created_at = datetime.now(timezone.utc)
+        return self.decide_batch([obs])[0]
 
-        score, priority, triggered_rules, reasons, recs, warnings = evaluate_observation(
-            obs=obs,
-            rules=self._rules,
-        )
+    def decide_batch(self, observations: Sequence[Observation]) -> List[DecisionResult]:
+        """
+        Evaluate many observations in one pass.
 
-        payload = {
-            "priority": priority,
-            "score": score,
-            "triggered_rules": triggered_rules,
-            "reasons": reasons,
-            "warnings": warnings,
-            "recommendations": [r.model_dump() for r in recs],
-            "version": self.config.version,
-        }
-        decision_id = _stable_decision_id(obs.patient_id, created_at, payload)
-
-        result = DecisionResult(
-            decision_id=decision_id,
-            patient_id=obs.patient_id,
-            created_at=created_at,
-            priority=priority,
-            score=score,
-            recommendations=recs,
-            reasons=reasons,
-            warnings=warnings,
-            triggered_rules=triggered_rules,
-            version=self.config.version,
-            meta={"engine": "rule_based"},
-        )
+        - One timestamp, one decision-id pass and ONE audit write for the batch
+        - Recommendations are dumped once and shared by payload and audit event
+        - Each decision is recorded with the batch's mean latency
+        """
+        if not observations:
+            return []
 
-        latency_ms = t.ms()
-        self.metrics.observe(priority, latency_ms)
+        t = timer()
+        created_at = datetime.now(timezone.utc)
+        version = self.config.version
+
+        if len(observations) >= VECTORIZE_MIN_BATCH:
+            scored = score_batch(observations, self._rules)
+        else:
+            scored = [score_observation(obs, self._rules) for obs in observations]
+
+        payloads = []
+        for score, priority, triggered_rules, reasons, recs, warnings in scored:
+            payloads.append(
+                {
+                    "priority": priority,
+                    "score": score,
+                    "triggered_rules": triggered_rules,
+                    "reasons": reasons,
+                    "warnings": warnings,
+                    "recommendations": [r.model_dump() for r in recs],
+                    "version": version,
+                }
+            )
+        decision_ids = _stable_decision_ids(
+            created_at,
+            [(obs.patient_id, payload) for obs, payload in zip(observations, payloads)],
+        )
 
-        self.audit.safe_write_event(
+        results = [
+            DecisionResult(
+                decision_id=decision_id,
+                patient_id=obs.patient_id,
+                created_at=created_at,
+                priority=priority,
+                score=score,
+                recommendations=recs,
+                reasons=reasons,
+                warnings=warnings,
+                triggered_rules=triggered_rules,
+                version=version,
+                meta={"engine": "rule_based"},
+            )
+            for obs, decision_id, (score, priority, triggered_rules, reasons, recs, warnings)
+            in zip(observations, decision_ids, scored)
+        ]
+
+        latency_ms = t.ms() / len(observations)
+        self.metrics.observe_many((r.priority for r in results), latency_ms)
+
+        created = created_at.isoformat()
+        include_free_text = self.config.audit.include_free_text
+        self.audit.safe_write_events(
             {
                 "type": "decision",
                 "decision_id": decision_id,
                 "patient_id": obs.patient_id,
-                "created_at": created_at.isoformat(),
-                "agent_version": self.config.version,
-                "priority": priority,
-                "score": score,
-                "triggered_rules": triggered_rules,
-                "reasons": reasons,
-                "warnings": warnings,
-                "recommendations": [r.model_dump() for r in recs],
+                "created_at": created,
+                "agent_version": version,
+                "priority": payload["priority"],
+                "score": payload["score"],
+                "triggered_rules": payload["triggered_rules"],
+                "reasons": payload["reasons"],
+                "warnings": payload["warnings"],
+                "recommendations": payload["recommendations"],
                 "latency_ms": round(latency_ms, 2),
                 "observation": minimal_observation_for_audit(
                     obs,
-                    include_free_text=self.config.audit.include_free_text,
+                    include_free_text=include_free_text,
                 ),
             }
+            for obs, decision_id, payload in zip(observations, decision_ids, payloads)
         )
 
-        return result
+        return results
 
 
 # ✅ what routes import: **from backend.ai_agent.agent import ai_agent**
@@ -2,11 +2,17 @@
 from __future__ import annotations
 
 import json
+import os
+import queue
+import threading
+import time
 import traceback
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .audit_segments import AuditSegments
 
 
 @dataclass(frozen=True)
@@ -14,39 +20,295 @@ class AuditConfig:
     log_path: Path = Path("logs") / "ai_decisions.jsonl"
     include_free_text: bool = False  # store symptoms_text in audit log or not
 
+    # Background writer (buffered=False -> append synchronously on each call)
+    buffered: bool = True
+    queue_size: int = 10000  # events held in memory; beyond that new events are dropped
+    put_timeout_s: float = 0.0  # wait this long for queue space before dropping
+    batch_size: int = 500  # events per write()
+    flush_interval_s: float = 0.5  # longest an event waits before it is written
+    fsync_interval_s: float = 5.0  # 0 = fsync after every batch
+
+    # Segments (see audit_segments): rotate on size or UTC day, gzip closed ones
+    rotate_max_bytes: int = 64 * 1024 * 1024
+    rotate_daily: bool = True
+    compress: bool = True
+    block_bytes: int = 256 * 1024  # uncompressed bytes per independently readable gzip block
+
+
+def _print_fallback(error: str) -> None:
+    try:
+        fallback = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "type": "audit_log_error",
+            "error": error,
+            "trace": traceback.format_exc(limit=8),
+        }
+        print(json.dumps(fallback, ensure_ascii=False))
+    except Exception:
+        pass
+
+
+def _to_line(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Bounded queue drained by one daemon thread.
+
+    - Producers never touch the file: submit() is a put_nowait() per event
+      (or waits up to put_timeout_s); a full queue drops and counts events
+    - The thread writes up to batch_size lines per write(), flushes every
+      batch, and fsyncs at most every fsync_interval_s
+    - close() sets a stop flag (no queue slot needed, so it works with a
+      full queue); the thread drains everything, fsyncs and exits
+    """
+
+    def __init__(self, owner: "AIAuditLogger") -> None:
+        self._owner = owner
+        self._config = owner.config
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, self._config.queue_size))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.submitted = 0
+        self.dropped = 0
+        self.waited = 0  # submits that found the queue full (backpressure)
+        self.high_water = 0
+        self.written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="ai-audit-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, payloads: List[Dict[str, Any]]) -> int:
+        """Queue events; returns how many were accepted."""
+        timeout = self._config.put_timeout_s
+        accepted = dropped = waited = 0
+        for payload in payloads:
+            try:
+                self._queue.put_nowait(payload)
+                accepted += 1
+                continue
+            except queue.Full:
+                waited += 1
+            try:
+                if timeout <= 0:
+                    raise queue.Full
+                self._queue.put(payload, timeout=timeout)
+                accepted += 1
+            except queue.Full:
+                dropped += 1
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self.submitted += accepted
+            self.dropped += dropped
+            self.waited += waited
+            self.high_water = max(self.high_water, depth)
+        return accepted
+
+    def flush(self) -> None:
+        """Block until every queued event has been written (and flushed)."""
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0) -> None:
+        if not self._thread.is_alive():
+            return
+        self._stop.set()
+        try:
+            # Wake an idle thread now instead of after flush_interval_s;
+            # with a full queue it is busy anyway and sees the flag
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "backpressure_waits": self.waited,
+                "high_water": self.high_water,
+                "batches": self.batches,
+                "fsyncs": self.fsyncs,
+                "errors": self.errors,
+                "running": self._thread.is_alive(),
+            }
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        cfg = self._config
+        segments = self._owner.segments
+        last_fsync = time.monotonic()
+        dirty = False
+        stop = False
+
+        while not stop:
+            wait = 0 if self._stop.is_set() else cfg.flush_interval_s
+            try:
+                first = self._queue.get(timeout=wait)
+            except queue.Empty:
+                first = None
+
+            batch: List[Any] = [] if first is None else [first]
+            while first is not None and len(batch) < cfg.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            events = [e for e in batch if e is not _STOP]
+            # The flag, not the sentinel, decides: close() may not have found
+            # a free slot for the sentinel, and events queued ahead of it
+            # still have to reach the file
+            stop = self._stop.is_set() and self._queue.empty()
+
+            written = batches = fsyncs = errors = 0
+            try:
+                if events:
+                    lines = []
+                    for event in events:
+                        try:
+                            lines.append(_to_line(event))
+                        except Exception:
+                            errors += 1
+                            _print_fallback("Failed to serialize audit event")
+
+                    segments.append("".join(lines).encode("utf-8"))
+                    dirty = True
+                    written, batches = len(lines), 1
+
+                due = time.monotonic() - last_fsync >= cfg.fsync_interval_s
+                if dirty and (due or stop):
+                    segments.fsync()
+                    fsyncs = 1
+                    last_fsync = time.monotonic()
+                    dirty = False
+            except Exception:
+                errors += 1
+                _print_fallback("Failed to write audit events")
+            finally:
+                # Counted before task_done(): flush() returns with stats current
+                with self._lock:
+                    self.written += written
+                    self.batches += batches
+                    self.fsyncs += fsyncs
+                    self.errors += errors
+                for _ in batch:
+                    self._queue.task_done()
+
 
 class AIAuditLogger:
     """
     Robust JSON Lines logger (one JSON per line).
-    Creates directories automatically. Use safe_write_event() in production paths.
+    Creates directories automatically (on first write). Use safe_write_event()
+    / safe_write_events() in production paths.
+
+    With config.buffered (default) events are handed to a background
+    AuditWriter; call close() on shutdown to write out what is queued.
+    Storage is segmented (rotated, compressed, indexed): see AuditSegments.
     """
-    def _init_(self, config: Optional[AuditConfig] = None) -> None:
+    def __init__(self, config: Optional[AuditConfig] = None) -> None:
         self.config = config or AuditConfig()
         self.log_path = self.config.log_path
-        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.segments = AuditSegments(
+            self.log_path,
+            max_bytes=self.config.rotate_max_bytes,
+            rotate_daily=self.config.rotate_daily,
+            compress=self.config.compress,
+            block_bytes=self.config.block_bytes,
+        )
+        self._writer: Optional[AuditWriter] = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
 
     def write_event(self, event: Dict[str, Any]) -> None:
-        payload = dict(event)
-        payload.setdefault("ts", datetime.now(timezone.utc).isoformat())
-        line = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-        with open(self.log_path, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        self.write_events([event])
+
+    def write_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Append many events: queued when buffered, else one open() and one write()."""
+        ts = datetime.now(timezone.utc).isoformat()
+        payloads = []
+        for event in events:
+            payload = dict(event)
+            payload.setdefault("ts", ts)
+            payloads.append(payload)
+        if not payloads:
+            return
+
+        if self.config.buffered and not self._closed:
+            self._get_writer().submit(payloads)
+            return
+
+        self.segments.append("".join(_to_line(p) for p in payloads).encode("utf-8"))
 
     def safe_write_event(self, event: Dict[str, Any]) -> None:
+        self.safe_write_events([event])
+
+    def safe_write_events(self, events: Iterable[Dict[str, Any]]) -> None:
         try:
-            self.write_event(event)
+            self.write_events(events)
         except Exception:
             # Never break the request flow because audit logging failed
-            try:
-                fallback = {
-                    "ts": datetime.now(timezone.utc).isoformat(),
-                    "type": "audit_log_error",
-                    "error": "Failed to write audit event",
-                    "trace": traceback.format_exc(limit=8),
-                }
-                print(json.dumps(fallback, ensure_ascii=False))
-            except Exception:
-                pass
+            _print_fallback("Failed to write audit event")
+
+    # ------------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------------
+    def _get_writer(self) -> AuditWriter:
+        writer = self._writer
+        if writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = AuditWriter(self)
+                writer = self._writer
+        return writer
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Drain and stop the writer; later events are written synchronously."""
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close(timeout)
+        self.segments.close(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        base = {"buffered": self.config.buffered, "rotations": self.segments.rotations}
+        if self._writer is None:
+            return {**base, "running": False}
+        return {**base, **self._writer.stats()}
+
+    # ------------------------------------------------------------------
+    # Lookups (written events only: flush() first for the latest)
+    # ------------------------------------------------------------------
+    def find_decision(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        return self.segments.find_decision(decision_id)
+
+    def find_patient(
+        self,
+        patient_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        return self.segments.find_patient(patient_id, since=since, until=until)
 
 
 def minimal_observation_for_audit(obs: Any, include_free_text: bool) -> Dict[str, Any]:
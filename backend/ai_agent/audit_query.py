@@ -0,0 +1,58 @@
+# backend/ai_agent/audit_query.py
+"""
+Generator pipeline over the audit segments:
+
+    segments.records()  ->  type / priority / rule filters  ->  limit  ->  NDJSON lines
+
+Every stage is lazy, so memory stays constant whatever the log size, and
+matching lines are passed through as written (no re-serialization).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from .audit_segments import AuditSegments, Record
+
+
+def _of_type(records: Iterable[Record], event_type: str) -> Iterator[Record]:
+    return (r for r in records if r[1].get("type") == event_type)
+
+
+def _with_priority(records: Iterable[Record], priorities: Iterable[str]) -> Iterator[Record]:
+    wanted = {p.lower() for p in priorities}
+    return (r for r in records if str(r[1].get("priority", "")).lower() in wanted)
+
+
+def _with_rule(records: Iterable[Record], rule: str) -> Iterator[Record]:
+    return (r for r in records if rule in (r[1].get("triggered_rules") or ()))
+
+
+def _as_lines(records: Iterable[Record]) -> Iterator[bytes]:
+    for raw, _ in records:
+        yield raw if raw.endswith(b"\n") else raw + b"\n"
+
+
+def query_audit(
+    segments: AuditSegments,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    priorities: Optional[Iterable[str]] = None,
+    rule: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    event_type: Optional[str] = "decision",
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Matching audit events as NDJSON lines, oldest first."""
+    records: Iterable[Record] = segments.records(since=since, until=until, patient_id=patient_id)
+    if event_type:
+        records = _of_type(records, event_type)
+    if priorities:
+        records = _with_priority(records, priorities)
+    if rule:
+        records = _with_rule(records, rule)
+    if limit:
+        records = islice(records, limit)
+    return _as_lines(records)
@@ -0,0 +1,528 @@
+# backend/ai_agent/audit_segments.py
+"""
+Segmented storage for the JSONL audit trail.
+
+    logs/ai_decisions.jsonl                          active segment (plain)
+    logs/ai_decisions.20261017T034221Z-0000.jsonl.gz   closed, compressed
+    logs/ai_decisions.20261017T034221Z-0000.idx.json   sidecar index
+
+- The active segment rotates when it reaches max_bytes or the UTC day
+  changes; closed segments are compressed in the background
+- Several processes (workers) may share one active segment: rotation and
+  writes are serialized through an advisory lock on <active>.lock, and a
+  writer whose segment was rotated by another process reopens the path
+  before writing
+- A compressed segment is a sequence of independent gzip members
+  ("blocks") of ~block_bytes each, so it is still a normal .gz file but
+  any block can be read on its own
+- The sidecar index maps decision_id and patient_id to (block, offset,
+  length) and records the segment's time range, so lookups seek straight
+  to the right block instead of scanning every segment
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:  # POSIX only; elsewhere just the inode check guards writes
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+INDEX_VERSION = 1
+
+# decision_id / patient_id -> (block, offset in block, length)
+Location = Tuple[int, int, int]
+# (raw JSONL line, parsed event)
+Record = Tuple[bytes, Dict[str, Any]]
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+def parse_ts(value: Any) -> Optional[datetime]:
+    """Audit timestamps (ISO strings) -> aware datetimes; None if unusable."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _event_time(event: Dict[str, Any]) -> Optional[datetime]:
+    return parse_ts(event.get("created_at") or event.get("ts"))
+
+
+# ------------------------------------------------------------------
+# Closed segment: compress + index
+# ------------------------------------------------------------------
+def index_path_for(segment: Path) -> Path:
+    """ai_decisions.X.jsonl.gz -> ai_decisions.X.idx.json"""
+    name = segment.name
+    for suffix in (".gz", ".jsonl"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return segment.with_name(name + ".idx.json")
+
+
+@contextmanager
+def _claim(path: Path) -> Iterator[Optional[BinaryIO]]:
+    """
+    Exclusive, emptied handle on `path` across processes; None if another
+    process holds it. The flock dies with its holder, so a crash never
+    leaves a stale claim (the O_EXCL fallback without fcntl can).
+    """
+    fd: Optional[int] = None
+    if fcntl is None:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_RDWR)
+        except FileExistsError:
+            pass
+    else:
+        fd = os.open(path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            fd = None
+
+    if fd is None:
+        yield None
+        return
+    with os.fdopen(fd, "r+b") as f:
+        f.truncate(0)
+        yield f
+
+
+def compress_segment(plain: Path, block_bytes: int = 256 * 1024) -> Optional[Path]:
+    """
+    Compress a closed plain segment into gzip blocks and write its index.
+    Written to temp names first; the plain file is removed last, so a
+    crash at any point leaves a segment that can simply be redone.
+
+    Every worker may try the same segment (leftovers on startup): the
+    first one claims <segment>.gz.tmp, the others return None.
+    """
+    target = plain.with_name(plain.name + ".gz")
+    tmp_target = target.with_name(target.name + ".tmp")
+
+    with _claim(tmp_target) as dst:
+        if dst is None:
+            return None
+        if target.exists() or not plain.exists():
+            # Finished by another process after we looked
+            tmp_target.unlink()
+            return target if target.exists() else None
+        return _compress_into(plain, target, dst, block_bytes)
+
+
+def _compress_into(plain: Path, target: Path, dst: BinaryIO, block_bytes: int) -> Path:
+    index_file = index_path_for(target)
+    tmp_target = target.with_name(target.name + ".tmp")
+    tmp_index = index_file.with_name(index_file.name + ".tmp")
+
+    blocks: List[List[int]] = []
+    decision_ids: Dict[str, Location] = {}
+    patients: Dict[str, List[Location]] = {}
+    first: Optional[datetime] = None
+    last: Optional[datetime] = None
+    events = 0
+
+    with open(plain, "rb") as src:
+        buf: List[bytes] = []
+        size = 0
+
+        def flush_block() -> None:
+            nonlocal size
+            if not buf:
+                return
+            data = gzip.compress(b"".join(buf), mtime=0)
+            blocks.append([dst.tell(), len(data)])
+            dst.write(data)
+            buf.clear()
+            size = 0
+
+        for raw in src:
+            if not raw.strip():
+                continue
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                event = {}
+
+            loc = (len(blocks), size, len(raw))
+            events += 1
+            if event.get("decision_id"):
+                decision_ids[str(event["decision_id"])] = loc
+            if event.get("patient_id"):
+                patients.setdefault(str(event["patient_id"]), []).append(loc)
+            t = _event_time(event)
+            if t is not None:
+                first = t if first is None or t < first else first
+                last = t if last is None or t > last else last
+
+            buf.append(raw)
+            size += len(raw)
+            if size >= block_bytes:
+                flush_block()
+        flush_block()
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    index = {
+        "version": INDEX_VERSION,
+        "segment": target.name,
+        "events": events,
+        "first_ts": first.isoformat() if first else None,
+        "last_ts": last.isoformat() if last else None,
+        "blocks": blocks,
+        "decision_ids": decision_ids,
+        "patients": patients,
+    }
+    tmp_index.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+
+    os.replace(tmp_target, target)
+    os.replace(tmp_index, index_file)
+    plain.unlink()
+    return target
+
+
+@lru_cache(maxsize=32)
+def _load_index(path: str, mtime_ns: int) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index(segment: Path) -> Optional[Dict[str, Any]]:
+    index_file = index_path_for(segment)
+    try:
+        return _load_index(str(index_file), index_file.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+
+
+def read_block(segment: Path, block: List[int]) -> bytes:
+    offset, length = block
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        return zlib.decompress(f.read(length), wbits=31)
+
+
+# ------------------------------------------------------------------
+# Segment set (active + closed)
+# ------------------------------------------------------------------
+class AuditSegments:
+    """
+    Owns the active segment file. append() is thread-safe, and safe across
+    processes sharing the path; rotation and background compression
+    happen inside it.
+    """
+
+    def __init__(
+        self,
+        active_path: Path,
+        max_bytes: int = 64 * 1024 * 1024,
+        rotate_daily: bool = True,
+        compress: bool = True,
+        block_bytes: int = 256 * 1024,
+    ) -> None:
+        self.active_path = Path(active_path)
+        self.lock_path = self.active_path.with_name(self.active_path.name + ".lock")
+        self.max_bytes = int(max_bytes)
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.block_bytes = int(block_bytes)
+
+        self._lock = threading.RLock()
+        self._handle = None
+        self._lock_handle = None
+        self._size = 0
+        self._day: Optional[str] = None
+        self._workers: List[threading.Thread] = []
+        self.rotations = 0
+        self._recovered = False
+
+    # ---------------- naming ----------------
+    @property
+    def _stem(self) -> str:
+        name = self.active_path.name
+        return name[: -len(".jsonl")] if name.endswith(".jsonl") else name
+
+    def closed_segments(self) -> List[Path]:
+        """Closed segments, oldest first (plain ones not yet compressed too)."""
+        directory = self.active_path.parent
+        if not directory.exists():
+            return []
+        found = {}
+        for pattern in (f"{self._stem}.*.jsonl.gz", f"{self._stem}.*.jsonl"):
+            for p in directory.glob(pattern):
+                key = p.name[: -len(".gz")] if p.name.endswith(".gz") else p.name
+                # Prefer the compressed copy once it exists
+                if key not in found or p.name.endswith(".gz"):
+                    found[key] = p
+        return [found[k] for k in sorted(found)]
+
+    # ---------------- writing ----------------
+    def _open(self) -> None:
+        if not self._recovered:
+            self._recovered = True
+            self._compress_leftovers()
+        self.active_path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.active_path, "ab")
+        self._size = self._handle.tell()
+        if self._size and self.rotate_daily:
+            mtime = datetime.fromtimestamp(self.active_path.stat().st_mtime, timezone.utc)
+            self._day = mtime.strftime("%Y%m%d")
+        else:
+            self._day = _utc_day()
+
+    @contextmanager
+    def _process_lock(self) -> Iterator[None]:
+        """Exclusive across processes (caller holds self._lock)."""
+        if fcntl is None:
+            yield
+            return
+        if self._lock_handle is None:
+            self.active_path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_handle = open(self.lock_path, "ab")
+        fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_UN)
+
+    def _follow_active(self) -> None:
+        """
+        Make sure the handle is the file at active_path: another process may
+        have rotated it away (renamed, then compressed and unlinked). Also
+        picks up the bytes other processes appended, for the size check.
+        """
+        if self._handle is None:
+            self._open()
+            return
+        current = os.fstat(self._handle.fileno())
+        try:
+            on_disk = os.stat(self.active_path)
+        except FileNotFoundError:
+            on_disk = None
+        if on_disk is None or (on_disk.st_ino, on_disk.st_dev) != (current.st_ino, current.st_dev):
+            self._handle.close()
+            self._handle = None
+            self._open()
+        else:
+            self._size = current.st_size
+
+    def append(self, data: bytes) -> None:
+        with self._lock, self._process_lock():
+            self._follow_active()
+            if self._size and (
+                self._size + len(data) > self.max_bytes
+                or (self.rotate_daily and self._day != _utc_day())
+            ):
+                self._rotate()
+            self._handle.write(data)
+            self._handle.flush()
+            self._size += len(data)
+
+    def fsync(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                os.fsync(self._handle.fileno())
+
+    def _rotate(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        self._handle = None
+
+        # Fixed-width names so lexical order == rotation order
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        n = 0
+        while True:
+            closed = self.active_path.with_name(f"{self._stem}.{stamp}-{n:04d}.jsonl")
+            if not closed.exists() and not closed.with_name(closed.name + ".gz").exists():
+                break
+            n += 1
+        os.replace(self.active_path, closed)
+        self.rotations += 1
+        self._open()
+
+        if self.compress:
+            self._spawn(closed)
+
+    def _spawn(self, plain: Path) -> None:
+        worker = threading.Thread(
+            target=self._compress_quietly,
+            args=(plain,),
+            name="ai-audit-compress",
+            daemon=True,
+        )
+        self._workers = [w for w in self._workers if w.is_alive()] + [worker]
+        worker.start()
+
+    def _compress_quietly(self, plain: Path) -> None:
+        try:
+            compress_segment(plain, self.block_bytes)
+        except Exception:
+            # Left as plain JSONL; retried on the next start
+            pass
+
+    def _compress_leftovers(self) -> None:
+        if not self.compress:
+            return
+        for p in self.closed_segments():
+            if p.name.endswith(".jsonl"):
+                self._spawn(p)
+
+    def rotate(self) -> None:
+        """Close the active segment now (if it has data)."""
+        with self._lock, self._process_lock():
+            if self._handle is None and not self.active_path.exists():
+                return
+            self._follow_active()
+            if self._size:
+                self._rotate()
+
+    def close(self, timeout: float = 30.0) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+                self._handle.close()
+                self._handle = None
+            if self._lock_handle is not None:
+                self._lock_handle.close()
+                self._lock_handle = None
+        for worker in list(self._workers):
+            worker.join(timeout)
+
+    def wait_for_compression(self, timeout: float = 30.0) -> None:
+        for worker in list(self._workers):
+            worker.join(timeout)
+
+    # ---------------- reading ----------------
+    def records(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        patient_id: Optional[str] = None,
+    ) -> Iterator[Record]:
+        """
+        (raw line, event) for every written event, oldest first, streamed
+        in constant memory.
+
+        - [since, until] skips whole compressed segments by their index range
+        - patient_id reads only the indexed blocks that hold that patient
+        """
+
+        def wanted(e: Dict[str, Any]) -> bool:
+            if patient_id is not None and e.get("patient_id") != patient_id:
+                return False
+            return _in_range(_event_time(e), since, until)
+
+        for segment in self.closed_segments():
+            index = load_index(segment) if segment.name.endswith(".gz") else None
+            if index is not None:
+                if not _overlaps(index, since, until):
+                    continue
+                if patient_id is not None:
+                    locs = index["patients"].get(patient_id) or []
+                    for raw, event in self._read_locations(segment, index, locs):
+                        if wanted(event):
+                            yield raw, event
+                    continue
+            yield from self._scan_file(segment, wanted)
+        yield from self._scan_active(wanted)
+
+    def find_decision(self, decision_id: str) -> Optional[Dict[str, Any]]:
+        """Newest segment first; compressed segments via their index."""
+
+        def wanted(e: Dict[str, Any]) -> bool:
+            return e.get("decision_id") == decision_id
+
+        for _, event in self._scan_active(wanted):
+            return event
+        for segment in reversed(self.closed_segments()):
+            index = load_index(segment) if segment.name.endswith(".gz") else None
+            if index is not None:
+                loc = index["decision_ids"].get(decision_id)
+                if loc is not None:
+                    for _, event in self._read_locations(segment, index, [loc]):
+                        return event
+                continue
+            for _, event in self._scan_file(segment, wanted):
+                return event
+        return None
+
+    def find_patient(
+        self,
+        patient_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """All events for a patient in [since, until], oldest first."""
+        return (event for _, event in self.records(since, until, patient_id))
+
+    @staticmethod
+    def _read_locations(segment: Path, index: Dict[str, Any], locs: List[Location]) -> Iterator[Record]:
+        # Locations are in file order: keep only the current block in memory
+        current, data = -1, b""
+        for block, offset, length in locs:
+            if block != current:
+                current, data = block, read_block(segment, index["blocks"][block])
+            raw = data[offset: offset + length]
+            yield raw, json.loads(raw)
+
+    def _scan_active(self, predicate) -> Iterator[Record]:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+        if self.active_path.exists():
+            yield from self._scan_file(self.active_path, predicate)
+
+    @staticmethod
+    def _scan_file(path: Path, predicate) -> Iterator[Record]:
+        opener = gzip.open if path.name.endswith(".gz") else open
+        try:
+            with opener(path, "rb") as f:
+                for raw in f:
+                    if not raw.strip():
+                        continue
+                    try:
+                        event = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if predicate(event):
+                        yield raw, event
+        except FileNotFoundError:
+            # Compressed (and removed) between listing and opening
+            compressed = path.with_name(path.name + ".gz")
+            if not path.name.endswith(".gz") and compressed.exists():
+                yield from AuditSegments._scan_file(compressed, predicate)
+
+
+def _in_range(t: Optional[datetime], since: Optional[datetime], until: Optional[datetime]) -> bool:
+    if since is None and until is None:
+        return True
+    if t is None:
+        return False
+    return (since is None or t >= since) and (until is None or t <= until)
+
+
+def _overlaps(index: Dict[str, Any], since: Optional[datetime], until: Optional[datetime]) -> bool:
+    first, last = parse_ts(index.get("first_ts")), parse_ts(index.get("last_ts"))
+    if first is None or last is None:
+        return True
+    return (since is None or last >= since) and (until is None or first <= until)
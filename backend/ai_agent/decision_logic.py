@@ -3,9 +3,10 @@ SmartCare Flow - Decision Logic Engine
 Pure rule-based logic with zero hardcoding
 
 This module intentionally exposes:
-- DecisionEngine (class)
+- DecisionEngine (class) / decision_engine (shared instance)
 - build_default_rules (compat)
 - evaluate_observation (compat)
+- evaluate_many
 
 So older code that imports:
   from .decision_logic import build_default_rules, evaluate_observation
@@ -14,57 +15,193 @@ will keep working.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from backend.core.config import settings
 from backend.core.logger import get_logger
+from backend.services.availability_index import (
+    AvailabilityIndex,
+    ShiftIndex,
+    availability_index,
+    to_minute,
+)
+from backend.services.load_index import DoctorLoadIndex
 
 logger = get_logger(__name__)
 
+# (shift index, load index) over one roster
+Indexes = Tuple[ShiftIndex, DoctorLoadIndex]
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    """Observation schema of one action: which keys it needs and passes on."""
+    method: str
+    patient_data: bool = True
+    required: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+    indexed: bool = False  # handler takes prebuilt `indexes`
+
+
+# observation['action'] -> handler
+ACTIONS: Dict[str, ActionSpec] = {
+    "assign_appointment": ActionSpec("assign_appointment", optional=("preferred_time",), indexed=True),
+    "process_walkin": ActionSpec("process_walkin", required=("priority",), indexed=True),
+    "activate_emergency_protocol": ActionSpec("activate_emergency_protocol", indexed=True),
+    "detect_overload": ActionSpec("detect_overload", patient_data=False),
+}
+
 
 class DecisionEngine:
-    """Rule-based decision engine for scheduling optimization"""
+    """
+    Rule-based decision engine for scheduling optimization
+
+    Stateless between calls: keep one instance (see decision_engine) and
+    route observations through evaluate()/evaluate_many().
+
+    Roster: state["doctors"] when the caller passes one, else the shared
+    availability index (the live doctors table). The caller's state is
+    never written to.
+    """
+
+    def __init__(
+        self,
+        actions: Optional[Dict[str, ActionSpec]] = None,
+        availability: Optional[AvailabilityIndex] = None,
+    ) -> None:
+        self.actions = dict(ACTIONS if actions is None else actions)
+        self.availability = availability_index if availability is None else availability
+        # Bound once, not looked up per observation
+        self._dispatch = {name: getattr(self, spec.method) for name, spec in self.actions.items()}
+
+    def register_action(self, name: str, spec: ActionSpec) -> None:
+        self.actions[name] = spec
+        self._dispatch[name] = getattr(self, spec.method)
+
+    def indexes(self, state: Dict[str, Any]) -> Indexes:
+        """
+        Indexes to decide on: built from state["doctors"] for the call at
+        hand (the caller's loads as they are now), else the shared
+        availability index, whose load index follows committed queue
+        counter changes.
+        """
+        doctors = state.get("doctors")
+        if doctors is None:
+            return self.availability.snapshot()
+        return ShiftIndex(doctors), DoctorLoadIndex(doctors)
+
+    # ------------------------------------------------------------------
+    # Observation routing
+    # ------------------------------------------------------------------
+    def validate(self, observation: Dict[str, Any]) -> ActionSpec:
+        """Check an observation against its action's schema; returns the spec."""
+        if not isinstance(observation, dict):
+            raise TypeError("observation must be a dict")
+
+        spec = self.actions.get(observation.get("action"))  # type: ignore[arg-type]
+        if spec is None:
+            raise ValueError(
+                "Unknown or missing observation['action']. "
+                f"Expected one of: {', '.join(self.actions)}"
+            )
+
+        for key in spec.required:
+            if key not in observation:
+                raise KeyError(f"{observation['action']} requires '{key}' in observation")
+        for key in ("state", "patient_data"):
+            value = observation.get(key)
+            if value is not None and not isinstance(value, dict):
+                raise TypeError(f"observation['{key}'] must be a dict")
+        return spec
+
+    def evaluate(
+        self,
+        observation: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Route one observation; `state` overrides observation['state']."""
+        return self._run(self.validate(observation), observation, state)
+
+    def evaluate_many(
+        self,
+        observations: Iterable[Dict[str, Any]],
+        state: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate observations in order against one state snapshot.
+
+        - Every observation is validated before the first decision runs
+        - With `state`, all decisions read that snapshot and its indexes are
+          built once for the batch; otherwise each uses its observation['state']
+        - The snapshot is read-only here: decisions do not move queues
+        """
+        batch = [(self.validate(o), o) for o in observations]
+        indexes = None
+        if state is not None and any(spec.indexed for spec, _ in batch):
+            indexes = self.indexes(state)
+        return [self._run(spec, o, state, indexes) for spec, o in batch]
+
+    def _run(
+        self,
+        spec: ActionSpec,
+        observation: Dict[str, Any],
+        state: Optional[Dict[str, Any]],
+        indexes: Optional[Indexes] = None,
+    ) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "state": state if state is not None else (observation.get("state") or {})
+        }
+        if spec.indexed:
+            kwargs["indexes"] = indexes
+        if spec.patient_data:
+            kwargs["patient_data"] = observation.get("patient_data") or {}
+        for key in spec.required:
+            kwargs[key] = observation[key]
+        for key in spec.optional:
+            kwargs[key] = observation.get(key)
+        return self._dispatch[observation["action"]](**kwargs)
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
 
     def assign_appointment(
         self,
         state: Dict[str, Any],
         patient_data: Dict[str, Any],
         preferred_time: Optional[str] = None,
+        indexes: Optional[Indexes] = None,
     ) -> Dict[str, Any]:
         """
         Assign appointment to optimal doctor
         Logic:
         1. Filter doctors in same department
-        2. Check shift timing compatibility (TODO if shift data exists)
+        2. Keep doctors on shift at preferred_time ("HH:MM"), if given
         3. Select least busy doctor
         4. Detect conflicts
         """
-        _ = preferred_time  # reserved for future shift/time matching
-
-        doctors = state.get("doctors") or []
         department = patient_data.get("department")
+        shifts, loads = indexes or self.indexes(state)
 
-        department_doctors = [
-            d
-            for d in doctors
-            if d.get("department") == department
-            and d.get("status") != settings.STATUS_ON_LEAVE
-        ]
+        if preferred_time:
+            department_doctors = shifts.on_shift(department, preferred_time)
+            eligible = shifts.on_shift_ids(department, preferred_time)
+        else:
+            department_doctors = shifts.department(department)
+            eligible = None
 
-        if not department_doctors:
+        optimal_doctor = loads.least_busy(department, eligible)
+
+        if optimal_doctor is None:
+            when = f" at {preferred_time}" if preferred_time else ""
             return {
                 "assigned_doctor_id": None,
                 "status": "NO_DOCTOR_AVAILABLE",
-                "reason": f"No available doctors in {department}",
+                "reason": f"No available doctors in {department}{when}",
                 "ai_optimized": False,
             }
 
-        sorted_doctors = sorted(
-            department_doctors,
-            key=lambda x: int(x.get("current_queue_length", 0)),
-        )
-
-        optimal_doctor = sorted_doctors[0]
         queue_len = int(optimal_doctor.get("current_queue_length", 0))
         is_conflict = queue_len >= settings.QUEUE_THRESHOLD_HIGH
 
@@ -87,37 +224,30 @@ class DecisionEngine:
         state: Dict[str, Any],
         patient_data: Dict[str, Any],
         priority: str,
+        indexes: Optional[Indexes] = None,
     ) -> Dict[str, Any]:
         """
         Process walk-in patient
         Logic:
-        1. Assign to least busy doctor in department
+        1. Assign to least busy doctor in department on shift at arrival
+           (patient_data["arrival_time"], state["now"], else current time)
         2. Calculate queue position based on priority
         3. Detect overload condition
         """
-        doctors = state.get("doctors") or []
         department = patient_data.get("department")
+        arrival = to_minute(patient_data.get("arrival_time") or state.get("now"))
 
-        department_doctors = [
-            d
-            for d in doctors
-            if d.get("department") == department
-            and d.get("status") != settings.STATUS_ON_LEAVE
-        ]
+        shifts, loads = indexes or self.indexes(state)
+        department_doctors = shifts.on_shift(department, arrival)
+        assigned_doctor = loads.least_busy(department, shifts.on_shift_ids(department, arrival))
 
-        if not department_doctors:
+        if assigned_doctor is None:
             return {
                 "assigned_doctor_id": None,
                 "queue_position": None,
                 "status": "NO_DOCTOR_AVAILABLE",
             }
 
-        sorted_doctors = sorted(
-            department_doctors,
-            key=lambda x: int(x.get("current_queue_length", 0)),
-        )
-
-        assigned_doctor = sorted_doctors[0]
         queue_length = int(assigned_doctor.get("current_queue_length", 0))
 
         if priority == settings.PRIORITY_HIGH:
@@ -127,7 +257,7 @@ class DecisionEngine:
 
         redistribution_needed = (
             queue_length >= settings.QUEUE_THRESHOLD_HIGH
-            and len(sorted_doctors) > 1
+            and len(department_doctors) > 1
             and priority == settings.PRIORITY_NORMAL
         )
 
@@ -144,6 +274,7 @@ class DecisionEngine:
         self,
         state: Dict[str, Any],
         patient_data: Dict[str, Any],
+        indexes: Optional[Indexes] = None,
     ) -> Dict[str, Any]:
         """
         Emergency protocol activation
@@ -152,22 +283,13 @@ class DecisionEngine:
         2. Override queue
         3. No rescheduling allowed
         """
-        doctors = state.get("doctors") or []
         department = patient_data.get("department")
+        shifts, loads = indexes or self.indexes(state)
 
-        department_doctors = [
-            d
-            for d in doctors
-            if d.get("department") == department
-            and d.get("status") != settings.STATUS_ON_LEAVE
-        ]
+        assigned_doctor = loads.least_busy(department)
 
-        assigned_doctor: Optional[Dict[str, Any]] = None
-
-        if not department_doctors:
-            available_doctors = [
-                d for d in doctors if d.get("status") != settings.STATUS_ON_LEAVE
-            ]
+        if assigned_doctor is None:
+            available_doctors = shifts.department(None)
             if available_doctors:
                 assigned_doctor = available_doctors[0]
                 logger.warning(
@@ -175,11 +297,6 @@ class DecisionEngine:
                 )
             else:
                 return {"assigned_doctor_id": None, "status": "CRITICAL_NO_DOCTOR"}
-        else:
-            assigned_doctor = sorted(
-                department_doctors,
-                key=lambda x: int(x.get("current_queue_length", 0)),
-            )[0]
 
         return {
             "assigned_doctor_id": assigned_doctor.get("id") if assigned_doctor else None,
@@ -198,7 +315,9 @@ class DecisionEngine:
         2. Check if redistribution possible
         3. Generate overload report
         """
-        doctors = state.get("doctors") or []
+        doctors = state.get("doctors")
+        if doctors is None:
+            doctors = self.availability.current().doctors
 
         overloaded_doctors = [
             d
@@ -269,11 +388,14 @@ def build_default_rules() -> List[Dict[str, Any]]:
     return []
 
 
+decision_engine = DecisionEngine()
+
+
 def evaluate_observation(observation: Dict[str, Any], rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     Compatibility function.
 
-    Routes an observation to the DecisionEngine method based on an 'action' key.
+    Routes an observation to the shared DecisionEngine by its 'action' key.
 
     Expected observation shapes:
       - action: 'assign_appointment'
@@ -286,40 +408,12 @@ def evaluate_observation(observation: Dict[str, Any], rules: Optional[List[Dict[
         state
     """
     _ = rules  # reserved for future rule-list support
+    return decision_engine.evaluate(observation)
 
-    if not isinstance(observation, dict):
-        raise TypeError("observation must be a dict")
-
-    action = observation.get("action")
-    engine = DecisionEngine()
-
-    if action == "assign_appointment":
-        return engine.assign_appointment(
-            state=observation.get("state") or {},
-            patient_data=observation.get("patient_data") or {},
-            preferred_time=observation.get("preferred_time"),
-        )
-
-    if action == "process_walkin":
-        if "priority" not in observation:
-            raise KeyError("process_walkin requires 'priority' in observation")
-        return engine.process_walkin(
-            state=observation.get("state") or {},
-            patient_data=observation.get("patient_data") or {},
-            priority=observation["priority"],
-        )
-
-    if action == "activate_emergency_protocol":
-        return engine.activate_emergency_protocol(
-            state=observation.get("state") or {},
-            patient_data=observation.get("patient_data") or {},
-        )
-
-    if action == "detect_overload":
-        return engine.detect_overload(state=observation.get("state") or {})
 
-    raise ValueError(
-        "Unknown or missing observation['action']. "
-        "Expected one of: assign_appointment, process_walkin, "
-        "activate_emergency_protocol, detect_overload"
-    )
+def evaluate_many(
+    observations: Iterable[Dict[str, Any]],
+    state: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Batch evaluate_observation() over one state snapshot (see DecisionEngine)."""
+    return decision_engine.evaluate_many(observations, state=state)
@@ -1,24 +1,109 @@
 # backend/ai_agent/metrics.py
+"""
+Decision counters and latency percentiles.
+
+Latencies go into fixed log-spaced buckets (bucket i covers
+(MIN_MS * GAMMA^(i-1), MIN_MS * GAMMA^i]), so recording one is a single
+counter increment and every percentile is within RELATIVE_ERROR of the
+true value. Percentiles are only computed when read (snapshot()).
+
+Besides the lifetime histogram there is a sliding window made of
+`window_slices` ring slots of window_s / window_slices seconds each;
+stale slots are cleared as the clock moves past them.
+"""
+
 from __future__ import annotations
 
+import math
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Dict, List
-
-
-def _percentile(values: List[float], p: int) -> float:
-    if not values:
-        return 0.0
-    xs = sorted(values)
-    k = (len(xs) - 1) * (p / 100.0)
-    f = int(k)
-    c = min(f + 1, len(xs) - 1)
-    if f == c:
-        return float(xs[f])
-    d0 = xs[f] * (c - k)
-    d1 = xs[c] * (k - f)
-    return float(d0 + d1)
+from typing import Callable, Dict, Iterable, List, Sequence
+
+RELATIVE_ERROR = 0.02
+GAMMA = (1 + RELATIVE_ERROR) / (1 - RELATIVE_ERROR)
+MIN_MS = 0.001
+MAX_MS = 600_000.0  # 10 minutes; anything slower lands in the last bucket
+
+_LOG_GAMMA = math.log(GAMMA)
+NUM_BUCKETS = int(math.ceil(math.log(MAX_MS / MIN_MS) / _LOG_GAMMA)) + 1
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def bucket_index(latency_ms: float) -> int:
+    if latency_ms <= MIN_MS:
+        return 0
+    i = int(math.ceil(math.log(latency_ms / MIN_MS) / _LOG_GAMMA))
+    return i if i < NUM_BUCKETS else NUM_BUCKETS - 1
+
+
+def bucket_value(i: int) -> float:
+    """Representative latency of bucket i (relative error <= RELATIVE_ERROR)."""
+    if i == 0:
+        return MIN_MS
+    return MIN_MS * 2 * GAMMA ** i / (GAMMA + 1)
+
+
+class LogHistogram:
+    """Counts per log bucket plus count/sum. Not locked; AgentMetrics is."""
+
+    __slots__ = ("counts", "count", "total_ms")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, i: int, latency_ms: float, n: int = 1) -> None:
+        self.counts[i] += n
+        self.count += n
+        self.total_ms += latency_ms * n
+
+    def clear(self) -> None:
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+
+    def merge(self, other: "LogHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+
+    def copy(self) -> "LogHistogram":
+        h = LogHistogram()
+        h.counts = list(self.counts)
+        h.count = self.count
+        h.total_ms = self.total_ms
+        return h
+
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentiles(self, ps: Sequence[int] = PERCENTILES) -> Dict[int, float]:
+        """Nearest-rank percentiles in one pass over the buckets."""
+        if not self.count:
+            return {p: 0.0 for p in ps}
+        targets = sorted((max(1, int(math.ceil(self.count * p / 100.0))), p) for p in ps)
+        out: Dict[int, float] = {}
+        seen = 0
+        t = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and targets[t][0] <= seen:
+                out[targets[t][1]] = bucket_value(i)
+                t += 1
+            if t == len(targets):
+                break
+        return out
+
+    def summary(self) -> Dict[str, float]:
+        pct = self.percentiles()
+        out: Dict[str, float] = {"count": self.count, "avg": self.mean()}
+        out.update({f"p{p}": pct[p] for p in PERCENTILES})
+        return out
 
 
 @dataclass
@@ -33,27 +118,97 @@ class AgentMetrics:
     decisions_by_priority: Dict[str, int] = field(default_factory=dict)
 
     last_latency_ms: float = 0.0
-    avg_latency_ms: float = 0.0
-    p95_latency_ms: float = 0.0
 
-    _latencies_ms: List[float] = field(default_factory=list, repr=False)
+    # Sliding latency window
+    window_s: float = 60.0
+    window_slices: int = 12
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    _lifetime: LogHistogram = field(default_factory=LogHistogram, repr=False)
+    _slices: List[LogHistogram] = field(default_factory=list, repr=False)
+    _slice_epochs: List[int] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self.window_slices = max(1, int(self.window_slices))
+        self._slice_s = float(self.window_s) / self.window_slices
+        self._slices = [LogHistogram() for _ in range(self.window_slices)]
+        self._slice_epochs = [-1] * self.window_slices
+
+    # Back-compat attributes (lifetime)
+    @property
+    def avg_latency_ms(self) -> float:
+        with self._lock:
+            return self._lifetime.mean()
+
+    @property
+    def p95_latency_ms(self) -> float:
+        with self._lock:
+            return self._lifetime.percentiles((95,))[95]
 
     def observe(self, priority: str, latency_ms: float) -> None:
+        self._record({priority: 1}, 1, float(latency_ms))
+
+    def observe_many(self, priorities: Iterable[str], latency_ms: float) -> None:
+        """Record a batch of decisions that each took latency_ms (one lock, one bucket update)."""
+        counts: Dict[str, int] = {}
+        for priority in priorities:
+            counts[priority] = counts.get(priority, 0) + 1
+        n = sum(counts.values())
+        if n:
+            self._record(counts, n, float(latency_ms))
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            lifetime = self._lifetime.copy()
+            live = self._live_slices(self._epoch(self.clock()))
+            out: Dict[str, object] = {
+                "decisions_total": self.decisions_total,
+                "decisions_by_priority": dict(self.decisions_by_priority),
+                "last_latency_ms": self.last_latency_ms,
+            }
+        # Merging and bucket scans happen outside the lock
+        window = LogHistogram()
+        for h in live:
+            window.merge(h)
+        life = lifetime.summary()
+        out["avg_latency_ms"] = life["avg"]
+        out["p95_latency_ms"] = life["p95"]
+        out["latency_ms"] = life
+        out["window"] = {"seconds": self.window_s, **window.summary()}
+        return out
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _epoch(self, now: float) -> int:
+        return int(now // self._slice_s)
+
+    def _record(self, by_priority: Dict[str, int], n: int, latency_ms: float) -> None:
+        # log() and the clock read stay outside the lock
+        i = bucket_index(latency_ms)
+        epoch = self._epoch(self.clock())
+        slot = epoch % self.window_slices
         with self._lock:
-            self.decisions_total += 1
-            self.decisions_by_priority[priority] = self.decisions_by_priority.get(priority, 0) + 1
-            self.last_latency_ms = float(latency_ms)
+            self.decisions_total += n
+            for priority, c in by_priority.items():
+                self.decisions_by_priority[priority] = self.decisions_by_priority.get(priority, 0) + c
+            self.last_latency_ms = latency_ms
 
-            self._latencies_ms.append(float(latency_ms))
-            if len(self._latencies_ms) > 5000:
-                self._latencies_ms = self._latencies_ms[-2000:]
+            self._lifetime.add(i, latency_ms, n)
+            current = self._slices[slot]
+            if self._slice_epochs[slot] != epoch:
+                current.clear()
+                self._slice_epochs[slot] = epoch
+            current.add(i, latency_ms, n)
 
-            self.avg_latency_ms = sum(self._latencies_ms) / max(len(self._latencies_ms), 1)
-            self.p95_latency_ms = _percentile(self._latencies_ms, 95)
+    def _live_slices(self, epoch: int) -> List[LogHistogram]:
+        """Copies of the slots still inside the window (caller holds the lock)."""
+        oldest = epoch - self.window_slices + 1
+        return [h.copy() for h, e in zip(self._slices, self._slice_epochs) if oldest <= e <= epoch and h.count]
 
 
 class _Timer:
-    def _init_(self) -> None:
+    def __init__(self) -> None:
         self._t0 = time.perf_counter()
 
     def ms(self) -> float:
@@ -0,0 +1,202 @@
+# backend/ai_agent/triage.py
+"""
+Vitals triage rules (per observation).
+
+Rules are plain dicts (see build_default_rules) so they can be loaded,
+audited and evaluated by other engines without code changes:
+
+    code      unique rule code, e.g. CRIT_SPO2_LT_90
+    field     Observation attribute
+    op        lt | le | gt | ge
+    value     numeric threshold, or
+    other     name of a second field to compare against
+    priority  low | medium | high | critical   (scoring rules)
+    weight    score contribution               (scoring rules)
+    reason    human-readable reason / warning text
+    warning   True -> adds a warning, never changes score or priority
+
+Within one field only the first triggered scoring rule counts, so list
+the most severe threshold first.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .recommendations import Recommendation
+
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+MAX_SCORE = 100
+
+VITAL_FIELDS = (
+    "heart_rate",
+    "respiratory_rate",
+    "systolic_bp",
+    "diastolic_bp",
+    "spo2",
+    "temperature_c",
+)
+
+OPS = {"lt": operator.lt, "le": operator.le, "gt": operator.gt, "ge": operator.ge}
+
+# score, priority, triggered rule codes, reasons, recommendations, warnings
+Scored = Tuple[int, str, List[str], List[str], List[Recommendation], List[str]]
+
+
+def _rule(code: str, field: str, op: str, value: float, priority: str, weight: int, reason: str) -> Dict[str, Any]:
+    return {
+        "code": code,
+        "field": field,
+        "op": op,
+        "value": value,
+        "priority": priority,
+        "weight": weight,
+        "reason": reason,
+    }
+
+
+def build_default_rules() -> List[Dict[str, Any]]:
+    return [
+        _rule("CRIT_SPO2_LT_90", "spo2", "lt", 90, "critical", 80, "SpO2 below 90%"),
+        _rule("MED_SPO2_LT_94", "spo2", "lt", 94, "medium", 20, "SpO2 below 94%"),
+        _rule("CRIT_SBP_LT_90", "systolic_bp", "lt", 90, "critical", 80, "Systolic BP below 90 mmHg"),
+        _rule("HIGH_SBP_GE_180", "systolic_bp", "ge", 180, "high", 40, "Systolic BP 180 mmHg or above"),
+        _rule("CRIT_HR_LT_40", "heart_rate", "lt", 40, "critical", 80, "Heart rate below 40 bpm"),
+        _rule("HIGH_HR_GT_130", "heart_rate", "gt", 130, "high", 40, "Heart rate above 130 bpm"),
+        _rule("MED_HR_GT_110", "heart_rate", "gt", 110, "medium", 20, "Heart rate above 110 bpm"),
+        _rule("CRIT_RR_LE_8", "respiratory_rate", "le", 8, "critical", 80, "Respiratory rate 8/min or below"),
+        _rule("HIGH_RR_GE_25", "respiratory_rate", "ge", 25, "high", 40, "Respiratory rate 25/min or above"),
+        _rule("MED_RR_GT_20", "respiratory_rate", "gt", 20, "medium", 20, "Respiratory rate above 20/min"),
+        _rule("HIGH_TEMP_GT_39", "temperature_c", "gt", 39.0, "high", 40, "Temperature above 39.0 C"),
+        _rule("MED_TEMP_GE_38", "temperature_c", "ge", 38.0, "medium", 20, "Temperature 38.0 C or above"),
+        _rule("MED_TEMP_LT_35", "temperature_c", "lt", 35.0, "medium", 20, "Temperature below 35.0 C"),
+        {
+            "code": "WARN_BP_INCONSISTENT",
+            "field": "systolic_bp",
+            "op": "le",
+            "other": "diastolic_bp",
+            "warning": True,
+            "reason": "Systolic BP not above diastolic - verify measurement",
+        },
+    ]
+
+
+# ------------------------------------------------------------------
+# Recommendations (from the outcome, not from individual rules)
+# ------------------------------------------------------------------
+_ESCALATIONS = {
+    "critical": (
+        "REC_CRITICAL_ESCALATE",
+        "Immediate clinical review",
+        "Critical vitals: escalate to the on-duty physician now.",
+        ["Notify on-duty physician", "Move to emergency bay", "Continuous monitoring"],
+        0.9,
+    ),
+    "high": (
+        "REC_URGENT_REVIEW",
+        "Urgent review",
+        "Abnormal vitals: see a doctor ahead of routine patients.",
+        ["Fast-track consultation", "Repeat vitals in 15 minutes"],
+        0.8,
+    ),
+    "medium": (
+        "REC_PRIORITY_ASSESSMENT",
+        "Priority assessment",
+        "Borderline vitals: assess soon and re-check.",
+        ["Repeat vitals in 30 minutes"],
+        0.7,
+    ),
+}
+
+
+def build_recommendations(priority: str, triggered: Sequence[str], warnings: Sequence[str]) -> List[Recommendation]:
+    recs: List[Recommendation] = []
+    if priority in _ESCALATIONS:
+        code, title, message, actions, confidence = _ESCALATIONS[priority]
+        recs.append(
+            Recommendation(
+                code=code,
+                title=title,
+                message=message,
+                priority=priority,
+                actions=list(actions),
+                confidence=confidence,
+                triggered_by=list(triggered),
+                tags=["triage"],
+            )
+        )
+    else:
+        recs.append(
+            Recommendation(
+                code="REC_GENERAL_MONITOR",
+                title="Routine monitoring",
+                message="No abnormal vitals: continue routine queue and monitoring.",
+                priority="low",
+                actions=["Standard queue"],
+                triggered_by=[],
+                tags=["triage"],
+            )
+        )
+    if warnings:
+        recs.append(
+            Recommendation(
+                code="REC_REPEAT_MEASUREMENT",
+                title="Repeat measurement",
+                message="Some vitals look inconsistent; measure again before acting on them.",
+                priority="medium",
+                actions=["Re-measure flagged vitals"],
+                confidence=0.6,
+                tags=["data_quality"],
+            )
+        )
+    return recs
+
+
+def finalize(triggered_rules: Sequence[Dict[str, Any]], warnings: List[str]) -> Scored:
+    """Score/priority/recommendations from the rules that fired (in rule order)."""
+    score = min(MAX_SCORE, sum(int(r["weight"]) for r in triggered_rules))
+    priority = "low"
+    for r in triggered_rules:
+        if PRIORITY_RANK[r["priority"]] > PRIORITY_RANK[priority]:
+            priority = r["priority"]
+    codes = [r["code"] for r in triggered_rules]
+    reasons = [r["reason"] for r in triggered_rules]
+    return score, priority, codes, reasons, build_recommendations(priority, codes, warnings), warnings
+
+
+# ------------------------------------------------------------------
+# Per-observation evaluation
+# ------------------------------------------------------------------
+def score_observation(obs: Any, rules: Sequence[Dict[str, Any]]) -> Scored:
+    """Evaluate one Observation (or anything with the vital attributes)."""
+    triggered: List[Dict[str, Any]] = []
+    warnings: List[str] = []
+    fields_hit = set()
+
+    for rule in rules:
+        value = getattr(obs, rule["field"], None)
+        if value is None:
+            continue
+        if "other" in rule:
+            threshold = getattr(obs, rule["other"], None)
+            if threshold is None:
+                continue
+        else:
+            threshold = rule["value"]
+
+        if rule.get("warning"):
+            if OPS[rule["op"]](value, threshold):
+                warnings.append(rule["reason"])
+            continue
+
+        if rule["field"] in fields_hit:
+            continue
+        if OPS[rule["op"]](value, threshold):
+            triggered.append(rule)
+            fields_hit.add(rule["field"])
+
+    if all(getattr(obs, f, None) is None for f in VITAL_FIELDS):
+        warnings.append("No vitals recorded - triage based on defaults")
+
+    return finalize(triggered, warnings)
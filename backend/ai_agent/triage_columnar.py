@@ -0,0 +1,163 @@
+# backend/ai_agent/triage_columnar.py
+"""
+Columnar (NumPy) evaluation of the triage rules in triage.py.
+
+Observations are packed into one float column per vital (NaN = missing)
+and every rule becomes a boolean mask over the whole batch. Output is
+identical to triage.score_observation() applied one by one.
+
+Used by RuleBasedAgent.decide_batch for larger batches and for
+retrospective re-scoring of audit events (rescore_audit_events).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .recommendations import Recommendation
+from .triage import OPS, PRIORITY_RANK, MAX_SCORE, VITAL_FIELDS, Scored, build_default_rules, build_recommendations
+
+_PRIORITY_BY_RANK = {rank: name for name, rank in PRIORITY_RANK.items()}
+NO_VITALS_WARNING = "No vitals recorded - triage based on defaults"
+
+
+def pack_columns(observations: Sequence[Any], fields: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    One float64 column per field; missing values become NaN.
+    Observations are all mappings (e.g. audit records) or all objects.
+    """
+    as_mappings = bool(observations) and isinstance(observations[0], Mapping)
+    columns = {}
+    for field in fields:
+        if as_mappings:
+            values = [o.get(field) for o in observations]
+        else:
+            values = [getattr(o, field, None) for o in observations]
+        columns[field] = np.array(values, dtype=np.float64)  # None -> NaN
+    return columns
+
+
+def _rule_fields(rules: Sequence[Dict[str, Any]]) -> List[str]:
+    fields = list(VITAL_FIELDS)
+    for rule in rules:
+        for field in (rule["field"], rule.get("other")):
+            if field and field not in fields:
+                fields.append(field)
+    return fields
+
+
+def score_columns(
+    columns: Dict[str, np.ndarray],
+    rules: Sequence[Dict[str, Any]],
+) -> List[Scored]:
+    """Evaluate every rule over packed columns (see pack_columns)."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    if n == 0:
+        return []
+
+    scoring = [r for r in rules if not r.get("warning")]
+    warning_rules = [r for r in rules if r.get("warning")]
+
+    def mask(rule: Dict[str, Any]) -> np.ndarray:
+        # NaN compares False, so missing vitals never trigger
+        threshold = columns[rule["other"]] if "other" in rule else rule["value"]
+        return OPS[rule["op"]](columns[rule["field"]], threshold)
+
+    # First triggered rule per field wins (rule order = severity order)
+    fired = np.zeros((len(scoring), n), dtype=bool)
+    taken: Dict[str, np.ndarray] = {}
+    for i, rule in enumerate(scoring):
+        hit = mask(rule)
+        prev = taken.get(rule["field"])
+        if prev is not None:
+            hit &= ~prev
+            prev |= hit
+        else:
+            taken[rule["field"]] = hit.copy()
+        fired[i] = hit
+
+    weights = np.array([int(r["weight"]) for r in scoring], dtype=np.int64)
+    ranks = np.array([PRIORITY_RANK[r["priority"]] for r in scoring], dtype=np.int64)
+    scores = np.minimum(MAX_SCORE, weights @ fired) if len(scoring) else np.zeros(n, dtype=np.int64)
+    levels = (ranks[:, None] * fired).max(axis=0) if len(scoring) else np.zeros(n, dtype=np.int64)
+
+    warned = np.array([mask(r) for r in warning_rules], dtype=bool).reshape(len(warning_rules), n)
+    present = [columns[f] for f in VITAL_FIELDS if f in columns]
+    no_vitals = np.isnan(np.vstack(present)).all(axis=0) if present else np.ones(n, dtype=bool)
+
+    # Per-observation lists, from the (few) set bits only
+    codes: List[List[str]] = [[] for _ in range(n)]
+    reasons: List[List[str]] = [[] for _ in range(n)]
+    for obs_i, rule_i in zip(*np.nonzero(fired.T)):
+        codes[obs_i].append(scoring[rule_i]["code"])
+        reasons[obs_i].append(scoring[rule_i]["reason"])
+
+    warnings: List[List[str]] = [[] for _ in range(n)]
+    for obs_i, rule_i in zip(*np.nonzero(warned.T)):
+        warnings[obs_i].append(warning_rules[rule_i]["reason"])
+    for obs_i in np.flatnonzero(no_vitals):
+        warnings[obs_i].append(NO_VITALS_WARNING)
+
+    # Recommendations only depend on (priority, codes, any warnings)
+    recs_cache: Dict[Tuple[str, Tuple[str, ...], bool], List[Recommendation]] = {}
+    out: List[Scored] = []
+    for i in range(n):
+        priority = _PRIORITY_BY_RANK[int(levels[i])]
+        key = (priority, tuple(codes[i]), bool(warnings[i]))
+        recs = recs_cache.get(key)
+        if recs is None:
+            recs = recs_cache[key] = build_recommendations(priority, codes[i], warnings[i])
+        out.append((int(scores[i]), priority, codes[i], reasons[i], list(recs), warnings[i]))
+    return out
+
+
+def score_batch(observations: Sequence[Any], rules: Optional[Sequence[Dict[str, Any]]] = None) -> List[Scored]:
+    """triage.score_observation() for many observations (objects or dicts)."""
+    rules = build_default_rules() if rules is None else rules
+    return score_columns(pack_columns(observations, _rule_fields(rules)), rules)
+
+
+# ------------------------------------------------------------------
+# Retrospective re-scoring of audit events
+# ------------------------------------------------------------------
+def rescore_audit_events(
+    events: Iterable[Dict[str, Any]],
+    rules: Optional[Sequence[Dict[str, Any]]] = None,
+    chunk_size: int = 10000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Re-score "decision" audit events (their stored observation vitals)
+    under `rules`, chunk by chunk. Yields one summary per event.
+    """
+    rules = build_default_rules() if rules is None else rules
+    fields = _rule_fields(rules)
+
+    chunk: List[Dict[str, Any]] = []
+
+    def flush() -> Iterator[Dict[str, Any]]:
+        observations = [e.get("observation") or {} for e in chunk]
+        scored = score_columns(pack_columns(observations, fields), rules)
+        for event, (score, priority, triggered, _, _, _) in zip(chunk, scored):
+            yield {
+                "decision_id": event.get("decision_id"),
+                "patient_id": event.get("patient_id"),
+                "priority_before": event.get("priority"),
+                "priority": priority,
+                "score_before": event.get("score"),
+                "score": score,
+                "triggered_rules": triggered,
+                "changed": priority != event.get("priority") or score != event.get("score"),
+            }
+
+    for event in events:
+        if event.get("type") != "decision":
+            continue
+        chunk.append(event)
+        if len(chunk) >= chunk_size:
+            yield from flush()
+            chunk = []
+    if chunk:
+        yield from flush()
@@ -5,7 +5,8 @@ Hackathon-ready, cleaned and corrected
 
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime, timezone
 from pathlib import Path
 import sys
@@ -19,9 +20,19 @@ import uvicorn
 # Imports (support running from project root OR backend/ directory)
 # -----------------------------------------------------------------------------
 try:
+    from backend.ai_agent.agent import ai_agent
     from backend.core.config import settings
     from backend.core.logger import get_logger
-    from backend.core.database import init_db
+    from backend.core.database import (
+        SessionLocal,
+        dispose_async_engines,
+        engine,
+        init_db,
+        sqlite_profile,
+    )
+    from backend.services.queue_engine import queue_engine
+    from backend.services.queue_service import compact_positions
+    from backend.services.doctor_service import DoctorService
     from backend.routes import (
         dashboard,
         doctors,
@@ -30,17 +41,29 @@ try:
         emergency,
         availability,
         ai_logs,
+        ai,
         reports,
         queue,          # ✅ Queue registered
+        stream,
     )
 except ImportError:
     project_root = Path(__file__).resolve().parents[1]
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
 
+    from backend.ai_agent.agent import ai_agent
     from backend.core.config import settings
     from backend.core.logger import get_logger
-    from backend.core.database import init_db
+    from backend.core.database import (
+        SessionLocal,
+        dispose_async_engines,
+        engine,
+        init_db,
+        sqlite_profile,
+    )
+    from backend.services.queue_engine import queue_engine
+    from backend.services.queue_service import compact_positions
+    from backend.services.doctor_service import DoctorService
     from backend.routes import (
         dashboard,
         doctors,
@@ -49,12 +72,49 @@ except ImportError:
         emergency,
         availability,
         ai_logs,
+        ai,
         reports,
         queue,
+        stream,
     )
 
 logger = get_logger(__name__)
 
+# -----------------------------------------------------------------------------
+# Background jobs
+# -----------------------------------------------------------------------------
+def _compact_queue_once() -> None:
+    with SessionLocal() as db:
+        compact_positions(db)
+
+
+def _reconcile_counters_once() -> None:
+    with SessionLocal() as db:
+        DoctorService().reconcile_queue_lengths(db)
+
+
+async def _run_periodically(name: str, interval: int, job) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(job)
+        except Exception:
+            logger.exception(f"Background job failed | {name}")
+
+
+def _start_background_jobs() -> list[asyncio.Task]:
+    jobs = (
+        ("queue_compaction", "QUEUE_COMPACTION_INTERVAL_SECONDS", _compact_queue_once),
+        ("counter_reconcile", "QUEUE_RECONCILE_INTERVAL_SECONDS", _reconcile_counters_once),
+    )
+    tasks: list[asyncio.Task] = []
+    for name, setting_name, job in jobs:
+        interval = int(getattr(settings, setting_name, 0) or 0)
+        if interval > 0:
+            tasks.append(asyncio.create_task(_run_periodically(name, interval, job)))
+    return tasks
+
+
 # -----------------------------------------------------------------------------
 # Lifespan (startup/shutdown)
 # -----------------------------------------------------------------------------
@@ -64,13 +124,40 @@ async def lifespan(app: FastAPI):
     try:
         init_db()
         logger.info("Database initialized successfully")
+
+        profile = sqlite_profile(engine)
+        if profile:
+            logger.info(
+                "SQLite profile | " + " | ".join(f"{k}={v}" for k, v in profile.items())
+            )
+
+        with SessionLocal() as db:
+            queue_engine.load(db)
+            DoctorService().reconcile_queue_lengths(db)
     except Exception:
         logger.exception("Database initialization failed")
         raise
 
+    background_tasks = _start_background_jobs()
+
     yield
 
     logger.info("Shutting down SmartCare Flow Backend...")
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+
+    await dispose_async_engines()
+
+    # Write out queued audit events before the process exits
+    await asyncio.to_thread(ai_agent.audit.close)
+    audit = ai_agent.audit.stats()
+    logger.info(
+        f"AI audit closed | Written={audit.get('written', 0)} | "
+        f"Dropped={audit.get('dropped', 0)} | Errors={audit.get('errors', 0)}"
+    )
 
 # -----------------------------------------------------------------------------
 # App
@@ -148,7 +235,9 @@ app.include_router(walkins.router, prefix="/api/walkins", tags=["Walk-ins"])
 app.include_router(emergency.router, prefix="/api/emergency", tags=["Emergency"])
 app.include_router(availability.router, prefix="/api/availability", tags=["Availability"])
 app.include_router(queue.router, prefix="/api/queue", tags=["Queue"])  # ✅ WORKING
+app.include_router(stream.router, prefix="/api/stream", tags=["Live"])
 app.include_router(ai_logs.router, prefix="/api/ai-logs", tags=["AI Logs"])
+app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,75 @@
+# backend/core/cache.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from backend.core import data_versions
+
+
+class TTLCache:
+    """
+    Tiny in-process cache for hot read endpoints.
+
+    An entry is served while BOTH hold:
+      - it is younger than ttl_seconds
+      - none of its dependent tables has been written since it was stored
+        (see core.data_versions)
+    """
+
+    def __init__(self, ttl_seconds: float, tables: Sequence[str] = ()) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.tables = tuple(tables)
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Tuple[int, ...], Any]] = {}
+
+    def get(self, key: Hashable = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, stored_versions, value = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            return None
+        if stored_versions != data_versions.versions(self.tables):
+            return None
+        return value
+
+    def set(self, value: Any, key: Hashable = None, versions: Optional[Tuple[int, ...]] = None) -> None:
+        if versions is None:
+            versions = data_versions.versions(self.tables)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), versions, value)
+
+    def get_or_set(self, factory: Callable[[], Any], key: Hashable = None) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # Snapshot versions BEFORE computing, so a write that lands while
+        # we compute makes this entry stale immediately.
+        versions = data_versions.versions(self.tables)
+        value = factory()
+        if self.ttl_seconds > 0:
+            self.set(value, key=key, versions=versions)
+        return value
+
+    async def aget_or_set(
+        self, factory: Callable[[], Awaitable[Any]], key: Hashable = None
+    ) -> Any:
+        """get_or_set() for async factories (e.g. AsyncSession queries)."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        versions = data_versions.versions(self.tables)
+        value = await factory()
+        if self.ttl_seconds > 0:
+            self.set(value, key=key, versions=versions)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -17,6 +17,21 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./data/smartcare.db"
+    # Engine for GET routes: a replica URL (e.g. Postgres standby), or empty
+    # to open query_only connections on DATABASE_URL (SQLite WAL readers)
+    READ_DATABASE_URL: str = ""
+    READ_POOL_SIZE: int = 10
+    READ_POOL_MAX_OVERFLOW: int = 10
+
+    # SQLite connection profile (applied on every new connection)
+    # WAL lets readers run alongside the single writer; NORMAL is durable
+    # across app crashes in WAL mode (only an OS crash can lose the last commit)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
 
     # CORS
     # - Keep both names for back-compat across your codebase
@@ -61,6 +76,37 @@ class Settings(BaseSettings):
     QUEUE_THRESHOLD_MEDIUM: int = 5
     QUEUE_THRESHOLD_HIGH: int = 10
 
+    # Resident queue engine (per worker); full reload interval, 0 = never
+    QUEUE_ENGINE_RESYNC_SECONDS: int = 30
+    # Background renumbering of queue positions after emergency jumps, 0 = off
+    QUEUE_COMPACTION_INTERVAL_SECONDS: int = 300
+    # Repair doctors.current_queue_length drift against queue_items, 0 = off
+    QUEUE_RECONCILE_INTERVAL_SECONDS: int = 60
+
+    # Shift-aware availability index; full rebuild interval (multi-worker), 0 = never
+    AVAILABILITY_INDEX_RESYNC_SECONDS: int = 30
+
+    # Dashboard summary cache (also dropped on any write to its tables)
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5.0
+
+    # GET /api/doctors/workload snapshot (also dropped on doctor/queue writes)
+    WORKLOAD_SNAPSHOT_TTL_SECONDS: float = 2.0
+
+    # Conditional GET: ETags also roll over every N seconds (multi-worker
+    # safety, since write versions are per process). 0 = versions only
+    ETAG_WINDOW_SECONDS: int = 10
+
+    # Live updates (GET /api/stream)
+    STREAM_SUBSCRIBER_QUEUE_SIZE: int = 256
+    STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Bulk import (walk-ins / appointments)
+    BULK_IMPORT_MAX_ROWS: int = 5000
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+
+    # Batch triage decisions (POST /api/ai/decide/batch)
+    AI_DECIDE_BATCH_MAX: int = 1000
+
     @staticmethod
     def get_current_timestamp() -> str:
         return datetime.now(timezone.utc).isoformat()
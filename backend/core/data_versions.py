@@ -0,0 +1,100 @@
+# backend/core/data_versions.py
+"""
+Per-table write versions.
+
+Every committed INSERT / UPDATE / DELETE moves the version of the table
+it touched. Readers use versions to tell whether cached data is still
+current, without querying the database.
+
+A version is the wall-clock time (ns) of the last write this process
+committed to the table, not a per-process count: two workers report the
+same version only when they saw the same last write (or none), so
+versions can be compared across workers (ETags).
+
+Tracking happens at the engine level (cursor events + the dialect's
+commit), so raw text() SQL in services is covered the same way as ORM
+writes. Versions move only AFTER the DBAPI commit has returned: a reader
+that sees the new version is guaranteed to read the committed data.
+A process does not see other workers' writes: in multi-worker deployments
+pair versions with a short TTL.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_WRITE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"'`\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+
+
+# -----------------------------------------------------------------------------
+# Read / bump
+# -----------------------------------------------------------------------------
+def version(table: str) -> int:
+    return _versions.get(table, 0)
+
+
+def versions(tables: Iterable[str]) -> Tuple[int, ...]:
+    return tuple(_versions.get(t, 0) for t in tables)
+
+
+def bump(*tables: str) -> None:
+    now = time.time_ns()
+    with _lock:
+        for t in tables:
+            # Strictly increasing even if the clock stalls or steps back
+            _versions[t] = max(now, _versions.get(t, 0) + 1)
+
+
+# -----------------------------------------------------------------------------
+# Engine hooks
+# -----------------------------------------------------------------------------
+def _on_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    m = _WRITE_RE.match(statement)
+    if m:
+        conn.info.setdefault("dirty_tables", set()).add(m.group(1).lower())
+
+
+def _bump_after_commit(do_commit):
+    """
+    Wrap dialect.do_commit. The engine "commit" event fires BEFORE the
+    DBAPI commit, which would let a reader pair the new version with
+    pre-commit data (and cache / ETag it under that version).
+    """
+    def do_commit_and_bump(dbapi_connection) -> None:
+        do_commit(dbapi_connection)
+        # Pool proxy: same .info dict as the Connection the cursor events saw
+        info = getattr(dbapi_connection, "info", None)
+        dirty = info.pop("dirty_tables", None) if info is not None else None
+        if dirty:
+            bump(*dirty)
+
+    do_commit_and_bump._bumps_versions = True  # type: ignore[attr-defined]
+    return do_commit_and_bump
+
+
+def _on_rollback(conn) -> None:
+    conn.info.pop("dirty_tables", None)
+
+
+def install_write_tracking(engine: Engine) -> None:
+    """Attach write tracking to an engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _on_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _on_cursor_execute)
+    event.listen(engine, "rollback", _on_rollback)
+
+    dialect = engine.dialect
+    if not getattr(dialect.do_commit, "_bumps_versions", False):
+        dialect.do_commit = _bump_after_commit(dialect.do_commit)
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Dict, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from backend.core.config import settings
+from backend.core.data_versions import install_write_tracking
 
 
 # -----------------------------------------------------------------------------
@@ -27,6 +35,24 @@ def _connect_args(db_url: str) -> dict:
     return {}
 
 
+def _is_shared_file_db(url: str) -> bool:
+    """True when a second engine on this URL sees the same data."""
+    if not url.startswith("sqlite"):
+        return True
+    return not (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+
+def _async_url(url: str) -> str:
+    """Same database, async driver (aiosqlite / asyncpg)."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend == "sqlite":
+        return u.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        return u.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+
 def _ensure_sqlite_dir(db_url: str) -> None:
     if not db_url.startswith("sqlite:///"):
         return
@@ -42,6 +68,62 @@ def _ensure_sqlite_dir(db_url: str) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _sqlite_pragmas() -> Dict[str, object]:
+    """Tuned PRAGMA profile from settings (applied in this order)."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT_MS),
+        # negative = size in KiB rather than pages
+        "cache_size": -abs(int(settings.SQLITE_CACHE_SIZE_KB)),
+        "mmap_size": int(settings.SQLITE_MMAP_SIZE_BYTES),
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_conn, connection_record) -> None:
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in _sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _apply_sqlite_read_pragmas(dbapi_conn, connection_record) -> None:
+    # journal_mode is a property of the file (set by the writer); readers
+    # only get the per-connection knobs, and refuse any write
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in _sqlite_pragmas().items():
+            if name != "journal_mode":
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_profile(engine: Engine, read_only: bool = False) -> None:
+    """Apply the PRAGMA profile to every new connection (idempotent)."""
+    if engine.dialect.name != "sqlite":
+        return
+    listener = _apply_sqlite_read_pragmas if read_only else _apply_sqlite_pragmas
+    if event.contains(engine, "connect", listener):
+        return
+    event.listen(engine, "connect", listener)
+
+
+def sqlite_profile(engine: Engine) -> Dict[str, object]:
+    """Read back the PRAGMAs actually in effect on a live connection."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in _sqlite_pragmas()
+        }
+
+
 # -----------------------------------------------------------------------------
 # Engine & Session
 # -----------------------------------------------------------------------------
@@ -52,6 +134,8 @@ engine = create_engine(
     connect_args=_connect_args(settings.DATABASE_URL),
     future=True,
 )
+install_sqlite_profile(engine)
+install_write_tracking(engine)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -61,6 +145,89 @@ SessionLocal = sessionmaker(
 )
 
 
+# -----------------------------------------------------------------------------
+# Read engine (GET routes)
+# -----------------------------------------------------------------------------
+def _create_read_engine() -> Engine:
+    """
+    - READ_DATABASE_URL set      -> engine on the replica
+    - SQLite file (WAL)          -> separate pool of query_only connections,
+                                    so readers never wait for a writer's pool slot
+    - anything else (:memory:)   -> share the write engine
+    """
+    url = settings.READ_DATABASE_URL or settings.DATABASE_URL
+
+    if not settings.READ_DATABASE_URL:
+        if not url.startswith("sqlite") or not _is_shared_file_db(url):
+            return engine
+
+    read_engine = create_engine(
+        url,
+        connect_args=_connect_args(url),
+        pool_size=int(settings.READ_POOL_SIZE),
+        max_overflow=int(settings.READ_POOL_MAX_OVERFLOW),
+        pool_pre_ping=not url.startswith("sqlite"),
+        future=True,
+    )
+    install_sqlite_profile(read_engine, read_only=True)
+    return read_engine
+
+
+read_engine = _create_read_engine()
+
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    autocommit=False,
+    future=True,
+)
+
+
+# -----------------------------------------------------------------------------
+# Async engines (async def route handlers)
+# -----------------------------------------------------------------------------
+def _create_async_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    """
+    Async twin of the sync engines: same database, same PRAGMA profile and
+    write tracking (both hook the underlying sync_engine).
+    NOTE: an in-memory SQLite URL gives the async engine its own database.
+    """
+    async_engine_ = create_async_engine(_async_url(url), future=True)
+    install_sqlite_profile(async_engine_.sync_engine, read_only=read_only)
+    install_write_tracking(async_engine_.sync_engine)
+    return async_engine_
+
+
+async_engine = _create_async_engine(settings.DATABASE_URL)
+
+if settings.READ_DATABASE_URL or (
+    settings.DATABASE_URL.startswith("sqlite") and _is_shared_file_db(settings.DATABASE_URL)
+):
+    async_read_engine = _create_async_engine(
+        settings.READ_DATABASE_URL or settings.DATABASE_URL, read_only=True
+    )
+else:
+    async_read_engine = async_engine
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def dispose_async_engines() -> None:
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
 # -----------------------------------------------------------------------------
 # Model registration (IMPORT ONCE)
 # -----------------------------------------------------------------------------
@@ -74,6 +241,7 @@ def _import_models() -> None:
     import backend.models.queue  # noqa
     import backend.models.walkin  # noqa
     import backend.models.emergency  # noqa
+    import backend.models.ai_decision  # noqa
 
 
 # -----------------------------------------------------------------------------
@@ -105,3 +273,23 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Session for read-only routes (may lag a replica; never writes)."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """AsyncSession for async def routes (does not block the event loop)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,161 @@
+# backend/core/events.py
+"""
+In-process event broadcaster for live updates (SSE).
+
+- Services publish small diffs ("queue.upsert", "doctor.queue_length", ...)
+  AFTER their data is committed
+- Every connected stream gets its own bounded asyncio.Queue; publishing
+  is thread-safe, so sync routes running in the threadpool can publish
+- A subscriber that falls behind is reset with a single "resync" event
+  instead of blocking publishers
+- In-process listeners (e.g. the availability index) are called
+  synchronously by publish(), so caches follow the same committed diffs
+
+Note: one broadcaster per worker process. Clients connected to worker A
+do not see writes handled by worker B; they should resync on reconnect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# -----------------------------------------------------------------------------
+# Subscriber
+# -----------------------------------------------------------------------------
+class Subscriber:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_queue: int,
+        topics: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.topics = tuple(t for t in (topics or ()) if t)
+        self.dropped = 0
+
+    def wants(self, event_type: str) -> bool:
+        if not self.topics or event_type == "resync":
+            return True
+        return any(event_type.startswith(t) for t in self.topics)
+
+    def push(self, evt: Dict[str, Any]) -> None:
+        """Thread-safe: schedule delivery on the subscriber's loop."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, evt)
+        except RuntimeError:
+            # loop already closed (client gone during shutdown)
+            pass
+
+    def _put(self, evt: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(evt)
+        except asyncio.QueueFull:
+            # Too slow: drop the backlog and ask the client to refetch
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(
+                {"seq": evt.get("seq"), "type": "resync", "ts": evt.get("ts"), "data": {}}
+            )
+
+
+# -----------------------------------------------------------------------------
+# Broadcaster
+# -----------------------------------------------------------------------------
+class Broadcaster:
+    def __init__(self, max_queue: int = 256) -> None:
+        self.max_queue = int(max_queue)
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscriber] = set()
+        self._listeners: Tuple[Tuple[str, Callable[[str, Any], None]], ...] = ()
+        self._seq = itertools.count(1)
+        self.published_total = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscriber:
+        """Must be called from inside the running event loop."""
+        sub = Subscriber(asyncio.get_running_loop(), self.max_queue, topics)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def listen(self, prefix: str, fn: Callable[[str, Any], None]) -> None:
+        """Call fn(event_type, data) for every published event starting with prefix."""
+        with self._lock:
+            self._listeners = self._listeners + ((prefix, fn),)
+
+    def publish(self, event_type: str, data: Any) -> None:
+        for prefix, fn in self._listeners:
+            if event_type.startswith(prefix):
+                try:
+                    fn(event_type, data)
+                except Exception:
+                    logger.exception(f"Event listener failed | {event_type}")
+
+        with self._lock:
+            if not self._subscribers:
+                return
+            subscribers = list(self._subscribers)
+            evt = {
+                "seq": next(self._seq),
+                "type": event_type,
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "data": data,
+            }
+            self.published_total += 1
+
+        for sub in subscribers:
+            if sub.wants(event_type):
+                sub.push(evt)
+
+
+broadcaster = Broadcaster(max_queue=getattr(settings, "STREAM_SUBSCRIBER_QUEUE_SIZE", 256))
+
+
+# -----------------------------------------------------------------------------
+# Transaction-bound publishing
+# -----------------------------------------------------------------------------
+def publish(event_type: str, data: Any) -> None:
+    """Publish now (use only after the write is committed)."""
+    broadcaster.publish(event_type, data)
+
+
+def publish_on_commit(db: Session, event_type: str, data: Any) -> None:
+    """Publish once the session commits; dropped if it rolls back."""
+    pending: List[Tuple[str, Any]] = db.info.setdefault("pending_events", [])
+    pending.append((event_type, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_pending_events(session: Session) -> None:
+    for event_type, data in session.info.pop("pending_events", None) or ():
+        try:
+            broadcaster.publish(event_type, data)
+        except Exception:
+            logger.exception(f"Event publish failed | {event_type}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_events(session: Session) -> None:
+    session.info.pop("pending_events", None)
@@ -1,11 +1,16 @@
 # backend/models/ai_decision.py
-from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy import String, Integer, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from backend.core.database import Base
 
 
 class AIDecision(Base):
     __tablename__ = "ai_decisions"
+    # Keyset pagination (ORDER BY id DESC) under the common filters
+    __table_args__ = (
+        Index("ix_ai_decisions_event_type_id", "event_type", "id"),
+        Index("ix_ai_decisions_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     event_type: Mapped[str] = mapped_column(String(50), nullable=False)  # walkin|emergency|appointment|dashboard
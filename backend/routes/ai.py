@@ -0,0 +1,56 @@
+# backend/routes/ai.py
+
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from backend.ai_agent.agent import ai_agent
+from backend.ai_agent.observation import Observation
+from backend.core.config import settings
+from backend.core.logger import get_logger
+from backend.utils.response_utils import ok
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+class DecideBatchRequest(BaseModel):
+    observations: List[Observation]
+
+
+# -------------------------------------------------
+# POST: Triage a batch of observations
+# Final URL: POST /api/ai/decide/batch
+# -------------------------------------------------
+@router.post("/decide/batch")
+def decide_batch(request: DecideBatchRequest):
+    """
+    Triage kiosks upload vitals for a whole waiting room at once.
+    Decisions come back in input order.
+    """
+    max_items = int(getattr(settings, "AI_DECIDE_BATCH_MAX", 1000))
+    if len(request.observations) > max_items:
+        return JSONResponse(
+            status_code=413,
+            content={"success": False, "detail": f"too_many_observations (max {max_items})"},
+        )
+
+    results = ai_agent.decide_batch(request.observations)
+    logger.info(f"AI batch decisions | Count={len(results)}")
+
+    return {
+        "success": True,
+        "count": len(results),
+        "decisions": [r.model_dump(mode="json") for r in results],
+    }
+
+
+# -------------------------------------------------
+# GET: Agent + audit writer metrics (this worker)
+# Final URL: GET /api/ai/metrics
+# -------------------------------------------------
+@router.get("/metrics")
+def get_ai_metrics():
+    return ok({"agent": ai_agent.metrics.snapshot(), "audit": ai_agent.audit.stats()})
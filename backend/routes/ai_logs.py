@@ -1,10 +1,16 @@
 # backend/routes/ai_logs.py
 
-from fastapi import APIRouter, Depends
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import String, select, type_coerce
 
-from backend.core.database import get_db
+from backend.ai_agent.agent import ai_agent
+from backend.ai_agent.audit_query import query_audit
+from backend.core.database import get_db, get_read_db
 from backend.models.ai_decision import AIDecision
 from backend.utils.response_utils import ok, fail
 
@@ -12,16 +18,71 @@ router = APIRouter()
 
 
 # -------------------------------------------------
-# GET: AI Logs
+# Helpers
+# -------------------------------------------------
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _db_time(value: datetime, upper: bool = False) -> str:
+    """
+    Bound for a text comparison against created_at: naive UTC stored as
+    'YYYY-MM-DD HH:MM:SS' (CURRENT_TIMESTAMP) or with '.ffffff' (ORM
+    writes). A whole-second lower bound leaves the fraction off, and an
+    upper bound always carries it, so rows exactly on a bound match in
+    either spelling.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if value.microsecond or upper:
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# -------------------------------------------------
+# GET: AI Logs (keyset pagination, newest first)
 # Final URL: GET /api/ai-logs
+# Next page: GET /api/ai-logs?cursor=<next_cursor>
 # -------------------------------------------------
 @router.get("/")
-def get_ai_logs(db: Session = Depends(get_db)):
-    logs = (
-        db.execute(select(AIDecision).order_by(AIDecision.id.desc()).limit(200))
-        .scalars()
-        .all()
-    )
+@router.get("/decisions")  # ✅ COMPATIBILITY ENDPOINT (Frontend expects this)
+def get_ai_logs(
+    cursor: Optional[int] = Query(None, ge=1, description="next_cursor of the previous page"),
+    limit: int = Query(200, ge=1, le=500),
+    event_type: Optional[str] = Query(None, description="Comma-separated"),
+    min_confidence: Optional[int] = Query(None, ge=0, le=100),
+    max_confidence: Optional[int] = Query(None, ge=0, le=100),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Pages seek on id (WHERE id < cursor ORDER BY id DESC), so a deep page
+    costs the same as the first one. next_cursor is null on the last page.
+    """
+    stmt = select(AIDecision)
+    if cursor is not None:
+        stmt = stmt.where(AIDecision.id < cursor)
+    if event_type:
+        types = [t.strip() for t in event_type.split(",") if t.strip()]
+        stmt = stmt.where(AIDecision.event_type.in_(types))
+    if min_confidence is not None:
+        stmt = stmt.where(AIDecision.confidence >= min_confidence)
+    if max_confidence is not None:
+        stmt = stmt.where(AIDecision.confidence <= max_confidence)
+    # Compared as stored text (no CAST), so the created_at index still applies
+    created_at = type_coerce(AIDecision.created_at, String)
+    if since is not None:
+        stmt = stmt.where(created_at >= _db_time(since))
+    if until is not None:
+        stmt = stmt.where(created_at <= _db_time(until, upper=True))
+
+    # One extra row tells whether another page exists
+    logs = db.execute(stmt.order_by(AIDecision.id.desc()).limit(limit + 1)).scalars().all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
 
     data = [
         {
@@ -38,7 +99,9 @@ def get_ai_logs(db: Session = Depends(get_db)):
         for l in logs
     ]
 
-    return ok(data)
+    body = ok(data)
+    body["next_cursor"] = logs[-1].id if has_more else None
+    return body
 
 
 # -------------------------------------------------
@@ -68,9 +131,33 @@ def post_ai_log(payload: dict, db: Session = Depends(get_db)):
 
 
 # -------------------------------------------------
-# ✅ COMPATIBILITY ENDPOINT (Frontend expects this)
-# Final URL: GET /api/ai-logs/decisions
+# GET: Stream the JSONL audit trail (NDJSON)
+# Final URL: GET /api/ai-logs/audit
 # -------------------------------------------------
-@router.get("/decisions")
-def get_ai_decisions(db: Session = Depends(get_db)):
-    return get_ai_logs(db)
+@router.get("/audit")
+def stream_audit(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    priority: Optional[str] = Query(None, description="Comma-separated, e.g. high,critical"),
+    rule: Optional[str] = Query(None, description="Triggered rule code, e.g. CRIT_SPO2_LT_90"),
+    patient_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    Audit events written by AIAuditLogger, oldest first, one JSON per line.
+    Naive timestamps are taken as UTC. Streams in constant memory.
+    """
+    if since is not None and until is not None and _utc(since) > _utc(until):
+        return fail("since_after_until", 422)
+
+    priorities = [p.strip() for p in priority.split(",") if p.strip()] if priority else None
+    lines = query_audit(
+        ai_agent.audit.segments,
+        since=_utc(since),
+        until=_utc(until),
+        priorities=priorities,
+        rule=rule,
+        patient_id=patient_id,
+        limit=limit,
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
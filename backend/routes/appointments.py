@@ -1,25 +1,32 @@
 # backend/routes/appointments.py
 
 from datetime import date, datetime, time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.ai_agent.agent import ai_agent
-from backend.core.database import get_db
+from backend.core.config import settings
+from backend.core.database import get_async_db, get_async_read_db, get_db
 from backend.core.logger import get_logger
 from backend.models.appointment import Appointment
-from backend.services.doctor_service import DoctorService
+from backend.services.doctor_service import AsyncDoctorService
 from backend.services.appointment_service import (
-    create_appointment,
-    update_status,
+    create_appointment_async,
+    create_appointments_bulk,
+    list_appointments_async,
+    update_status_async,
 )
+from backend.utils.import_utils import parse_import_rows
+from backend.utils.response_utils import fail, ok
 
 router = APIRouter()
 logger = get_logger(__name__)
-doctor_service = DoctorService()
+doctor_service = AsyncDoctorService()
 
 
 # ------------------------------------------------------------------
@@ -72,14 +79,14 @@ class AppointmentStatusUpdateRequest(BaseModel):
 @router.post("/book")
 async def book_appointment(
     request: AppointmentBookingRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         # ----------------------------------------------------------
         # 1) GET DEPARTMENT FROM DOCTOR (SINGLE SOURCE OF TRUTH)
         #    Use the correct DoctorService method (get_doctor_by_id)
         # ----------------------------------------------------------
-        doctor = doctor_service.get_doctor_by_id(db, request.doctor_id)
+        doctor = await doctor_service.get_doctor_by_id(db, request.doctor_id)
 
         if not doctor:
             raise HTTPException(status_code=400, detail="Invalid doctor_id")
@@ -125,18 +132,18 @@ async def book_appointment(
             "notes": request.notes,
         }
 
-        appt = create_appointment(db, payload)
+        appt = await create_appointment_async(db, payload)
 
         # Queue increment ONLY after appointment exists
         if appt.doctor_id:
-            doctor_service.update_queue_length(
+            await doctor_service.update_queue_length(
                 db=db,
                 doctor_id=appt.doctor_id,
                 increment=1,
             )
 
-        db.commit()
-        db.refresh(appt)
+        await db.commit()
+        await db.refresh(appt)
 
         logger.info(f"Appointment booked | ID={appt.id}")
 
@@ -154,13 +161,80 @@ async def book_appointment(
         raise HTTPException(status_code=500, detail="Appointment booking failed")
 
 
+@router.post("/bulk")
+async def book_appointments_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk booking (camp days).
+
+    Body: JSON array of booking objects (same fields as POST /book), or CSV
+    with those column names and Content-Type: text/csv.
+    Rows are booked as SCHEDULED without a per-row AI call.
+    """
+    try:
+        rows = parse_import_rows(await request.body(), request.headers.get("content-type"))
+    except ValueError as e:
+        return fail(str(e), 422)
+
+    max_rows = int(getattr(settings, "BULK_IMPORT_MAX_ROWS", 5000))
+    if len(rows) > max_rows:
+        return fail(f"too_many_rows (max {max_rows})", 413)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+    payloads: List[Dict[str, Any]] = []
+    row_index: List[int] = []
+
+    for i, row in enumerate(rows):
+        try:
+            req = AppointmentBookingRequest.model_validate(row)
+            scheduled_at = _parse_scheduled_at(req.preferred_date, req.preferred_time)
+        except ValidationError as e:
+            results[i] = {"row": i, "ok": False, "error": e.errors(include_url=False)}
+            continue
+        except HTTPException as e:
+            results[i] = {"row": i, "ok": False, "error": e.detail}
+            continue
+
+        payloads.append(
+            {
+                "patient_name": req.patient_name,
+                "patient_phone": req.patient_phone,
+                "doctor_id": req.doctor_id,
+                "scheduled_at": scheduled_at,
+                "appointment_type": req.appointment_type.upper(),
+                "status": "SCHEDULED",
+                "ai_decision_id": None,
+                "estimated_wait_time": None,
+                "notes": req.notes,
+            }
+        )
+        row_index.append(i)
+
+    created = await run_in_threadpool(create_appointments_bulk, db, payloads)
+    for i, r in zip(row_index, created):
+        results[i] = {"row": i, **r}
+
+    n_ok = sum(1 for r in results if r and r["ok"])
+    return ok(
+        {
+            "total": len(rows),
+            "created": n_ok,
+            "failed": len(rows) - n_ok,
+            "results": results,
+        },
+        message="appointments_imported",
+    )
+
+
 @router.patch("/{appointment_id}/status")
 async def update_appointment_status(
     appointment_id: int,
     request: AppointmentStatusUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    appt = update_status(
+    appt = await update_status_async(
         db=db,
         appointment_id=appointment_id,
         new_status=request.status.upper(),
@@ -169,8 +243,8 @@ async def update_appointment_status(
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    db.commit()
-    db.refresh(appt)
+    await db.commit()
+    await db.refresh(appt)
 
     return {"success": True, "appointment": _to_dict(appt)}
 
@@ -180,32 +254,37 @@ async def list_appointments(
     date: Optional[str] = None,
     department: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    q = db.query(Appointment)
-
-    if status:
-        q = q.filter(Appointment.status == status.upper())
-
+    scheduled_from = scheduled_to = None
     if date:
-        d = date.fromisoformat(date)
-        q = q.filter(
-            Appointment.scheduled_at >= datetime.combine(d, time.min),
-            Appointment.scheduled_at <= datetime.combine(d, time.max),
-        )
+        # `date` (the query param) shadows datetime.date here
+        try:
+            d = datetime.fromisoformat(date).date()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid date format: {e}")
+        scheduled_from = datetime.combine(d, time.min)
+        scheduled_to = datetime.combine(d, time.max)
+
+    appointments = await list_appointments_async(
+        db,
+        status=status.upper() if status else None,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+    )
 
     return {
         "success": True,
-        "appointments": [_to_dict(a) for a in q.order_by(Appointment.id.desc()).all()],
+        "appointments": [_to_dict(a) for a in appointments],
     }
 
 
 @router.get("/{appointment_id}")
 async def get_appointment(
     appointment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    appt = db.get(Appointment, appointment_id)
+    appt = await db.get(Appointment, appointment_id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
@@ -1,44 +1,74 @@
 # backend/routes/availability.py
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
 from backend.core.database import get_db
+from backend.services.availability_index import availability_index, to_minute
+from backend.utils.etag_utils import conditional_get
 from backend.utils.response_utils import ok
 
 router = APIRouter()
 
+_FIELDS = ("name", "specialization", "department", "is_available", "shift_start", "shift_end")
+
 
 @router.get("/")
-def get_availability(db: Session = Depends(get_db)):
+def get_availability(
+    request: Request,
+    response: Response,
+    department: Optional[str] = None,
+    at: Optional[str] = None,
+    on_shift_only: bool = False,
+    db: Session = Depends(get_db),
+):
     """
     Lightweight polling endpoint for frontend auto-refresh.
+    Send If-None-Match to get 304 while doctors are unchanged.
+
+    Filters (served from the in-memory shift index):
+    - department
+    - on_shift_only: doctors on shift at `at` ("HH:MM", default now)
 
     Final URL:
     GET /api/availability
     """
+    if at is not None:
+        try:
+            minute = to_minute(at)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    else:
+        minute = None
+
+    # "Now" moves: an on-shift listing without `at` changes every minute
+    time_key = ""
+    if on_shift_only:
+        time_key = str(minute if minute is not None else to_minute(datetime.now()))
+
+    # Only roster fields are served (no queue counters), so the tag follows
+    # roster changes rather than every doctors write; checked before any
+    # rebuild, so a 304 does no database work
+    extra = f"{time_key}|{availability_index.roster_version}"
+    not_modified = conditional_get(request, response, (), extra=extra)
+    if not_modified:
+        return not_modified
+
+    # In memory unless a roster change is pending; rebuilds read the
+    # primary (db), never a lagging replica
+    index = availability_index.current(db)
+    if on_shift_only:
+        doctors = index.on_shift(department, minute)
+    elif department:
+        doctors = [d for d in index.doctors if d.get("department") == department]
+    else:
+        doctors = index.doctors
 
-    rows = (
-        db.execute(
-            text(
-                """
-                SELECT
-                    id AS doctor_id,
-                    name,
-                    specialization,
-                    department,
-                    is_available,
-                    shift_start,
-                    shift_end
-                FROM doctors
-                WHERE deleted_at IS NULL
-                ORDER BY name ASC
-                """
-            )
-        )
-        .mappings()
-        .all()
-    )
-
-    return ok(list(rows))
+    rows = [
+        {"doctor_id": d["id"], **{k: d.get(k) for k in _FIELDS}}
+        for d in sorted(doctors, key=lambda d: d.get("name") or "")
+    ]
+    return ok(rows)
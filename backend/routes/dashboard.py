@@ -1,117 +1,95 @@
-from fastapi import APIRouter, Depends
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from backend.core.database import get_db
+from backend.core.cache import TTLCache
+from backend.core.config import settings as app_settings
+from backend.core.database import get_read_db
 from backend.core.settings import settings
+from backend.utils.etag_utils import conditional_get
 from backend.utils.response_utils import ok
 
 router = APIRouter()
 
+# Shared by /summary and /overview; dropped on any write to these tables
+_SUMMARY_TABLES = ("doctors", "appointments", "walkins", "emergency_cases", "queue_items")
+_summary_cache = TTLCache(
+    ttl_seconds=getattr(app_settings, "DASHBOARD_CACHE_TTL_SECONDS", 5.0),
+    tables=_SUMMARY_TABLES,
+)
 
-def _safe_count(db: Session, query: str, params: dict | None = None) -> int:
+# One round trip: doctors aggregated with conditional SUM,
+# every other table as a scalar sub-select.
+# Plain status comparisons (no UPPER()) so the status indexes are used.
+# Appointments are booked as SCHEDULED but status updates store lower
+# case, and emergencies created before statuses were upper-cased may be
+# stored as 'open', hence both spellings there.
+_SUMMARY_SQL = text(
     """
-    Executes COUNT(*) safely.
-    If table/column is missing, returns 0 instead of crashing.
+    SELECT
+        COUNT(*) AS doctors_total,
+        COALESCE(SUM(CASE WHEN d.status = :available THEN 1 ELSE 0 END), 0)
+            AS doctors_available,
+        (SELECT COUNT(*) FROM appointments
+          WHERE status IN ('SCHEDULED', 'CHECKED_IN', 'scheduled', 'checked_in'))
+            AS appointments_open,
+        (SELECT COUNT(*) FROM walkins
+          WHERE status = 'WAITING')
+            AS walkins_waiting,
+        (SELECT COUNT(*) FROM emergency_cases
+          WHERE status IN ('OPEN', 'open'))
+            AS emergency_open,
+        (SELECT COUNT(*) FROM queue_items
+          WHERE status = 'WAITING')
+            AS queue_waiting
+    FROM doctors d
+    WHERE d.deleted_at IS NULL
     """
-    try:
-        return int(db.execute(text(query), params or {}).scalar() or 0)
-    except Exception:
-        return 0
-
+)
 
-@router.get("/summary")
-def get_dashboard_summary(db: Session = Depends(get_db)):
-    # ------------------------------------------------
-    # Doctors
-    # ------------------------------------------------
-    doctors_total = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM doctors
-        WHERE deleted_at IS NULL
-        """,
-    )
 
-    doctors_available = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM doctors
-        WHERE status = :available
-          AND deleted_at IS NULL
-        """,
+def _load_summary(db: Session) -> Dict[str, Any]:
+    row = db.execute(
+        _SUMMARY_SQL,
         {"available": getattr(settings, "STATUS_AVAILABLE", "available")},
-    )
+    ).mappings().one()
 
-    # ------------------------------------------------
-    # Appointments (OPEN = scheduled + checked_in)
-    # ------------------------------------------------
-    appointments_open = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM appointments
-        WHERE status IN ('SCHEDULED', 'CHECKED_IN')
-        """,
-    )
+    return {
+        "doctors": {
+            "total": int(row["doctors_total"] or 0),
+            "available": int(row["doctors_available"] or 0),
+        },
+        "counts": {
+            "appointments_open": int(row["appointments_open"] or 0),
+            "walkins_waiting": int(row["walkins_waiting"] or 0),
+            "emergency_open": int(row["emergency_open"] or 0),
+            "queue_waiting": int(row["queue_waiting"] or 0),
+        },
+    }
 
-    # ------------------------------------------------
-    # Walk-ins (safe)
-    # ------------------------------------------------
-    walkins_waiting = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM walkins
-        WHERE status IN ('WAITING', 'waiting')
-        """,
-    )
 
-    # ------------------------------------------------
-    # Emergency cases (safe)
-    # ------------------------------------------------
-    emergency_open = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM emergencies
-        WHERE status IN ('OPEN', 'open')
-        """,
-    )
-
-    # ------------------------------------------------
-    # Queue (waiting only) (safe)
-    # ------------------------------------------------
-    queue_waiting = _safe_count(
-        db,
-        """
-        SELECT COUNT(*)
-        FROM queue
-        WHERE status IN ('WAITING', 'waiting')
-        """,
-    )
+@router.get("/summary")
+def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    not_modified = conditional_get(request, response, _SUMMARY_TABLES)
+    if not_modified:
+        return not_modified
 
-    return ok(
-        {
-            "doctors": {
-                "total": doctors_total,
-                "available": doctors_available,
-            },
-            "counts": {
-                "appointments_open": appointments_open,
-                "walkins_waiting": walkins_waiting,
-                "emergency_open": emergency_open,
-                "queue_waiting": queue_waiting,
-            },
-        }
-    )
+    return ok(_summary_cache.get_or_set(lambda: _load_summary(db)))
 
 
 # ✅ BACKWARD COMPATIBILITY:
 # If frontend is calling /api/dashboard/overview
 # we return the same response.
 @router.get("/overview")
-def get_dashboard_overview(db: Session = Depends(get_db)):
-    return get_dashboard_summary(db)
+def get_dashboard_overview(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    return get_dashboard_summary(request, response, db)
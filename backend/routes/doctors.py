@@ -3,19 +3,27 @@ SmartCare Flow - Doctor Management Routes
 Admin interface for doctor setup and availability
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.cache import TTLCache
 from backend.core.config import settings
 from backend.core.logger import get_logger
-from backend.core.database import get_db
-from backend.services.doctor_service import DoctorService
+from backend.core.database import get_async_db, get_async_read_db
+from backend.services.doctor_service import AsyncDoctorService
+from backend.utils.etag_utils import conditional_get
 
 router = APIRouter()
 logger = get_logger(__name__)
-doctor_service = DoctorService()
+doctor_service = AsyncDoctorService()
+
+# Snapshot for the workload grid; any doctor / queue write invalidates it
+_workload_cache = TTLCache(
+    ttl_seconds=getattr(settings, "WORKLOAD_SNAPSHOT_TTL_SECONDS", 2.0),
+    tables=("doctors", "queue_items"),
+)
 
 
 # -----------------------------
@@ -42,9 +50,9 @@ class DoctorUpdateRequest(BaseModel):
 # Fixed-path endpoints FIRST
 # -----------------------------
 @router.get("/stats/overview")
-async def get_doctor_stats(db: Session = Depends(get_db)):
+async def get_doctor_stats(db: AsyncSession = Depends(get_async_read_db)):
     try:
-        stats = doctor_service.get_statistics(db=db)
+        stats = await doctor_service.get_statistics(db=db)
         return {"success": True, "stats": stats}
     except Exception as e:
         logger.error(f"Error fetching stats: {e}")
@@ -52,7 +60,7 @@ async def get_doctor_stats(db: Session = Depends(get_db)):
 
 
 @router.get("/department/{department}/summary")
-async def get_department_summary(department: str, db: Session = Depends(get_db)):
+async def get_department_summary(department: str, db: AsyncSession = Depends(get_async_read_db)):
     try:
         department_norm = department.strip().upper().replace(" ", "_")
 
@@ -62,7 +70,7 @@ async def get_department_summary(department: str, db: Session = Depends(get_db))
                 detail=f"Invalid department. Available: {settings.DEPARTMENTS}",
             )
 
-        summary = doctor_service.get_department_summary(
+        summary = await doctor_service.get_department_summary(
             db=db, department=department_norm
         )
         return {"success": True, "department": department_norm, "summary": summary}
@@ -74,11 +82,44 @@ async def get_department_summary(department: str, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/workload")
+async def get_all_workloads(
+    department: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Workload of every doctor (same fields as /{doctor_id}/workload)."""
+    try:
+        dept_norm = (
+            department.strip().upper().replace(" ", "_") if department else None
+        )
+        workloads = await _workload_cache.aget_or_set(
+            lambda: doctor_service.get_all_workloads(db=db, department=dept_norm),
+            key=dept_norm,
+        )
+        return {"success": True, "count": len(workloads), "workloads": workloads}
+    except Exception as e:
+        logger.error(f"Error fetching workloads: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/departments/summary")
+async def get_all_department_summaries(db: AsyncSession = Depends(get_async_read_db)):
+    """Every department's summary from one grouped query."""
+    try:
+        summaries = await doctor_service.get_all_department_summaries(
+            db=db, departments=settings.DEPARTMENTS
+        )
+        return {"success": True, "departments": summaries}
+    except Exception as e:
+        logger.error(f"Error fetching department summaries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # -----------------------------
 # Collection endpoints
 # -----------------------------
 @router.post("/")
-async def create_doctor(request: DoctorCreateRequest, db: Session = Depends(get_db)):
+async def create_doctor(request: DoctorCreateRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Create new doctor profile
     Admin only
@@ -103,7 +144,7 @@ async def create_doctor(request: DoctorCreateRequest, db: Session = Depends(get_
                 detail=f"Invalid status. Available: {valid_statuses}",
             )
 
-        doctor = doctor_service.create_doctor(
+        doctor = await doctor_service.create_doctor(
             db=db,
             name=request.name,
             department=department,
@@ -129,18 +170,24 @@ async def create_doctor(request: DoctorCreateRequest, db: Session = Depends(get_
 
 @router.get("/")
 async def get_doctors(
+    request: Request,
+    response: Response,
     department: Optional[str] = None,
     status: Optional[str] = None,
     available_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
+    not_modified = conditional_get(request, response, ("doctors",))
+    if not_modified:
+        return not_modified
+
     try:
         dept_norm = (
             department.strip().upper().replace(" ", "_") if department else None
         )
         status_norm = status.strip().upper() if status else None
 
-        doctors = doctor_service.get_doctors(
+        doctors = await doctor_service.get_doctors(
             db=db,
             department=dept_norm,
             status=status_norm,
@@ -158,9 +205,9 @@ async def get_doctors(
 # Per-doctor endpoints
 # -----------------------------
 @router.get("/{doctor_id}")
-async def get_doctor(doctor_id: str, db: Session = Depends(get_db)):
+async def get_doctor(doctor_id: str, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        doctor = doctor_service.get_doctor_by_id(db=db, doctor_id=doctor_id)
+        doctor = await doctor_service.get_doctor_by_id(db=db, doctor_id=doctor_id)
         if not doctor:
             raise HTTPException(status_code=404, detail="Doctor not found")
         return {"success": True, "doctor": doctor}
@@ -174,12 +221,12 @@ async def get_doctor(doctor_id: str, db: Session = Depends(get_db)):
 
 @router.patch("/{doctor_id}")
 async def update_doctor(
-    doctor_id: str, request: DoctorUpdateRequest, db: Session = Depends(get_db)
+    doctor_id: str, request: DoctorUpdateRequest, db: AsyncSession = Depends(get_async_db)
 ):
     try:
         status_norm = request.status.strip().upper() if request.status else None
 
-        doctor = doctor_service.update_doctor(
+        doctor = await doctor_service.update_doctor(
             db=db,
             doctor_id=doctor_id,
             name=request.name,
@@ -207,9 +254,9 @@ async def update_doctor(
 
 
 @router.delete("/{doctor_id}")
-async def delete_doctor(doctor_id: str, db: Session = Depends(get_db)):
+async def delete_doctor(doctor_id: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        result = doctor_service.delete_doctor(db=db, doctor_id=doctor_id)
+        result = await doctor_service.delete_doctor(db=db, doctor_id=doctor_id)
         if not result:
             raise HTTPException(status_code=404, detail="Doctor not found")
 
@@ -224,9 +271,9 @@ async def delete_doctor(doctor_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{doctor_id}/queue")
-async def get_doctor_queue(doctor_id: str, db: Session = Depends(get_db)):
+async def get_doctor_queue(doctor_id: str, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        queue_info = doctor_service.get_doctor_queue(db=db, doctor_id=doctor_id)
+        queue_info = await doctor_service.get_doctor_queue(db=db, doctor_id=doctor_id)
         if not queue_info:
             raise HTTPException(status_code=404, detail="Doctor not found")
         return {"success": True, "queue": queue_info}
@@ -239,9 +286,9 @@ async def get_doctor_queue(doctor_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{doctor_id}/workload")
-async def get_doctor_workload(doctor_id: str, db: Session = Depends(get_db)):
+async def get_doctor_workload(doctor_id: str, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        workload = doctor_service.get_doctor_workload(db=db, doctor_id=doctor_id)
+        workload = await doctor_service.get_doctor_workload(db=db, doctor_id=doctor_id)
         if not workload:
             raise HTTPException(status_code=404, detail="Doctor not found")
         return {"success": True, "workload": workload}
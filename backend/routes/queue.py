@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from backend.core.database import get_db
+from backend.core.database import get_db, get_read_db
 from backend.services.queue_service import (
     list_queue,
     mark_in_progress,
     complete_item,
 )
+from backend.utils.etag_utils import conditional_get
 from backend.utils.response_utils import ok
 from backend.utils.priority_utils import normalize_priority  # ✅ FIX priority
 
@@ -19,15 +20,26 @@ router = APIRouter()
 
 @router.get("/")
 def get_queue(
+    request: Request,
+    response: Response,
     doctor_id: str | None = None,
     only_waiting: bool = Query(True),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
 ):
     """
     Final URL:
     GET /api/queue/
+    (ETag / If-None-Match supported)
+
+    The resident queue engine loads from the primary (`db`); only the
+    full-history listing reads the replica (`read_db`).
     """
-    items = list_queue(db=db, doctor_id=doctor_id, only_waiting=only_waiting)
+    not_modified = conditional_get(request, response, ("queue_items",))
+    if not_modified:
+        return not_modified
+
+    items = list_queue(db=db, doctor_id=doctor_id, only_waiting=only_waiting, read_db=read_db)
 
     data = [
         {
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func
 
-from backend.core.database import get_db
+from backend.core.database import get_read_db
 from backend.models.appointment import Appointment
 from backend.models.walkin import WalkIn
 from backend.models.emergency import EmergencyCase
@@ -14,7 +14,7 @@ router = APIRouter()
 
 
 @router.get("/overview")
-def get_reports_overview(db: Session = Depends(get_db)):
+def get_reports_overview(db: Session = Depends(get_read_db)):
     """
     Final URL:
     GET /api/reports/overview
@@ -55,7 +55,7 @@ def get_reports_overview(db: Session = Depends(get_db)):
 
 # ✅ FRONTEND COMPATIBILITY
 @router.get("/analytics")
-def get_reports_analytics(db: Session = Depends(get_db)):
+def get_reports_analytics(db: Session = Depends(get_read_db)):
     """
     Final URL:
     GET /api/reports/analytics
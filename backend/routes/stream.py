@@ -0,0 +1,65 @@
+# backend/routes/stream.py
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from backend.core.config import settings
+from backend.core.events import broadcaster
+
+router = APIRouter()
+
+
+def _sse(evt: Dict[str, Any]) -> str:
+    data = json.dumps(evt, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"id: {evt.get('seq', '')}\nevent: {evt['type']}\ndata: {data}\n\n"
+
+
+@router.get("/")
+async def stream_events(request: Request, topics: Optional[str] = None):
+    """
+    Server-sent events: live diffs instead of polling.
+
+    Event types:
+      queue.upsert | queue.remove | queue.resync
+      doctor.upsert | doctor.remove | doctor.queue_length | doctors.resync
+      walkin.created | walkin.status
+      emergency.created | emergency.status
+      resync  (client fell behind -> refetch /api/queue and /api/availability)
+
+    ?topics=queue,doctor limits the stream to those event-type prefixes.
+
+    Final URL:
+    GET /api/stream
+    """
+    topic_list = [t.strip() for t in (topics or "").split(",") if t.strip()]
+    sub = broadcaster.subscribe(topics=topic_list)
+    keepalive = float(getattr(settings, "STREAM_KEEPALIVE_SECONDS", 15.0))
+
+    async def event_source() -> AsyncIterator[str]:
+        try:
+            yield "retry: 3000\n\n"
+            yield _sse({"seq": 0, "type": "hello", "data": {"topics": topic_list}})
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    evt = await asyncio.wait_for(sub.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(evt)
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,59 +1,23 @@
 # backend/routes/walkins.py
 
-from typing import Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 
+from backend.core.config import settings
 from backend.core.database import get_db
-from backend.services.walkin_service import list_walkins, create_walkin, update_status
-from backend.services.queue_service import enqueue
-from backend.utils.response_utils import ok
+from backend.services.walkin_service import list_walkins, normalize_priority_to_int, update_status
+from backend.services.intake_service import intake_walkin, intake_walkins_bulk
+from backend.utils.import_utils import parse_import_rows
+from backend.utils.response_utils import ok, fail
 from backend.utils.validators import not_empty
 
 router = APIRouter()
 
 
-# ------------------------------------------------------------------
-# Helpers
-# ------------------------------------------------------------------
-def normalize_priority_to_int(value: Union[int, str, None]) -> int:
-    """
-    Accepts: "normal" | "high" | "critical" OR integer values.
-    Stores in DB as integer:
-      5 = CRITICAL
-      4 = HIGH
-      3 = NORMAL
-      1 = LOW
-    """
-    if value is None:
-        return 3
-
-    if isinstance(value, (int, float)):
-        n = int(value)
-        if n >= 5:
-            return 5
-        if n == 4:
-            return 4
-        if n == 3:
-            return 3
-        return 1
-
-    s = str(value).strip().lower()
-
-    if s in ("critical", "crit", "emergency", "p0"):
-        return 5
-    if s in ("high", "urgent", "p1"):
-        return 4
-    if s in ("normal", "medium", "routine", "standard", "p2"):
-        return 3
-    if s in ("low", "p3"):
-        return 1
-
-    return 3
-
-
 # ------------------------------------------------------------------
 # Request Models
 # ------------------------------------------------------------------
@@ -102,25 +66,73 @@ def post_walkin(request: WalkinCreateRequest, db: Session = Depends(get_db)):
         payload = request.model_dump()
         payload["priority"] = normalize_priority_to_int(payload.get("priority"))
 
-        # ✅ create walkin (committed inside service)
-        walkin = create_walkin(db, payload)
-
-        # ✅ enqueue (committed inside queue service)
-        enqueue(
-            db=db,
-            source_type="walkin",
-            source_id=walkin.id,
-            doctor_id=walkin.assigned_doctor_id,
-            priority=walkin.priority,
-        )
+        # ✅ walk-in + queue row + doctor counter in ONE transaction
+        result = intake_walkin(db, payload)
 
-        return ok({"id": walkin.id}, message="walkin_created")
+        return ok({"id": result["walkin_id"]}, message="walkin_created")
 
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk")
+async def post_walkins_bulk(request: Request, db: Session = Depends(get_db)):
+    """
+    Bulk registration (drills / camp days).
+
+    Body: JSON array of walk-in objects (same fields as POST /), or CSV
+    with those column names and Content-Type: text/csv.
+    Invalid rows are reported, valid rows are still registered.
+
+    Final URL:
+    POST /api/walkins/bulk
+    """
+    try:
+        rows = parse_import_rows(await request.body(), request.headers.get("content-type"))
+    except ValueError as e:
+        return fail(str(e), 422)
+
+    max_rows = int(getattr(settings, "BULK_IMPORT_MAX_ROWS", 5000))
+    if len(rows) > max_rows:
+        return fail(f"too_many_rows (max {max_rows})", 413)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+    payloads: List[dict] = []
+    row_index: List[int] = []
+
+    for i, row in enumerate(rows):
+        try:
+            req = WalkinCreateRequest.model_validate(row)
+            not_empty(req.patient_name, "patient_name")
+        except ValidationError as e:
+            results[i] = {"row": i, "ok": False, "error": e.errors(include_url=False)}
+            continue
+        except ValueError as e:
+            results[i] = {"row": i, "ok": False, "error": str(e)}
+            continue
+
+        payload = req.model_dump()
+        payload["priority"] = normalize_priority_to_int(payload.get("priority"))
+        payloads.append(payload)
+        row_index.append(i)
+
+    created = await run_in_threadpool(intake_walkins_bulk, db, payloads)
+    for i, r in zip(row_index, created):
+        results[i] = {"row": i, **r}
+
+    n_ok = sum(1 for r in results if r and r["ok"])
+    return ok(
+        {
+            "total": len(rows),
+            "created": n_ok,
+            "failed": len(rows) - n_ok,
+            "results": results,
+        },
+        message="walkins_imported",
+    )
+
+
 @router.patch("/{walkin_id}/status")
 def patch_walkin_status(
     walkin_id: int,
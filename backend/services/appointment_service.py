@@ -1,15 +1,22 @@
 # backend/services/appointment_service.py
 
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
 
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend.core.config import settings
 from backend.core.logger import get_logger
 from backend.models.appointment import Appointment
-from backend.services.doctor_service import DoctorService
+from backend.models.doctor import Doctor
+from backend.services.doctor_service import AsyncDoctorService, DoctorService
+from backend.utils.import_utils import chunked
 
 logger = get_logger(__name__)
 doctor_service = DoctorService()
+async_doctor_service = AsyncDoctorService()
 
 # Statuses that REMOVE a patient from the queue
 QUEUE_EXIT_STATUSES = {"completed", "cancelled", "no_show"}
@@ -32,6 +39,74 @@ def create_appointment(db: Session, payload: Dict[str, Any]) -> Appointment:
     return appt
 
 
+# -----------------------------------------------------------------------------
+# Bulk Create (ONE TRANSACTION PER CHUNK)
+# -----------------------------------------------------------------------------
+def create_appointments_bulk(
+    db: Session,
+    payloads: Sequence[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Insert many appointment rows (executemany ... RETURNING).
+
+    - Unknown / deleted doctor_ids are rejected per row (one lookup query)
+    - Doctor counters get ONE atomic UPDATE per doctor per chunk
+    - BULK_IMPORT_CHUNK_SIZE rows per transaction; a failing chunk is
+      rolled back on its own
+    - Returns one result per payload, in input order
+    """
+    doctor_ids = {p["doctor_id"] for p in payloads if p.get("doctor_id")}
+    known = set(
+        db.execute(
+            select(Doctor.id).where(
+                Doctor.id.in_(doctor_ids),
+                Doctor.deleted_at.is_(None),
+            )
+        ).scalars()
+    ) if doctor_ids else set()
+
+    out: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+    valid: List[int] = []
+    for i, p in enumerate(payloads):
+        if p.get("doctor_id") and p["doctor_id"] not in known:
+            out[i] = {"ok": False, "error": "Invalid doctor_id"}
+        else:
+            valid.append(i)
+
+    chunk_size = int(getattr(settings, "BULK_IMPORT_CHUNK_SIZE", 500))
+    for chunk in chunked(valid, chunk_size):
+        rows = [payloads[i] for i in chunk]
+        try:
+            ids = db.scalars(
+                insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+
+            deltas: Dict[str, int] = {}
+            for r in rows:
+                if r.get("doctor_id"):
+                    deltas[r["doctor_id"]] = deltas.get(r["doctor_id"], 0) + 1
+            for doctor_id, n in deltas.items():
+                doctor_service.update_queue_length(db=db, doctor_id=doctor_id, increment=n)
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Bulk appointment chunk failed | Rows={len(rows)}")
+            for i in chunk:
+                out[i] = {"ok": False, "error": str(e)}
+            continue
+
+        for i, appt_id in zip(chunk, ids):
+            out[i] = {"ok": True, "appointment_id": appt_id, "doctor_id": payloads[i].get("doctor_id")}
+
+    logger.info(
+        f"Bulk appointments | Rows={len(payloads)} | "
+        f"Created={sum(1 for r in out if r and r['ok'])}"
+    )
+    return out  # type: ignore[return-value]
+
+
 # -----------------------------------------------------------------------------
 # Read
 # -----------------------------------------------------------------------------
@@ -44,6 +119,10 @@ def list_appointments(db: Session, limit: int = 200) -> List[Appointment]:
     )
 
 
+def _leaves_queue(old_status: str, new_status: str) -> bool:
+    return old_status not in QUEUE_EXIT_STATUSES and new_status in QUEUE_EXIT_STATUSES
+
+
 # -----------------------------------------------------------------------------
 # Update Status (CRITICAL – QUEUE SAFE)
 # -----------------------------------------------------------------------------
@@ -82,11 +161,7 @@ def update_status(
     appt.status = new_status
 
     # ---------------- Queue handling ----------------
-    if (
-        appt.doctor_id
-        and old_status not in QUEUE_EXIT_STATUSES
-        and new_status in QUEUE_EXIT_STATUSES
-    ):
+    if appt.doctor_id and _leaves_queue(old_status, new_status):
         doctor_service.update_queue_length(
             db=db,
             doctor_id=appt.doctor_id,
@@ -99,3 +174,74 @@ def update_status(
 
     db.flush()
     return appt
+
+
+# -----------------------------------------------------------------------------
+# Async variants (AsyncSession, same semantics as above)
+# -----------------------------------------------------------------------------
+async def create_appointment_async(db: AsyncSession, payload: Dict[str, Any]) -> Appointment:
+    """Does NOT commit; flushes so ID is available immediately."""
+    appt = Appointment(**payload)
+    db.add(appt)
+    await db.flush()
+    return appt
+
+
+async def list_appointments_async(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    scheduled_from: Optional[datetime] = None,
+    scheduled_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[Appointment]:
+    stmt = select(Appointment)
+
+    if status:
+        stmt = stmt.where(Appointment.status == status)
+    if scheduled_from is not None:
+        stmt = stmt.where(Appointment.scheduled_at >= scheduled_from)
+    if scheduled_to is not None:
+        stmt = stmt.where(Appointment.scheduled_at <= scheduled_to)
+
+    stmt = stmt.order_by(Appointment.id.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+
+    return list((await db.scalars(stmt)).all())
+
+
+async def update_status_async(
+    db: AsyncSession,
+    appointment_id: int,
+    new_status: str,
+) -> Optional[Appointment]:
+    """Async update_status(): decrements the queue only on entering an exit state."""
+    appt = await db.get(Appointment, appointment_id)
+    if not appt:
+        return None
+
+    new_status = new_status.lower()
+    old_status = (appt.status or "").lower()
+
+    if old_status == new_status:
+        logger.info(
+            f"Appointment status unchanged | "
+            f"Appointment={appointment_id} | Status={new_status}"
+        )
+        return appt
+
+    appt.status = new_status
+
+    if appt.doctor_id and _leaves_queue(old_status, new_status):
+        await async_doctor_service.update_queue_length(
+            db=db,
+            doctor_id=appt.doctor_id,
+            increment=-1,
+        )
+        logger.info(
+            f"Doctor queue decremented | "
+            f"Doctor={appt.doctor_id} | Appointment={appointment_id}"
+        )
+
+    await db.flush()
+    return appt
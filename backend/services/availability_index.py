@@ -0,0 +1,251 @@
+# backend/services/availability_index.py
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from datetime import datetime, time as dtime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.events import broadcaster
+from backend.core.logger import get_logger
+from backend.services.doctor_service import DoctorService
+from backend.services.load_index import DoctorLoadIndex
+
+logger = get_logger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+TimeLike = Union[str, int, dtime, datetime, None]
+
+
+# ------------------------------------------------------------------
+# Time helpers
+# ------------------------------------------------------------------
+def parse_hhmm(value: Any) -> Optional[int]:
+    """'HH:MM' (or 'HH:MM:SS') -> minutes since midnight; None if unusable."""
+    if value is None:
+        return None
+    try:
+        parts = str(value).strip().split(":")
+        h = int(parts[0])
+        m = int(parts[1]) if len(parts) > 1 else 0
+    except (ValueError, IndexError):
+        return None
+    if not (0 <= h <= 24 and 0 <= m < 60):
+        return None
+    return min(h * 60 + m, MINUTES_PER_DAY)
+
+
+def to_minute(at: TimeLike = None) -> int:
+    """Minute of day for a lookup; None means 'now' (server local time)."""
+    if at is None:
+        at = datetime.now()
+    if isinstance(at, (datetime, dtime)):
+        return at.hour * 60 + at.minute
+    if isinstance(at, int):
+        return at % MINUTES_PER_DAY
+    minute = parse_hhmm(at)
+    if minute is None:
+        raise ValueError(f"Invalid time (expected HH:MM): {at!r}")
+    return minute % MINUTES_PER_DAY
+
+
+def shift_intervals(shift_start: Any, shift_end: Any) -> List[Tuple[int, int]]:
+    """
+    Half-open [start, end) minute intervals covered by a shift.
+
+    - Overnight shifts (end <= start) wrap past midnight -> two intervals
+    - start == end, or unparsable values -> on shift all day (no restriction)
+    """
+    start, end = parse_hhmm(shift_start), parse_hhmm(shift_end)
+    if start is None or end is None or start == end:
+        return [(0, MINUTES_PER_DAY)]
+    if start < end:
+        return [(start, end)]
+    return [(start, MINUTES_PER_DAY), (0, end)]
+
+
+# ------------------------------------------------------------------
+# Index (immutable snapshot of a roster)
+# ------------------------------------------------------------------
+class ShiftIndex:
+    """
+    department -> time of day -> doctors on shift.
+
+    Built once per roster: every department's day is cut into elementary
+    segments at shift boundaries, each holding its on-shift doctors, so a
+    lookup is a bisect over the boundaries (O(log n)) instead of scanning
+    and string-parsing the roster. ON_LEAVE doctors are never on shift.
+
+    Department key None covers all departments.
+    """
+
+    def __init__(self, doctors: Iterable[Mapping[str, Any]]) -> None:
+        self.doctors: Tuple[Mapping[str, Any], ...] = tuple(doctors)
+
+        by_dept: Dict[Optional[str], List[Mapping[str, Any]]] = {None: []}
+        for d in self.doctors:
+            if d.get("status") == settings.STATUS_ON_LEAVE:
+                continue
+            by_dept.setdefault(d.get("department"), []).append(d)
+            by_dept[None].append(d)
+
+        self._active = {k: tuple(v) for k, v in by_dept.items()}
+        self._bounds: Dict[Optional[str], List[int]] = {}
+        self._slots: Dict[Optional[str], List[Tuple[Mapping[str, Any], ...]]] = {}
+        self._slot_ids: Dict[Optional[str], List[FrozenSet[Any]]] = {}
+        for dept, members in self._active.items():
+            self._bounds[dept], self._slots[dept] = self._segments(members)
+            self._slot_ids[dept] = [frozenset(d.get("id") for d in s) for s in self._slots[dept]]
+
+    @staticmethod
+    def _segments(members: Sequence[Mapping[str, Any]]):
+        # Sweep over shift boundaries; slots keep roster order
+        starts: Dict[int, List[int]] = {}
+        ends: Dict[int, List[int]] = {}
+        for pos, d in enumerate(members):
+            for s, e in shift_intervals(d.get("shift_start"), d.get("shift_end")):
+                starts.setdefault(s, []).append(pos)
+                ends.setdefault(e, []).append(pos)
+
+        cuts = sorted(c for c in {0, *starts, *ends} if c < MINUTES_PER_DAY)
+        active: Dict[int, Mapping[str, Any]] = {}
+        slots: List[Tuple[Mapping[str, Any], ...]] = []
+        for cut in cuts:
+            for pos in ends.get(cut, ()):
+                active.pop(pos, None)
+            for pos in starts.get(cut, ()):
+                active[pos] = members[pos]
+            slots.append(tuple(active[p] for p in sorted(active)))
+        return cuts, slots
+
+    def department(self, department: Optional[str]) -> Tuple[Mapping[str, Any], ...]:
+        """Every non-ON_LEAVE doctor of a department, regardless of shift."""
+        return self._active.get(department, ())
+
+    def _slot(self, department: Optional[str], at: TimeLike) -> Optional[int]:
+        bounds = self._bounds.get(department)
+        if not bounds:
+            return None
+        return bisect.bisect_right(bounds, to_minute(at)) - 1
+
+    def on_shift(
+        self,
+        department: Optional[str],
+        at: TimeLike = None,
+    ) -> Tuple[Mapping[str, Any], ...]:
+        i = self._slot(department, at)
+        return () if i is None else self._slots[department][i]
+
+    def on_shift_ids(self, department: Optional[str], at: TimeLike = None) -> FrozenSet[Any]:
+        """Ids of on_shift(department, at), prebuilt for membership tests."""
+        i = self._slot(department, at)
+        return frozenset() if i is None else self._slot_ids[department][i]
+
+
+# ------------------------------------------------------------------
+# Live index (rebuilt when the roster changes)
+# ------------------------------------------------------------------
+_ROSTER_EVENTS = ("doctor.upsert", "doctor.remove", "doctors.resync")
+
+
+class AvailabilityIndex:
+    """
+    Process-wide ShiftIndex + DoctorLoadIndex over the doctors table.
+
+    - Roster writes (doctor.upsert / doctor.remove / doctors.resync
+      events) drop the snapshot; it is rebuilt lazily on the next lookup
+    - Queue counters (doctor.queue_length events, published once the
+      counter UPDATE commits) go straight into the load index, no rebuild
+    - Rebuilt at least every resync_seconds so writes made by other
+      workers show up too
+
+    `roster_version` is the time (ns) of the last roster change this
+    process applied; it moves before the rebuild, so ETags built from it
+    never pair a new roster with an old body, and (like core.data_versions)
+    it compares across workers.
+
+    Callers without a session (the decision engine) get one from
+    session_factory for the rebuild.
+    """
+
+    def __init__(
+        self,
+        resync_seconds: float = 30,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ) -> None:
+        self.resync_seconds = float(resync_seconds)
+        self.session_factory = session_factory
+        self.roster_version = 0
+        self._lock = threading.Lock()
+        self._index: Optional[ShiftIndex] = None
+        self._loads: Optional[DoctorLoadIndex] = None
+        self._loaded_at = 0.0
+
+    def _stale(self) -> bool:
+        if self._index is None:
+            return True
+        if self.resync_seconds > 0:
+            return time.monotonic() - self._loaded_at >= self.resync_seconds
+        return False
+
+    def snapshot(self, db: Optional[Session] = None) -> Tuple[ShiftIndex, DoctorLoadIndex]:
+        """Shift and load index of the same roster."""
+        with self._lock:
+            if self._stale():
+                doctors = self._load(db)
+                # Both indexes hold the same doctor dicts: load updates show
+                # up in the shift index's rows too
+                self._index = ShiftIndex(doctors)
+                self._loads = DoctorLoadIndex(doctors)
+                self._loaded_at = time.monotonic()
+                logger.debug(f"Availability index rebuilt | Doctors={len(doctors)}")
+            return self._index, self._loads  # type: ignore[return-value]
+
+    def current(self, db: Optional[Session] = None) -> ShiftIndex:
+        return self.snapshot(db)[0]
+
+    def loads(self, db: Optional[Session] = None) -> DoctorLoadIndex:
+        return self.snapshot(db)[1]
+
+    def set_load(self, doctor_id: Any, queue_length: int) -> None:
+        # Under the lock: an update racing a rebuild lands in the new index
+        with self._lock:
+            if self._loads is not None:
+                self._loads.set_load(doctor_id, queue_length)
+
+    def on_event(self, event_type: str, data: Any) -> None:
+        """Broadcaster listener (committed doctor changes)."""
+        if event_type == "doctor.queue_length":
+            self.set_load(data["id"], data["current_queue_length"])
+        elif event_type in _ROSTER_EVENTS:
+            self.invalidate()
+
+    def _load(self, db: Optional[Session]) -> List[Dict[str, Any]]:
+        if db is not None:
+            return DoctorService().get_doctors(db)
+        factory = self.session_factory
+        if factory is None:
+            # Lazy: services otherwise never open sessions themselves
+            from backend.core.database import SessionLocal
+
+            factory = SessionLocal
+        with factory() as db:
+            return DoctorService().get_doctors(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._loads = None
+            self.roster_version = max(time.time_ns(), self.roster_version + 1)
+
+
+availability_index = AvailabilityIndex(
+    resync_seconds=getattr(settings, "AVAILABILITY_INDEX_RESYNC_SECONDS", 30)
+)
+broadcaster.listen("doctor", availability_index.on_event)
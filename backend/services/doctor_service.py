@@ -1,26 +1,77 @@
 """
 SmartCare Flow - Doctor Service
 Business logic for doctor management
+
+DoctorService works on a sync Session (threadpool routes, background jobs);
+AsyncDoctorService runs the same statements on an AsyncSession for the
+async route handlers. Both return the same dict shapes.
 """
 
 import uuid
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 
-from sqlalchemy import text
+from sqlalchemy import (
+    Select,
+    Update,
+    and_,
+    bindparam,
+    case,
+    column,
+    func,
+    insert,
+    select,
+    table,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.core.settings import settings
+from backend.core.events import publish, publish_on_commit
 from backend.core.logger import get_logger
+from backend.models.appointment import Appointment
+from backend.models.doctor import Doctor
+from backend.models.emergency import EmergencyCase
+from backend.models.queue import QueueItem
 
 logger = get_logger(__name__)
 
 
+# ---------------------------------------------------------------------
+# Tables (untyped Core mirrors of the ORM tables)
+#
+# Columns carry no SQL types, so values come back exactly as the driver
+# returns them (same dict shapes the raw-SQL version produced), while every
+# statement below is a Core construct that SQLAlchemy compiles once and
+# then serves from the engine's compiled cache.
+# ---------------------------------------------------------------------
+_doctors = table("doctors", *(column(c.name) for c in Doctor.__table__.c))
+_queue = table("queue_items", *(column(c.name) for c in QueueItem.__table__.c))
+_appointments = table("appointments", *(column(c.name) for c in Appointment.__table__.c))
+_emergencies = table("emergency_cases", *(column(c.name) for c in EmergencyCase.__table__.c))
+
+_ACTIVE_STATUSES = ("WAITING", "IN_PROGRESS")
+
+# Exit states that decrement the counter (appointment_service / emergency_service)
+_APPOINTMENT_EXIT_STATUSES = ("completed", "cancelled", "no_show")
+_EMERGENCY_EXIT_STATUSES = ("CLOSED",)
+
+
 # ---------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------
-def _row_to_dict(row) -> Dict:
-    return dict(row)
+def _rows_to_dicts(result) -> List[Dict]:
+    """Plain dicts from a result, without building RowMapping per row."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def _first_dict(result) -> Optional[Dict]:
+    keys = list(result.keys())
+    row = result.first()
+    return dict(zip(keys, row)) if row is not None else None
 
 
 def _queue_threshold() -> int:
@@ -37,6 +88,335 @@ def _estimated_wait(queue_len: int) -> int:
     return fn(queue_len) if callable(fn) else queue_len * 5
 
 
+def _with_workload(doctor: Dict) -> Dict:
+    doctor["workload_status"] = _workload_status(doctor["current_queue_length"])
+    doctor["estimated_wait_time"] = _estimated_wait(doctor["current_queue_length"])
+    return doctor
+
+
+# ---------------------------------------------------------------------
+# Statements (built once; shared by the sync and async services)
+# ---------------------------------------------------------------------
+_live = _doctors.c.deleted_at.is_(None)
+
+# Writes hand back the full row, so no follow-up SELECT is needed
+_INSERT_DOCTOR = insert(_doctors).returning(*_doctors.c)
+
+_SELECT_DOCTOR = select(_doctors).where(
+    _doctors.c.id == bindparam("doctor_id"),
+    _live,
+)
+
+_inc = _doctors.c.current_queue_length + bindparam("inc")
+_UPDATE_QUEUE_LENGTH = (
+    update(_doctors)
+    .where(_doctors.c.id == bindparam("doctor_id"), _live)
+    .values(
+        current_queue_length=case((_inc < 0, 0), else_=_inc),
+        updated_at=bindparam("updated_at"),
+    )
+    .returning(_doctors.c.current_queue_length)
+)
+
+# Everything that holds a +1 on current_queue_length: active queue_items,
+# open appointments and open emergencies. Appointment / emergency statuses
+# are stored in mixed case (booking vs status updates), hence lower/upper.
+_active_count = (
+    select(func.count())
+    .select_from(_queue)
+    .where(
+        _queue.c.doctor_id == _doctors.c.id,
+        _queue.c.status.in_(_ACTIVE_STATUSES),
+    )
+    .scalar_subquery()
+    + select(func.count())
+    .select_from(_appointments)
+    .where(
+        _appointments.c.doctor_id == _doctors.c.id,
+        func.lower(_appointments.c.status).not_in(_APPOINTMENT_EXIT_STATUSES),
+    )
+    .scalar_subquery()
+    + select(func.count())
+    .select_from(_emergencies)
+    .where(
+        _emergencies.c.assigned_doctor_id == _doctors.c.id,
+        func.upper(_emergencies.c.status).not_in(_EMERGENCY_EXIT_STATUSES),
+    )
+    .scalar_subquery()
+)
+_RECONCILE_QUEUE_LENGTHS = (
+    update(_doctors)
+    .where(_live, _doctors.c.current_queue_length != _active_count)
+    .values(current_queue_length=_active_count, updated_at=bindparam("updated_at"))
+)
+
+_active_for_doctor = (
+    _queue.c.doctor_id == bindparam("doctor_id"),
+    _queue.c.status.in_(_ACTIVE_STATUSES),
+)
+_ACTIVE_QUEUE = (
+    select(_queue)
+    .where(*_active_for_doctor)
+    .order_by(_queue.c.priority.desc(), _queue.c.position.asc(), _queue.c.created_at.asc())
+)
+_ACTIVE_QUEUE_COUNT = select(func.count()).select_from(_queue).where(*_active_for_doctor)
+
+_SOFT_DELETE = (
+    update(_doctors)
+    .where(_doctors.c.id == bindparam("doctor_id"), _live)
+    .values(deleted_at=bindparam("d"), updated_at=bindparam("u"))
+)
+
+# Every doctor's active queue size from one LEFT JOIN ... GROUP BY
+_workload_columns = (
+    _doctors.c.id,
+    _doctors.c.name,
+    _doctors.c.department,
+    _doctors.c.shift_start,
+    _doctors.c.shift_end,
+    func.count(_queue.c.id).label("queue_len"),
+)
+_ALL_WORKLOADS = (
+    select(*_workload_columns)
+    .select_from(
+        _doctors.outerjoin(
+            _queue,
+            and_(
+                _queue.c.doctor_id == _doctors.c.id,
+                _queue.c.status.in_(_ACTIVE_STATUSES),
+            ),
+        )
+    )
+    .where(_live)
+    .group_by(_doctors.c.id)
+    .order_by(_doctors.c.name)
+)
+_DEPT_WORKLOADS = _ALL_WORKLOADS.where(_doctors.c.department == bindparam("dept"))
+
+# One aggregate pass per department (or per all departments, grouped)
+def _count_if(cond):
+    return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+
+_department_aggregates = (
+    func.count().label("total"),
+    _count_if(_doctors.c.is_available == 1).label("available"),
+    _count_if(_doctors.c.current_queue_length >= bindparam("threshold")).label("overloaded"),
+    func.avg(_doctors.c.current_queue_length).label("avg_queue"),
+)
+_DEPT_SUMMARY = (
+    select(*_department_aggregates)
+    .select_from(_doctors)
+    .where(_doctors.c.department == bindparam("dept"), _live)
+)
+_ALL_DEPT_SUMMARIES = (
+    select(_doctors.c.department, *_department_aggregates)
+    .where(_live)
+    .group_by(_doctors.c.department)
+)
+
+_STATISTICS = select(
+    func.count().label("total"),
+    _count_if(_doctors.c.is_available == 1).label("available"),
+    select(func.count())
+    .select_from(_queue)
+    .where(_queue.c.status == "WAITING")
+    .scalar_subquery()
+    .label("waiting"),
+).select_from(_doctors).where(_live)
+
+
+def _new_doctor_params(
+    name: str,
+    department: str,
+    shift_start: str,
+    shift_end: str,
+    status: str,
+    specialization: Optional[str],
+) -> Dict[str, Any]:
+    now = datetime.utcnow().isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "department": department,
+        "shift_start": shift_start,
+        "shift_end": shift_end,
+        "status": status,
+        "specialization": specialization or "General",
+        "is_available": status == settings.STATUS_AVAILABLE,
+        "current_queue_length": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@lru_cache(maxsize=None)
+def _doctors_statement(by_department: bool, by_status: bool, available_only: bool) -> Select:
+    # One prebuilt statement per filter shape (8 at most)
+    stmt = select(_doctors).where(_live)
+
+    if by_department:
+        stmt = stmt.where(_doctors.c.department == bindparam("department"))
+
+    if by_status:
+        stmt = stmt.where(_doctors.c.status == bindparam("status"))
+
+    if available_only:
+        stmt = stmt.where(_doctors.c.is_available == 1)
+
+    return stmt.order_by(_doctors.c.name)
+
+
+def _doctors_query(
+    department: Optional[str],
+    status: Optional[str],
+    available_only: bool,
+) -> Tuple[Select, Dict[str, Any]]:
+    stmt = _doctors_statement(bool(department), bool(status), bool(available_only))
+    params: Dict[str, Any] = {}
+    if department:
+        params["department"] = department
+    if status:
+        params["status"] = status
+    return stmt, params
+
+
+def _update_doctor_query(
+    doctor_id: str,
+    name: Optional[str],
+    shift_start: Optional[str],
+    shift_end: Optional[str],
+    status: Optional[str],
+    specialization: Optional[str],
+) -> Optional[Update]:
+    """UPDATE for the given fields, or None when nothing changes."""
+    values: Dict[str, Any] = {}
+
+    if name is not None:
+        values["name"] = name
+
+    if shift_start is not None:
+        values["shift_start"] = shift_start
+
+    if shift_end is not None:
+        values["shift_end"] = shift_end
+
+    if status is not None:
+        values["status"] = status
+        values["is_available"] = status == settings.STATUS_AVAILABLE
+
+    if specialization is not None:
+        values["specialization"] = specialization
+
+    if not values:
+        return None
+
+    values["updated_at"] = datetime.utcnow().isoformat()
+    return (
+        update(_doctors)
+        .where(_doctors.c.id == doctor_id, _live)
+        .values(**values)
+        .returning(*_doctors.c)
+    )
+
+
+def _queue_length_params(doctor_id: str, increment: int) -> Dict[str, Any]:
+    return {
+        "doctor_id": doctor_id,
+        "inc": int(increment),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+
+
+def _on_queue_length_updated(db, doctor_id: str, result: Optional[int]) -> None:
+    if result is None:
+        logger.warning(f"update_queue_length: doctor not found | id={doctor_id}")
+        return
+
+    publish_on_commit(
+        db,
+        "doctor.queue_length",
+        {"id": doctor_id, "current_queue_length": result},
+    )
+
+
+def _doctor_queue(doctor: Dict, queue_items) -> Dict:
+    queue_len = len(queue_items)
+    return {
+        "doctor_id": doctor["id"],
+        "doctor_name": doctor["name"],
+        "current_queue_length": queue_len,
+        "estimated_wait_time": _estimated_wait(queue_len),
+        "workload_status": _workload_status(queue_len),
+        "queue": queue_items,
+    }
+
+
+def _doctor_workload(doctor: Dict, queue_len: int) -> Dict:
+    threshold = _queue_threshold()
+    return {
+        "doctor_id": doctor["id"],
+        "doctor_name": doctor["name"],
+        "department": doctor["department"],
+        "current_queue_length": queue_len,
+        "workload_percentage": round(
+            (queue_len / threshold) * 100, 2
+        ) if threshold else 0,
+        "workload_status": _workload_status(queue_len),
+        "estimated_wait_time": _estimated_wait(queue_len),
+        "is_overloaded": queue_len >= threshold,
+        "capacity_remaining": max(0, threshold - queue_len),
+        "shift": {
+            "start": doctor["shift_start"],
+            "end": doctor["shift_end"],
+        },
+    }
+
+
+def _workloads_query(department: Optional[str]) -> Tuple[Select, Dict[str, Any]]:
+    if department:
+        return _DEPT_WORKLOADS, {"dept": department}
+    return _ALL_WORKLOADS, {}
+
+
+def _workloads(result) -> List[Dict]:
+    return [_doctor_workload(d, d.pop("queue_len")) for d in _rows_to_dicts(result)]
+
+
+def _department_summary(department: str, row, threshold: int) -> Dict:
+    return {
+        "department": department,
+        "doctors_total": row.total if row else 0,
+        "doctors_available": row.available if row else 0,
+        "doctors_overloaded": row.overloaded if row else 0,
+        "average_queue_length": round((row.avg_queue if row else None) or 0, 2),
+        "queue_threshold": threshold,
+    }
+
+
+def _all_department_summaries(
+    rows, threshold: int, departments: Optional[Sequence[str]]
+) -> List[Dict]:
+    """`departments` first (zeros when empty), then any other department found."""
+    by_dept = {r.department: r for r in rows}
+    wanted = list(departments or ())
+    names = wanted + sorted(set(by_dept) - set(wanted))
+    return [_department_summary(d, by_dept.get(d), threshold) for d in names]
+
+
+def _statistics(total: int, available: int, waiting_queue: int) -> Dict:
+    return {
+        "doctors": {
+            "total": total,
+            "available": available,
+            "on_leave": total - available,
+        },
+        "queue": {
+            "waiting": waiting_queue,
+        },
+    }
+
+
 # ---------------------------------------------------------------------
 # Service
 # ---------------------------------------------------------------------
@@ -56,40 +436,15 @@ class DoctorService:
         status: str,
         specialization: Optional[str] = None,
     ) -> Dict:
-        doctor_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
-
-        is_available = status == settings.STATUS_AVAILABLE
-
-        db.execute(
-            text(
-                """
-                INSERT INTO doctors
-                (id, name, department, shift_start, shift_end, status,
-                 specialization, is_available, current_queue_length,
-                 created_at, updated_at)
-                VALUES
-                (:id, :name, :department, :shift_start, :shift_end, :status,
-                 :specialization, :is_available, 0, :created_at, :updated_at)
-                """
-            ),
-            {
-                "id": doctor_id,
-                "name": name,
-                "department": department,
-                "shift_start": shift_start,
-                "shift_end": shift_end,
-                "status": status,
-                "specialization": specialization or "General",
-                "is_available": is_available,
-                "created_at": now,
-                "updated_at": now,
-            },
+        params = _new_doctor_params(
+            name, department, shift_start, shift_end, status, specialization
         )
+        doctor = _with_workload(_first_dict(db.execute(_INSERT_DOCTOR, params)))
         db.commit()
 
-        logger.info(f"Doctor created | {name} | {doctor_id}")
-        return self.get_doctor_by_id(db, doctor_id)
+        logger.info(f"Doctor created | {name} | {doctor['id']}")
+        publish("doctor.upsert", doctor)
+        return doctor
 
     # -----------------------------------------------------------------
     # Read
@@ -101,50 +456,12 @@ class DoctorService:
         status: Optional[str] = None,
         available_only: bool = False,
     ) -> List[Dict]:
-        query = "SELECT * FROM doctors WHERE deleted_at IS NULL"
-        params = {}
-
-        if department:
-            query += " AND department = :department"
-            params["department"] = department
-
-        if status:
-            query += " AND status = :status"
-            params["status"] = status
-
-        if available_only:
-            query += " AND is_available = 1"
-
-        query += " ORDER BY name"
-
-        rows = db.execute(text(query), params).mappings().all()
-        doctors = [_row_to_dict(r) for r in rows]
-
-        for d in doctors:
-            d["workload_status"] = _workload_status(d["current_queue_length"])
-            d["estimated_wait_time"] = _estimated_wait(d["current_queue_length"])
-
-        return doctors
+        result = db.execute(*_doctors_query(department, status, available_only))
+        return [_with_workload(d) for d in _rows_to_dicts(result)]
 
     def get_doctor_by_id(self, db: Session, doctor_id: str) -> Optional[Dict]:
-        row = db.execute(
-            text(
-                "SELECT * FROM doctors WHERE id = :id AND deleted_at IS NULL"
-            ),
-            {"id": doctor_id},
-        ).mappings().first()
-
-        if not row:
-            return None
-
-        doctor = _row_to_dict(row)
-        doctor["workload_status"] = _workload_status(
-            doctor["current_queue_length"]
-        )
-        doctor["estimated_wait_time"] = _estimated_wait(
-            doctor["current_queue_length"]
-        )
-        return doctor
+        doctor = _first_dict(db.execute(_SELECT_DOCTOR, {"doctor_id": doctor_id}))
+        return _with_workload(doctor) if doctor else None
 
     # -----------------------------------------------------------------
     # Queue (LIVE DATA + COUNTER UPDATES)
@@ -156,73 +473,47 @@ class DoctorService:
         increment: int,
     ) -> None:
         """
-        Safely adjust the doctor's current_queue_length counter.
+        Atomically adjust the doctor's current_queue_length counter.
 
-        - Uses SQL so it stays in sync with other readers
+        - Single UPDATE (no read-modify-write), so concurrent workers
+          never lose increments
         - Never lets the counter go below 0
+        - Does NOT commit: joins the caller's transaction
         """
-        row = db.execute(
-            text(
-                """
-                SELECT current_queue_length
-                FROM doctors
-                WHERE id = :id AND deleted_at IS NULL
-                """
-            ),
-            {"id": doctor_id},
-        ).mappings().first()
-
-        if not row:
-            logger.warning(f"update_queue_length: doctor not found | id={doctor_id}")
-            return
-
-        current = row["current_queue_length"] or 0
-        new_value = max(0, current + increment)
-
-        db.execute(
-            text(
-                """
-                UPDATE doctors
-                SET current_queue_length = :val, updated_at = :updated_at
-                WHERE id = :id AND deleted_at IS NULL
-                """
-            ),
-            {
-                "id": doctor_id,
-                "val": new_value,
-                "updated_at": datetime.utcnow().isoformat(),
-            },
+        result = db.execute(
+            _UPDATE_QUEUE_LENGTH, _queue_length_params(doctor_id, increment)
+        ).scalar()
+        _on_queue_length_updated(db, doctor_id, result)
+
+    def reconcile_queue_lengths(self, db: Session) -> int:
+        """
+        Repair counter drift: set current_queue_length to the real number of
+        WAITING / IN_PROGRESS queue_items plus open appointments and open
+        emergencies (every source that increments it). Only drifted rows
+        are touched.
+        Returns number of doctors corrected.
+        """
+        result = db.execute(
+            _RECONCILE_QUEUE_LENGTHS,
+            {"updated_at": datetime.utcnow().isoformat()},
         )
         db.commit()
 
+        fixed = result.rowcount or 0
+        if fixed:
+            logger.info(f"Doctor queue counters reconciled | Doctors={fixed}")
+            publish("doctors.resync", {"reason": "counter_reconcile"})
+        return fixed
+
     def get_doctor_queue(self, db: Session, doctor_id: str) -> Optional[Dict]:
         doctor = self.get_doctor_by_id(db, doctor_id)
         if not doctor:
             return None
 
-        queue_items = db.execute(
-            text(
-                """
-                SELECT *
-                FROM queue_items
-                WHERE doctor_id = :doctor_id
-                  AND status IN ('WAITING', 'IN_PROGRESS')
-                ORDER BY priority DESC, position ASC, created_at ASC
-                """
-            ),
-            {"doctor_id": doctor_id},
-        ).mappings().all()
-
-        queue_len = len(queue_items)
-
-        return {
-            "doctor_id": doctor_id,
-            "doctor_name": doctor["name"],
-            "current_queue_length": queue_len,
-            "estimated_wait_time": _estimated_wait(queue_len),
-            "workload_status": _workload_status(queue_len),
-            "queue": [dict(q) for q in queue_items],
-        }
+        queue_items = _rows_to_dicts(
+            db.execute(_ACTIVE_QUEUE, {"doctor_id": doctor_id})
+        )
+        return _doctor_queue(doctor, queue_items)
 
     # -----------------------------------------------------------------
     # Workload (🔥 FIXED – REQUIRED BY /workload)
@@ -233,35 +524,15 @@ class DoctorService:
             return None
 
         queue_len = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM queue_items
-                WHERE doctor_id = :doctor_id
-                  AND status IN ('WAITING', 'IN_PROGRESS')
-                """
-            ),
-            {"doctor_id": doctor_id},
+            _ACTIVE_QUEUE_COUNT, {"doctor_id": doctor_id}
         ).scalar() or 0
+        return _doctor_workload(doctor, queue_len)
 
-        threshold = _queue_threshold()
-
-        return {
-            "doctor_id": doctor_id,
-            "doctor_name": doctor["name"],
-            "department": doctor["department"],
-            "current_queue_length": queue_len,
-            "workload_percentage": round(
-                (queue_len / threshold) * 100, 2
-            ) if threshold else 0,
-            "workload_status": _workload_status(queue_len),
-            "estimated_wait_time": _estimated_wait(queue_len),
-            "is_overloaded": queue_len >= threshold,
-            "capacity_remaining": max(0, threshold - queue_len),
-            "shift": {
-                "start": doctor["shift_start"],
-                "end": doctor["shift_end"],
-            },
-        }
+    def get_all_workloads(
+        self, db: Session, department: Optional[str] = None
+    ) -> List[Dict]:
+        """get_doctor_workload() for every doctor, from one grouped query."""
+        return _workloads(db.execute(*_workloads_query(department)))
 
     # -----------------------------------------------------------------
     # Update
@@ -276,159 +547,198 @@ class DoctorService:
         status: Optional[str] = None,
         specialization: Optional[str] = None,
     ) -> Optional[Dict]:
-        if not self.get_doctor_by_id(db, doctor_id):
-            return None
-
-        updates = []
-        params = {"id": doctor_id}
-
-        if name is not None:
-            updates.append("name = :name")
-            params["name"] = name
-
-        if shift_start is not None:
-            updates.append("shift_start = :shift_start")
-            params["shift_start"] = shift_start
-
-        if shift_end is not None:
-            updates.append("shift_end = :shift_end")
-            params["shift_end"] = shift_end
-
-        if status is not None:
-            updates.append("status = :status")
-            updates.append("is_available = :is_available")
-            params["status"] = status
-            params["is_available"] = status == settings.STATUS_AVAILABLE
-
-        if specialization is not None:
-            updates.append("specialization = :specialization")
-            params["specialization"] = specialization
-
-        if updates:
-            updates.append("updated_at = :updated_at")
-            params["updated_at"] = datetime.utcnow().isoformat()
+        """UPDATE ... RETURNING: one statement; None if no such doctor."""
+        stmt = _update_doctor_query(
+            doctor_id, name, shift_start, shift_end, status, specialization
+        )
+        if stmt is None:
+            return self.get_doctor_by_id(db, doctor_id)
 
-            db.execute(
-                text(f"UPDATE doctors SET {', '.join(updates)} WHERE id = :id"),
-                params,
-            )
-            db.commit()
+        doctor = _first_dict(db.execute(stmt))
+        if doctor is None:
+            # The UPDATE opened a write transaction: release it
+            db.rollback()
+            return None
+        db.commit()
 
-        return self.get_doctor_by_id(db, doctor_id)
+        doctor = _with_workload(doctor)
+        publish("doctor.upsert", doctor)
+        return doctor
 
     # -----------------------------------------------------------------
     # Delete
     # -----------------------------------------------------------------
     def delete_doctor(self, db: Session, doctor_id: str) -> bool:
-        if not self.get_doctor_by_id(db, doctor_id):
-            return False
-
+        """Soft delete; False if the doctor does not exist (rowcount check)."""
         now = datetime.utcnow().isoformat()
-        db.execute(
-            text(
-                """
-                UPDATE doctors
-                SET deleted_at = :d, updated_at = :u
-                WHERE id = :id
-                """
-            ),
-            {"d": now, "u": now, "id": doctor_id},
-        )
+        result = db.execute(_SOFT_DELETE, {"d": now, "u": now, "doctor_id": doctor_id})
+        if not result.rowcount:
+            db.rollback()
+            return False
         db.commit()
+
+        publish("doctor.remove", {"id": doctor_id})
         return True
 
     # -----------------------------------------------------------------
     # Department Summary
     # -----------------------------------------------------------------
     def get_department_summary(self, db: Session, department: str) -> Dict:
-        total = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM doctors
-                WHERE department = :dept AND deleted_at IS NULL
-                """
-            ),
-            {"dept": department},
-        ).scalar() or 0
-
-        available = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM doctors
-                WHERE department = :dept
-                  AND is_available = 1
-                  AND deleted_at IS NULL
-                """
-            ),
-            {"dept": department},
-        ).scalar() or 0
-
-        avg_queue = db.execute(
-            text(
-                """
-                SELECT AVG(current_queue_length)
-                FROM doctors
-                WHERE department = :dept AND deleted_at IS NULL
-                """
-            ),
-            {"dept": department},
-        ).scalar()
-
         threshold = _queue_threshold()
+        row = db.execute(
+            _DEPT_SUMMARY, {"dept": department, "threshold": threshold}
+        ).one()
+        return _department_summary(department, row, threshold)
 
-        overloaded = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM doctors
-                WHERE department = :dept
-                  AND current_queue_length >= :threshold
-                  AND deleted_at IS NULL
-                """
-            ),
-            {"dept": department, "threshold": threshold},
-        ).scalar() or 0
-
-        return {
-            "department": department,
-            "doctors_total": total,
-            "doctors_available": available,
-            "doctors_overloaded": overloaded,
-            "average_queue_length": round(avg_queue or 0, 2),
-            "queue_threshold": threshold,
-        }
+    def get_all_department_summaries(
+        self, db: Session, departments: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        """All departments from one GROUP BY pass."""
+        threshold = _queue_threshold()
+        rows = db.execute(_ALL_DEPT_SUMMARIES, {"threshold": threshold}).all()
+        return _all_department_summaries(rows, threshold, departments)
 
     # -----------------------------------------------------------------
     # Statistics
     # -----------------------------------------------------------------
     def get_statistics(self, db: Session) -> Dict:
-        total = db.execute(
-            text("SELECT COUNT(*) FROM doctors WHERE deleted_at IS NULL")
-        ).scalar() or 0
+        row = db.execute(_STATISTICS).one()
+        return _statistics(row.total, row.available, row.waiting)
 
-        available = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM doctors
-                WHERE deleted_at IS NULL AND is_available = 1
-                """
-            )
-        ).scalar() or 0
 
-        waiting_queue = db.execute(
-            text(
-                """
-                SELECT COUNT(*) FROM queue_items WHERE status = 'WAITING'
-                """
+# ---------------------------------------------------------------------
+# Async service (AsyncSession, for async route handlers)
+# ---------------------------------------------------------------------
+class AsyncDoctorService:
+    """Same API and return shapes as DoctorService, awaitable."""
+
+    async def create_doctor(
+        self,
+        db: AsyncSession,
+        name: str,
+        department: str,
+        shift_start: str,
+        shift_end: str,
+        status: str,
+        specialization: Optional[str] = None,
+    ) -> Dict:
+        params = _new_doctor_params(
+            name, department, shift_start, shift_end, status, specialization
+        )
+        doctor = _with_workload(_first_dict(await db.execute(_INSERT_DOCTOR, params)))
+        await db.commit()
+
+        logger.info(f"Doctor created | {name} | {doctor['id']}")
+        publish("doctor.upsert", doctor)
+        return doctor
+
+    async def get_doctors(
+        self,
+        db: AsyncSession,
+        department: Optional[str] = None,
+        status: Optional[str] = None,
+        available_only: bool = False,
+    ) -> List[Dict]:
+        result = await db.execute(*_doctors_query(department, status, available_only))
+        return [_with_workload(d) for d in _rows_to_dicts(result)]
+
+    async def get_doctor_by_id(self, db: AsyncSession, doctor_id: str) -> Optional[Dict]:
+        doctor = _first_dict(await db.execute(_SELECT_DOCTOR, {"doctor_id": doctor_id}))
+        return _with_workload(doctor) if doctor else None
+
+    async def update_queue_length(
+        self,
+        db: AsyncSession,
+        doctor_id: str,
+        increment: int,
+    ) -> None:
+        """Atomic, clamped at 0, does NOT commit (see DoctorService)."""
+        result = (
+            await db.execute(
+                _UPDATE_QUEUE_LENGTH, _queue_length_params(doctor_id, increment)
             )
+        ).scalar()
+        _on_queue_length_updated(db, doctor_id, result)
+
+    async def get_doctor_queue(self, db: AsyncSession, doctor_id: str) -> Optional[Dict]:
+        doctor = await self.get_doctor_by_id(db, doctor_id)
+        if not doctor:
+            return None
+
+        queue_items = _rows_to_dicts(
+            await db.execute(_ACTIVE_QUEUE, {"doctor_id": doctor_id})
+        )
+        return _doctor_queue(doctor, queue_items)
+
+    async def get_doctor_workload(self, db: AsyncSession, doctor_id: str) -> Optional[Dict]:
+        doctor = await self.get_doctor_by_id(db, doctor_id)
+        if not doctor:
+            return None
+
+        queue_len = (
+            await db.execute(_ACTIVE_QUEUE_COUNT, {"doctor_id": doctor_id})
         ).scalar() or 0
+        return _doctor_workload(doctor, queue_len)
+
+    async def get_all_workloads(
+        self, db: AsyncSession, department: Optional[str] = None
+    ) -> List[Dict]:
+        return _workloads(await db.execute(*_workloads_query(department)))
+
+    async def update_doctor(
+        self,
+        db: AsyncSession,
+        doctor_id: str,
+        name: Optional[str] = None,
+        shift_start: Optional[str] = None,
+        shift_end: Optional[str] = None,
+        status: Optional[str] = None,
+        specialization: Optional[str] = None,
+    ) -> Optional[Dict]:
+        stmt = _update_doctor_query(
+            doctor_id, name, shift_start, shift_end, status, specialization
+        )
+        if stmt is None:
+            return await self.get_doctor_by_id(db, doctor_id)
+
+        doctor = _first_dict(await db.execute(stmt))
+        if doctor is None:
+            # The UPDATE opened a write transaction: release it
+            await db.rollback()
+            return None
+        await db.commit()
+
+        doctor = _with_workload(doctor)
+        publish("doctor.upsert", doctor)
+        return doctor
+
+    async def delete_doctor(self, db: AsyncSession, doctor_id: str) -> bool:
+        now = datetime.utcnow().isoformat()
+        result = await db.execute(
+            _SOFT_DELETE, {"d": now, "u": now, "doctor_id": doctor_id}
+        )
+        if not result.rowcount:
+            await db.rollback()
+            return False
+        await db.commit()
+
+        publish("doctor.remove", {"id": doctor_id})
+        return True
+
+    async def get_department_summary(self, db: AsyncSession, department: str) -> Dict:
+        threshold = _queue_threshold()
+        row = (
+            await db.execute(_DEPT_SUMMARY, {"dept": department, "threshold": threshold})
+        ).one()
+        return _department_summary(department, row, threshold)
+
+    async def get_all_department_summaries(
+        self, db: AsyncSession, departments: Optional[Sequence[str]] = None
+    ) -> List[Dict]:
+        threshold = _queue_threshold()
+        rows = (await db.execute(_ALL_DEPT_SUMMARIES, {"threshold": threshold})).all()
+        return _all_department_summaries(rows, threshold, departments)
 
-        return {
-            "doctors": {
-                "total": total,
-                "available": available,
-                "on_leave": total - available,
-            },
-            "queue": {
-                "waiting": waiting_queue,
-            },
-        }
+    async def get_statistics(self, db: AsyncSession) -> Dict:
+        row = (await db.execute(_STATISTICS)).one()
+        return _statistics(row.total, row.available, row.waiting)
@@ -4,6 +4,7 @@ from sqlalchemy import select
 
 from backend.models.emergency import EmergencyCase
 from backend.services.doctor_service import DoctorService
+from backend.core.events import publish
 from backend.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,6 +22,16 @@ TRIAGE_PRIORITY_MAP = {
 EXIT_STATUSES = {"CLOSED"}
 
 
+def _event_data(emergency: EmergencyCase) -> dict:
+    return {
+        "id": emergency.id,
+        "triage_level": emergency.triage_level,
+        "priority": emergency.priority,
+        "assigned_doctor_id": emergency.assigned_doctor_id,
+        "status": emergency.status,
+    }
+
+
 # -------------------------------------------------
 # Read
 # -------------------------------------------------
@@ -52,7 +63,7 @@ def create_emergency(db: Session, payload: dict) -> EmergencyCase:
         triage_level=triage,
         priority=priority,
         assigned_doctor_id=payload.get("assigned_doctor_id"),
-        status=payload.get("status", "OPEN"),
+        status=(payload.get("status") or "OPEN").upper(),
     )
 
     db.add(emergency)
@@ -70,6 +81,7 @@ def create_emergency(db: Session, payload: dict) -> EmergencyCase:
 
     db.commit()
     db.refresh(emergency)
+    publish("emergency.created", _event_data(emergency))
     return emergency
 
 
@@ -106,4 +118,5 @@ def update_status(
 
     db.commit()
     db.refresh(emergency)
+    publish("emergency.status", _event_data(emergency))
     return emergency
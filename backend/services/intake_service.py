@@ -0,0 +1,174 @@
+# backend/services/intake_service.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.events import publish
+from backend.core.logger import get_logger
+from backend.models.queue import QueueItem
+from backend.models.walkin import WalkIn
+from backend.services.doctor_service import DoctorService
+from backend.services.queue_engine import QueueEntry, queue_engine
+from backend.services.queue_service import STATUS_WAITING, next_positions, publish_queue_change
+from backend.services.walkin_service import normalize_priority_to_int
+from backend.utils.import_utils import chunked
+
+logger = get_logger(__name__)
+doctor_service = DoctorService()
+
+
+# ------------------------------------------------------------------
+# Internals (no commit)
+# ------------------------------------------------------------------
+def _insert_walkins(
+    db: Session,
+    payloads: Sequence[dict],
+) -> Tuple[List[Dict[str, Any]], List[QueueEntry]]:
+    """
+    INSERT walkins + queue_items for a batch (executemany ... RETURNING),
+    with queue positions read from queue_items once the walkins INSERT
+    holds the write lock, and one counter UPDATE per doctor. Caller commits.
+    """
+    priorities = [normalize_priority_to_int(p.get("priority")) for p in payloads]
+
+    walkin_ids = db.scalars(
+        insert(WalkIn).returning(WalkIn.id, sort_by_parameter_order=True),
+        [
+            {
+                "patient_name": p["patient_name"],
+                "patient_phone": p.get("patient_phone"),
+                "reason": p.get("reason"),
+                "assigned_doctor_id": p.get("assigned_doctor_id"),
+                "priority": priority,
+                "status": "WAITING",
+            }
+            for p, priority in zip(payloads, priorities)
+        ],
+    ).all()
+
+    next_pos = next_positions(db, (p.get("assigned_doctor_id") for p in payloads))
+    deltas: Dict[str, int] = {}
+    queue_rows: List[Dict[str, Any]] = []
+
+    for p, priority, walkin_id in zip(payloads, priorities, walkin_ids):
+        doctor_id = p.get("assigned_doctor_id")
+        queue_rows.append(
+            {
+                "source_type": "walkin",
+                "source_id": walkin_id,
+                "doctor_id": doctor_id,
+                "priority": priority,
+                "position": next_pos[doctor_id],
+                "status": STATUS_WAITING,
+            }
+        )
+        next_pos[doctor_id] += 1
+
+        if doctor_id:
+            deltas[doctor_id] = deltas.get(doctor_id, 0) + 1
+
+    items = db.scalars(
+        insert(QueueItem).returning(QueueItem, sort_by_parameter_order=True),
+        queue_rows,
+    ).all()
+
+    for doctor_id, n in deltas.items():
+        doctor_service.update_queue_length(db=db, doctor_id=doctor_id, increment=n)
+
+    # Capture before commit expires the instances
+    entries = [QueueEntry.from_item(i) for i in items]
+    results = [
+        {
+            "walkin_id": walkin_id,
+            "queue_item_id": e.id,
+            "doctor_id": e.doctor_id,
+            "priority": e.priority,
+            "position": e.position,
+        }
+        for walkin_id, e in zip(walkin_ids, entries)
+    ]
+    return results, entries
+
+
+# ------------------------------------------------------------------
+# Walk-in intake (UNIT OF WORK)
+# ------------------------------------------------------------------
+def intake_walkin(db: Session, payload: dict) -> Dict[str, Any]:
+    """
+    Register a walk-in in ONE transaction:
+
+    1) INSERT walkins ... RETURNING
+    2) INSERT queue_items ... RETURNING (position = MAX(position) + 1)
+    3) doctor counter +1 (atomic UPDATE)
+    4) single commit
+
+    Nothing is re-read after commit. Either all three rows land or none.
+    """
+    if not payload.get("patient_name"):
+        raise ValueError("patient_name is required")
+
+    queue_engine.ensure_loaded(db)
+
+    try:
+        results, entries = _insert_walkins(db, [payload])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for entry in entries:
+        queue_engine.add(entry)
+        publish_queue_change(entry)
+
+    result = results[0]
+    publish("walkin.created", result)
+    logger.info(
+        f"Walk-in intake | ID={result['walkin_id']} | Queue={result['queue_item_id']} | "
+        f"Doctor={result['doctor_id']} | Priority={result['priority']} | Pos={result['position']}"
+    )
+    return result
+
+
+# ------------------------------------------------------------------
+# Bulk walk-in intake (ONE TRANSACTION PER CHUNK)
+# ------------------------------------------------------------------
+def intake_walkins_bulk(db: Session, payloads: Sequence[dict]) -> List[Dict[str, Any]]:
+    """
+    Register many (already validated) walk-ins.
+
+    - BULK_IMPORT_CHUNK_SIZE rows per transaction
+    - A failing chunk is rolled back on its own; other chunks still land
+    - Returns one result per payload, in input order:
+        {"ok": True, walkin_id, queue_item_id, ...} | {"ok": False, "error": ...}
+    """
+    chunk_size = int(getattr(settings, "BULK_IMPORT_CHUNK_SIZE", 500))
+    queue_engine.ensure_loaded(db)
+
+    out: List[Dict[str, Any]] = []
+    for chunk in chunked(payloads, chunk_size):
+        try:
+            results, entries = _insert_walkins(db, chunk)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Bulk walk-in chunk failed | Rows={len(chunk)}")
+            out.extend({"ok": False, "error": str(e)} for _ in chunk)
+            continue
+
+        for entry in entries:
+            queue_engine.add(entry)
+            publish_queue_change(entry)
+        for r in results:
+            publish("walkin.created", r)
+        out.extend({"ok": True, **r} for r in results)
+
+    logger.info(
+        f"Bulk walk-in intake | Rows={len(payloads)} | "
+        f"Created={sum(1 for r in out if r['ok'])}"
+    )
+    return out
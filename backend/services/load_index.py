@@ -0,0 +1,133 @@
+# backend/services/load_index.py
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Any, Collection, Dict, Iterable, List, MutableMapping, Optional, Tuple
+
+from backend.core.config import settings
+
+# (queue_length, roster position, doctor id)
+_Entry = Tuple[int, int, Any]
+
+
+def _load(doctor: MutableMapping[str, Any]) -> int:
+    return int(doctor.get("current_queue_length", 0) or 0)
+
+
+class DoctorLoadIndex:
+    """
+    Department-keyed min-heaps of doctor load (current_queue_length).
+
+    - least_busy() is O(log n): no per-call filter + sort of the roster
+    - set_load()/adjust() update one doctor incrementally; superseded heap
+      entries are skipped lazily and compacted once they pile up
+    - Ties resolve in roster order, same as a stable sort
+    - ON_LEAVE doctors are not indexed
+    - Thread-safe: the shared availability index updates it after commits
+      while request threads read it
+
+    Department key None covers all departments.
+    """
+
+    def __init__(self, doctors: Iterable[MutableMapping[str, Any]]) -> None:
+        self._lock = threading.Lock()
+        self._doctors: Dict[Any, MutableMapping[str, Any]] = {}
+        self._entries: Dict[Any, _Entry] = {}
+        self._heaps: Dict[Optional[str], List[_Entry]] = {None: []}
+
+        for pos, d in enumerate(doctors):
+            if d.get("status") == settings.STATUS_ON_LEAVE or d.get("id") is None:
+                continue
+            entry = (_load(d), pos, d["id"])
+            self._doctors[d["id"]] = d
+            self._entries[d["id"]] = entry
+            self._heaps.setdefault(d.get("department"), []).append(entry)
+            self._heaps[None].append(entry)
+
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, doctor_id: Any) -> Optional[int]:
+        entry = self._entries.get(doctor_id)
+        return entry[0] if entry else None
+
+    def set_load(self, doctor_id: Any, queue_length: int) -> None:
+        """Record a doctor's new queue length (keeps the doctor dict in sync)."""
+        with self._lock:
+            self._set(doctor_id, queue_length)
+
+    def adjust(self, doctor_id: Any, delta: int) -> None:
+        with self._lock:
+            entry = self._entries.get(doctor_id)
+            if entry is not None:
+                self._set(doctor_id, entry[0] + delta)
+
+    def least_busy(
+        self,
+        department: Optional[str],
+        eligible: Optional[Collection[Any]] = None,
+    ) -> Optional[MutableMapping[str, Any]]:
+        """
+        Least loaded doctor of a department, optionally restricted to the
+        doctor ids in `eligible` (e.g. those on shift).
+        """
+        with self._lock:
+            return self._least_busy(department, eligible)
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _set(self, doctor_id: Any, queue_length: int) -> None:
+        entry = self._entries.get(doctor_id)
+        if entry is None:
+            return
+        queue_length = max(0, int(queue_length))
+        doctor = self._doctors[doctor_id]
+        doctor["current_queue_length"] = queue_length
+        if queue_length == entry[0]:
+            return
+
+        entry = (queue_length, entry[1], doctor_id)
+        self._entries[doctor_id] = entry
+        for key in (doctor.get("department"), None):
+            heap = self._heaps[key]
+            heapq.heappush(heap, entry)
+            if len(heap) > 2 * len(self._entries) + 16:
+                self._compact(key)
+
+    def _least_busy(
+        self,
+        department: Optional[str],
+        eligible: Optional[Collection[Any]],
+    ) -> Optional[MutableMapping[str, Any]]:
+        heap = self._heaps.get(department)
+        if not heap:
+            return None
+
+        # Stale tops can go for good
+        while heap and self._entries.get(heap[0][2]) != heap[0]:
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        if eligible is None:
+            return self._doctors[heap[0][2]]
+
+        # Walk the heap in order without popping (frontier of child indices)
+        frontier = [(heap[0], 0)]
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            if self._entries.get(entry[2]) == entry and entry[2] in eligible:
+                return self._doctors[entry[2]]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return None
+
+    def _compact(self, key: Optional[str]) -> None:
+        heap = [e for e in self._heaps[key] if self._entries.get(e[2]) == e]
+        heapq.heapify(heap)
+        self._heaps[key] = heap
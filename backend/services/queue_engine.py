@@ -0,0 +1,226 @@
+# backend/services/queue_engine.py
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.logger import get_logger
+from backend.models.queue import QueueItem
+
+logger = get_logger(__name__)
+
+# Statuses kept resident (everything else has left the queue)
+ACTIVE_STATUSES = ("WAITING", "IN_PROGRESS")
+STATUS_WAITING = "WAITING"
+
+
+# ------------------------------------------------------------------
+# Entry (read-only snapshot of a queue_items row)
+# ------------------------------------------------------------------
+@dataclass(frozen=True)
+class QueueEntry:
+    id: int
+    source_type: str
+    source_id: int
+    doctor_id: Optional[str]
+    priority: int
+    position: int
+    status: str
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_item(cls, item: QueueItem) -> "QueueEntry":
+        return cls(
+            id=item.id,
+            source_type=item.source_type,
+            source_id=item.source_id,
+            doctor_id=item.doctor_id,
+            priority=int(item.priority if item.priority is not None else 3),
+            position=int(item.position or 0),
+            status=item.status,
+            created_at=item.created_at,
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "source_type": self.source_type,
+            "source_id": self.source_id,
+            "doctor_id": self.doctor_id,
+            "priority": self.priority,
+            "position": self.position,
+            "status": self.status,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+def _sort_key(entry: QueueEntry) -> Tuple[int, int, int]:
+    # Same order as the SQL path: priority DESC, position ASC, id ASC
+    return (-entry.priority, entry.position, entry.id)
+
+
+# ------------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------------
+class QueueEngine:
+    """
+    Resident per-doctor queue.
+
+    - One sorted lane per doctor_id (None = unassigned)
+    - Only WAITING / IN_PROGRESS items are kept in memory
+    - The database stays the source of truth: callers update the engine
+      only AFTER their commit succeeded
+    - Each worker process owns its own engine, so it is re-synced from
+      queue_items every QUEUE_ENGINE_RESYNC_SECONDS (0 = never)
+    """
+
+    def __init__(self, resync_seconds: Optional[int] = None) -> None:
+        self._lock = threading.RLock()
+        self._lanes: Dict[Optional[str], List[QueueEntry]] = {}
+        self._index: Dict[int, QueueEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self.resync_seconds = (
+            int(getattr(settings, "QUEUE_ENGINE_RESYNC_SECONDS", 30))
+            if resync_seconds is None
+            else int(resync_seconds)
+        )
+
+    # -----------------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------------
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, db: Session) -> int:
+        """(Re)build every lane from queue_items. Returns number of entries."""
+        rows = db.execute(
+            select(QueueItem).where(QueueItem.status.in_(ACTIVE_STATUSES))
+        ).scalars().all()
+
+        lanes: Dict[Optional[str], List[QueueEntry]] = {}
+        index: Dict[int, QueueEntry] = {}
+        for item in rows:
+            entry = QueueEntry.from_item(item)
+            lanes.setdefault(entry.doctor_id, []).append(entry)
+            index[entry.id] = entry
+
+        for lane in lanes.values():
+            lane.sort(key=_sort_key)
+
+        with self._lock:
+            self._lanes = lanes
+            self._index = index
+            self._loaded_at = time.monotonic()
+
+        logger.info(f"Queue engine loaded | Items={len(index)} | Lanes={len(lanes)}")
+        return len(index)
+
+    def ensure_loaded(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            self.load(db)
+            return
+
+        if self.resync_seconds > 0 and time.monotonic() - loaded_at >= self.resync_seconds:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Force a full reload on next access."""
+        with self._lock:
+            self._loaded_at = None
+
+    # -----------------------------------------------------------------
+    # Mutations (call after commit)
+    # -----------------------------------------------------------------
+    def upsert(self, item: QueueItem) -> None:
+        """Insert / move / drop an item based on its current row state."""
+        self.add(QueueEntry.from_item(item))
+
+    def add(self, entry: QueueEntry) -> None:
+        """Same as upsert() for an already-captured entry."""
+        if not self.is_loaded:
+            return
+
+        with self._lock:
+            self._remove_locked(entry.id)
+            if entry.status in ACTIVE_STATUSES:
+                self._insert_locked(entry)
+
+    def discard(self, queue_item_id: int) -> None:
+        with self._lock:
+            self._remove_locked(queue_item_id)
+
+    def _insert_locked(self, entry: QueueEntry) -> None:
+        lane = self._lanes.setdefault(entry.doctor_id, [])
+        bisect.insort(lane, entry, key=_sort_key)
+        self._index[entry.id] = entry
+
+    def _remove_locked(self, queue_item_id: int) -> Optional[QueueEntry]:
+        entry = self._index.pop(queue_item_id, None)
+        if entry is None:
+            return None
+
+        lane = self._lanes.get(entry.doctor_id) or []
+        i = bisect.bisect_left(lane, _sort_key(entry), key=_sort_key)
+        if i < len(lane) and lane[i].id == entry.id:
+            del lane[i]
+        if not lane:
+            self._lanes.pop(entry.doctor_id, None)
+        return entry
+
+    # -----------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------
+    def snapshot(
+        self,
+        doctor_id: Optional[str] = None,
+        only_waiting: bool = True,
+    ) -> List[QueueEntry]:
+        """
+        Ordered queue view.
+        doctor_id=None returns every lane merged in global order.
+        """
+        with self._lock:
+            if doctor_id is not None:
+                lanes: Iterable[List[QueueEntry]] = [list(self._lanes.get(doctor_id, ()))]
+            else:
+                lanes = [list(lane) for lane in self._lanes.values()]
+
+        merged = heapq.merge(*lanes, key=_sort_key)
+        if only_waiting:
+            return [e for e in merged if e.status == STATUS_WAITING]
+        return list(merged)
+
+    def next_position(self, doctor_id: Optional[str]) -> int:
+        """Equivalent of MAX(position) + 1 over a doctor's WAITING rows."""
+        with self._lock:
+            lane = self._lanes.get(doctor_id, ())
+            return max((e.position for e in lane if e.status == STATUS_WAITING), default=0) + 1
+
+    def head_position(self, doctor_id: Optional[str]) -> int:
+        """Position that sorts ahead of every WAITING row of a doctor."""
+        with self._lock:
+            lane = self._lanes.get(doctor_id, ())
+            return min((e.position for e in lane if e.status == STATUS_WAITING), default=1) - 1
+
+    def count(self, doctor_id: Optional[str], only_waiting: bool = False) -> int:
+        with self._lock:
+            lane = self._lanes.get(doctor_id, ())
+            if only_waiting:
+                return sum(1 for e in lane if e.status == STATUS_WAITING)
+            return len(lane)
+
+
+# Process-wide engine used by queue_service
+queue_engine = QueueEngine()
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, or_, select, update
 
 from backend.models.queue import QueueItem
+from backend.services.queue_engine import ACTIVE_STATUSES, QueueEntry, queue_engine
+from backend.core.events import publish
 from backend.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,6 +20,67 @@ STATUS_IN_PROGRESS = "IN_PROGRESS"
 STATUS_COMPLETED = "COMPLETED"
 
 
+# ------------------------------------------------------------------
+# Post-commit sync (engine + live stream)
+# ------------------------------------------------------------------
+def _committed(item: QueueItem) -> None:
+    entry = QueueEntry.from_item(item)
+    queue_engine.add(entry)
+    publish_queue_change(entry)
+
+
+def publish_queue_change(entry: QueueEntry) -> None:
+    if entry.status in ACTIVE_STATUSES:
+        publish("queue.upsert", entry.as_dict())
+    else:
+        publish("queue.remove", {"id": entry.id, "doctor_id": entry.doctor_id})
+
+
+# ------------------------------------------------------------------
+# Positions (evaluated by the database inside the INSERT)
+#
+# Per-worker engines can be up to QUEUE_ENGINE_RESYNC_SECONDS stale, so
+# new positions are never taken from memory: the scalar subquery runs in
+# the same statement (and write transaction) that inserts the row.
+# ------------------------------------------------------------------
+def _waiting_position_agg(agg, doctor_id: Optional[str]):
+    q = aliased(QueueItem)  # not correlated with the INSERT target
+    return select(agg(q.position)).where(
+        q.doctor_id == doctor_id,
+        q.status == STATUS_WAITING,
+    ).scalar_subquery()
+
+
+def next_position_sql(doctor_id: Optional[str]):
+    """MAX(position) + 1 over a doctor's WAITING rows."""
+    return func.coalesce(_waiting_position_agg(func.max, doctor_id), 0) + 1
+
+
+def head_position_sql(doctor_id: Optional[str]):
+    """MIN(position) - 1 over a doctor's WAITING rows (sorts ahead of all)."""
+    return func.coalesce(_waiting_position_agg(func.min, doctor_id), 1) - 1
+
+
+def next_positions(db: Session, doctor_ids: Iterable[Optional[str]]) -> Dict[Optional[str], int]:
+    """
+    next_position_sql() for several doctors in one query, for batch
+    inserts. Call it inside the write transaction, after its first write.
+    """
+    wanted = set(doctor_ids)
+    ids = [d for d in wanted if d is not None]
+    lane = QueueItem.doctor_id.in_(ids)
+    if None in wanted:
+        lane = or_(lane, QueueItem.doctor_id.is_(None))
+
+    rows = db.execute(
+        select(QueueItem.doctor_id, func.max(QueueItem.position))
+        .where(QueueItem.status == STATUS_WAITING, lane)
+        .group_by(QueueItem.doctor_id)
+    ).all()
+    found = {d: int(max_pos or 0) for d, max_pos in rows}
+    return {d: found.get(d, 0) + 1 for d in wanted}
+
+
 # ------------------------------------------------------------------
 # Read
 # ------------------------------------------------------------------
@@ -25,22 +88,33 @@ def list_queue(
     db: Session,
     doctor_id: Optional[str] = None,
     only_waiting: bool = True,
-) -> List[QueueItem]:
+    read_db: Optional[Session] = None,
+) -> Sequence[Union[QueueItem, QueueEntry]]:
+    """
+    Ordered queue.
+
+    - WAITING view is served from the resident queue engine (no SELECT).
+      The engine is only ever (re)loaded from `db`, the primary: a lagging
+      replica must not roll its state back
+    - Full history (only_waiting=False) still goes to the database,
+      on `read_db` (e.g. a replica session) when given
+    """
+    if only_waiting:
+        queue_engine.ensure_loaded(db)
+        return queue_engine.snapshot(doctor_id=doctor_id, only_waiting=True)
+
     stmt = select(QueueItem)
 
     if doctor_id:
         stmt = stmt.where(QueueItem.doctor_id == doctor_id)
 
-    if only_waiting:
-        stmt = stmt.where(QueueItem.status == STATUS_WAITING)
-
     stmt = stmt.order_by(
         QueueItem.priority.desc(),   # Higher priority first (5 > 4 > 3 > 1)
         QueueItem.position.asc(),    # FIFO inside same priority
         QueueItem.id.asc(),
     )
 
-    return db.execute(stmt).scalars().all()
+    return (read_db or db).execute(stmt).scalars().all()
 
 
 # ------------------------------------------------------------------
@@ -64,27 +138,19 @@ def enqueue(
     """
 
     # Only count WAITING items for clean queue positions
-    max_pos = db.execute(
-        select(func.max(QueueItem.position)).where(
-            QueueItem.doctor_id == doctor_id,
-            QueueItem.status == STATUS_WAITING,
-        )
-    ).scalar()
-
-    position = int(max_pos or 0) + 1
-
     item = QueueItem(
         source_type=source_type,
         source_id=source_id,
         doctor_id=doctor_id,
         priority=int(priority) if priority is not None else 3,
-        position=position,
+        position=next_position_sql(doctor_id),
         status=STATUS_WAITING,
     )
 
     db.add(item)
     db.commit()
     db.refresh(item)
+    _committed(item)
 
     logger.info(
         f"Enqueued | Type={source_type} | Source={source_id} | "
@@ -105,6 +171,7 @@ def mark_in_progress(db: Session, queue_item_id: int) -> Optional[QueueItem]:
     item.status = STATUS_IN_PROGRESS
     db.commit()
     db.refresh(item)
+    _committed(item)
     return item
 
 
@@ -119,9 +186,29 @@ def complete_item(db: Session, queue_item_id: int) -> Optional[QueueItem]:
     item.status = STATUS_COMPLETED
     db.commit()
     db.refresh(item)
+    _committed(item)
     return item
 
 
+def close_source(db: Session, source_type: str, source_id: int) -> List[QueueEntry]:
+    """
+    Mark the active queue_items of one source COMPLETED inside the
+    caller's transaction (no commit). After committing, pass each entry to
+    queue_engine.add() and publish_queue_change().
+    """
+    items = db.scalars(
+        update(QueueItem)
+        .where(
+            QueueItem.source_type == source_type,
+            QueueItem.source_id == source_id,
+            QueueItem.status.in_(ACTIVE_STATUSES),
+        )
+        .values(status=STATUS_COMPLETED)
+        .returning(QueueItem)
+    ).all()
+    return [QueueEntry.from_item(item) for item in items]
+
+
 # ------------------------------------------------------------------
 # Emergency Jump (CRITICAL)
 # ------------------------------------------------------------------
@@ -133,33 +220,100 @@ def emergency_jump(
 ) -> QueueItem:
     """
     Force emergency to top of queue.
-    ✅ Moves all WAITING items down by +1 position.
-    ✅ Inserts CRITICAL item at position=0
+    ✅ Takes position = (lowest WAITING position) - 1, so nothing is renumbered
+    ✅ Inserts exactly one CRITICAL row (compact_positions() tidies keys later)
     """
-
-    # Shift waiting items down (only for same doctor queue)
-    db.execute(
-        update(QueueItem)
-        .where(
-            QueueItem.doctor_id == doctor_id,
-            QueueItem.status == STATUS_WAITING,
-        )
-        .values(position=QueueItem.position + 1)
-    )
-
     item = QueueItem(
         source_type=source_type,
         source_id=source_id,
         doctor_id=doctor_id,
         priority=5,
-        position=0,
+        position=head_position_sql(doctor_id),
         status=STATUS_WAITING,
     )
 
     db.add(item)
     db.commit()
     db.refresh(item)
+    _committed(item)
 
-    logger.warning(f"EMERGENCY JUMP | Source={source_id} | Doctor={doctor_id}")
+    logger.warning(
+        f"EMERGENCY JUMP | Source={source_id} | Doctor={doctor_id} | Pos={item.position}"
+    )
 
     return item
+
+
+# ------------------------------------------------------------------
+# Compaction (BACKGROUND)
+# ------------------------------------------------------------------
+def compact_positions(db: Session, doctor_id: Optional[str] = None) -> int:
+    """
+    Renumber WAITING positions per doctor to consecutive values, keeping
+    current order.
+
+    Emergency jumps hand out ever-lower positions; this folds them back.
+    Only lanes that actually drifted (position < 1) are rewritten and only
+    rows whose position changes are updated. Returns rows updated.
+
+    A lane's highest position is never lowered: the new range ends at
+    max(old max, n), so MAX(position) + 1 stays behind everyone already
+    waiting. If a row was queued into a rewritten lane between the read
+    and the UPDATE (checked while holding the write lock), the pass is
+    rolled back and left to the next run.
+    """
+    stmt = select(QueueItem.id, QueueItem.doctor_id, QueueItem.position).where(
+        QueueItem.status == STATUS_WAITING
+    )
+    if doctor_id:
+        stmt = stmt.where(QueueItem.doctor_id == doctor_id)
+    stmt = stmt.order_by(
+        QueueItem.doctor_id,
+        QueueItem.position.asc(),
+        QueueItem.id.asc(),
+    )
+
+    lanes: Dict[Optional[str], List[Tuple[int, int]]] = {}
+    for item_id, lane_doctor_id, position in db.execute(stmt).all():
+        lanes.setdefault(lane_doctor_id, []).append((item_id, int(position or 0)))
+
+    changes: List[Dict[str, int]] = []
+    rewritten: Dict[Optional[str], int] = {}
+    for lane_doctor_id, rows in lanes.items():
+        if rows[0][1] >= 1:
+            continue
+        top = max(rows[-1][1], len(rows))
+        rewritten[lane_doctor_id] = max(item_id for item_id, _ in rows)
+        changes.extend(
+            {"id": item_id, "position": new_pos}
+            for new_pos, (item_id, old_pos) in enumerate(rows, start=top - len(rows) + 1)
+            if old_pos != new_pos
+        )
+
+    if not changes:
+        return 0
+
+    db.execute(update(QueueItem), changes)
+
+    late = db.execute(
+        select(func.count()).select_from(QueueItem).where(
+            QueueItem.status == STATUS_WAITING,
+            or_(
+                *(
+                    and_(QueueItem.doctor_id == lane_doctor_id, QueueItem.id > last_id)
+                    for lane_doctor_id, last_id in rewritten.items()
+                )
+            ),
+        )
+    ).scalar()
+    if late:
+        db.rollback()
+        logger.info(f"Queue compaction skipped | Late rows={late}")
+        return 0
+
+    db.commit()
+    queue_engine.load(db)
+    publish("queue.resync", {"reason": "compaction"})
+
+    logger.info(f"Queue positions compacted | Rows={len(changes)}")
+    return len(changes)
@@ -7,6 +7,9 @@ from sqlalchemy import select
 
 from backend.models.walkin import WalkIn
 from backend.services.doctor_service import DoctorService
+from backend.services.queue_engine import queue_engine
+from backend.services.queue_service import close_source, publish_queue_change
+from backend.core.events import publish
 from backend.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,8 +26,8 @@ def normalize_priority_to_int(value: Any) -> int:
     """
     Convert incoming priority to integer.
     Supports:
-      - "critical" | "high" | "normal" | "low"
-      - 5 | 4 | 3 | 1
+      - "critical" | "high" | "normal" | "low" (and aliases)
+      - 5 | 4 | 3 | 1, as numbers or as text (CSV imports)
     DB stores:
       5 = CRITICAL
       4 = HIGH
@@ -34,18 +37,27 @@ def normalize_priority_to_int(value: Any) -> int:
     if value is None:
         return 3
 
-    if isinstance(value, int):
-        if value in (1, 3, 4, 5):
-            return value
-        return 3
+    if isinstance(value, (int, float)):
+        n = int(value)
+        if n >= 5:
+            return 5
+        if n == 4:
+            return 4
+        if n == 3:
+            return 3
+        return 1
 
     s = str(value).strip().lower()
 
+    # CSV imports send numbers as text
+    if s.isdigit():
+        return normalize_priority_to_int(int(s))
+
     if s in ("critical", "crit", "emergency", "p0"):
         return 5
     if s in ("high", "urgent", "p1"):
         return 4
-    if s in ("normal", "medium", "routine", "p2"):
+    if s in ("normal", "medium", "routine", "standard", "p2"):
         return 3
     if s in ("low", "p3"):
         return 1
@@ -86,6 +98,10 @@ def create_walkin(db: Session, payload: dict) -> WalkIn:
     db.add(w)
     db.commit()
     db.refresh(w)
+    publish(
+        "walkin.created",
+        {"walkin_id": w.id, "doctor_id": w.assigned_doctor_id, "priority": w.priority},
+    )
 
     logger.info(
         f"Walk-in created | ID={w.id} | Doctor={w.assigned_doctor_id} | Priority={w.priority}"
@@ -113,20 +129,28 @@ def update_status(
     w.status = new_status
 
     # ---------------- Queue handling ----------------
-    if (
-        w.assigned_doctor_id
-        and old_status not in QUEUE_EXIT_STATUSES
-        and new_status in QUEUE_EXIT_STATUSES
-    ):
-        doctor_service.update_queue_length(
-            db=db,
-            doctor_id=w.assigned_doctor_id,
-            increment=-1,
-        )
-        logger.info(
-            f"Doctor queue decremented | Doctor={w.assigned_doctor_id} | WalkIn={walkin_id}"
-        )
+    # The queue_item and the counter leave together (same transaction),
+    # so reconcile_queue_lengths() agrees with the decrement
+    closed = []
+    if old_status not in QUEUE_EXIT_STATUSES and new_status in QUEUE_EXIT_STATUSES:
+        closed = close_source(db, "walkin", walkin_id)
+        if w.assigned_doctor_id:
+            doctor_service.update_queue_length(
+                db=db,
+                doctor_id=w.assigned_doctor_id,
+                increment=-1,
+            )
+            logger.info(
+                f"Doctor queue decremented | Doctor={w.assigned_doctor_id} | WalkIn={walkin_id}"
+            )
 
     db.commit()
     db.refresh(w)
+    for entry in closed:
+        queue_engine.add(entry)
+        publish_queue_change(entry)
+    publish(
+        "walkin.status",
+        {"id": w.id, "status": w.status, "assigned_doctor_id": w.assigned_doctor_id},
+    )
     return w
@@ -19,3 +19,86 @@ def db_session(engine):
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture()
+def app_db_url(tmp_path):
+    """Throwaway SQLite file shared by the sync and async test engines."""
+    return f"sqlite:///{tmp_path / 'app.db'}"
+
+
+@pytest.fixture()
+def app_db(app_db_url):
+    """SQLite session with the application schema created."""
+    from backend.core.data_versions import install_write_tracking
+    from backend.core.database import Base, _import_models, install_sqlite_profile
+
+    _import_models()
+    file_engine = create_engine(app_db_url, connect_args={"check_same_thread": False})
+    install_sqlite_profile(file_engine)
+    install_write_tracking(file_engine)
+    Base.metadata.create_all(bind=file_engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        file_engine.dispose()
+
+
+@pytest.fixture()
+def async_app_engine(app_db, app_db_url):
+    """Async engine on the same file as app_db (NullPool: TestClient loops vary)."""
+    import asyncio
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from backend.core.data_versions import install_write_tracking
+    from backend.core.database import _async_url, install_sqlite_profile
+
+    aengine = create_async_engine(_async_url(app_db_url), poolclass=NullPool)
+    install_sqlite_profile(aengine.sync_engine)
+    install_write_tracking(aengine.sync_engine)
+    yield aengine
+    asyncio.run(aengine.dispose())
+
+
+@pytest.fixture()
+def fresh_engine():
+    """Process-wide queue engine, forced to reload from the test database."""
+    from backend.services.availability_index import availability_index
+    from backend.services.queue_engine import queue_engine
+
+    queue_engine.invalidate()
+    availability_index.invalidate()
+    yield queue_engine
+    queue_engine.invalidate()
+    availability_index.invalidate()
+
+
+@pytest.fixture()
+def client(app_db, async_app_engine, fresh_engine):
+    """TestClient bound to the test database (lifespan not run)."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from backend.app import app
+    from backend.core.database import get_async_db, get_async_read_db, get_db, get_read_db
+
+    AsyncSessionLocal = async_sessionmaker(async_app_engine, expire_on_commit=False)
+
+    async def _async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    overrides = {
+        get_db: lambda: app_db,
+        get_read_db: lambda: app_db,
+        get_async_db: _async_db,
+        get_async_read_db: _async_db,
+    }
+    app.dependency_overrides.update(overrides)
+    try:
+        yield TestClient(app)
+    finally:
+        for dep in overrides:
+            app.dependency_overrides.pop(dep, None)
@@ -1,3 +1,450 @@
-# tests/test_ai_agent.py
+# backend/tests/test_ai_agent.py
+from backend.ai_agent.decision_logic import DecisionEngine
+from backend.services.availability_index import ShiftIndex
+
+
+def _doctor(id, dept, start, end, queue=0, status="AVAILABLE"):
+    return {
+        "id": id,
+        "name": f"Dr. {id}",
+        "department": dept,
+        "shift_start": start,
+        "shift_end": end,
+        "status": status,
+        "current_queue_length": queue,
+    }
+
+
+ROSTER = [
+    _doctor("day", "CARDIOLOGY", "09:00", "17:00", queue=5),
+    _doctor("night", "CARDIOLOGY", "22:00", "06:00"),
+    _doctor("any", "CARDIOLOGY", None, None, queue=9),
+    _doctor("away", "CARDIOLOGY", "00:00", "23:59", status="ON_LEAVE"),
+    _doctor("ortho", "ORTHOPEDICS", "09:00", "17:00"),
+]
+
+
+def _ids(doctors):
+    return [d["id"] for d in doctors]
+
+
 def test_placeholder_ai_agent():
     assert True
+
+
+def test_shift_index_lookups():
+    index = ShiftIndex(ROSTER)
+
+    assert _ids(index.on_shift("CARDIOLOGY", "14:30")) == ["day", "any"]
+    assert _ids(index.on_shift("CARDIOLOGY", "23:15")) == ["night", "any"]
+    assert _ids(index.on_shift("CARDIOLOGY", "05:59")) == ["night", "any"]
+    assert _ids(index.on_shift("CARDIOLOGY", "06:00")) == ["any"]
+    assert _ids(index.on_shift("CARDIOLOGY", "17:00")) == ["any"]
+    assert _ids(index.on_shift(None, "10:00")) == ["day", "any", "ortho"]
+    assert index.on_shift("DENTAL", "10:00") == ()
+    assert _ids(index.department("CARDIOLOGY")) == ["day", "night", "any"]
+
+
+def test_assignment_respects_shift():
+    engine = DecisionEngine()
+    patient = {"department": "CARDIOLOGY"}
+
+    # least busy overall is off shift at 14:30
+    at_day = engine.assign_appointment({"doctors": ROSTER}, patient, preferred_time="14:30")
+    assert at_day["assigned_doctor_id"] == "day"
+
+    anytime = engine.assign_appointment({"doctors": ROSTER}, patient)
+    assert anytime["assigned_doctor_id"] == "night"
+
+    walkin = engine.process_walkin(
+        {"doctors": ROSTER}, {"department": "ORTHOPEDICS", "arrival_time": "20:00"}, "NORMAL"
+    )
+    assert walkin["status"] == "NO_DOCTOR_AVAILABLE"
+
+
+def test_load_index_tracks_queue_changes():
+    from backend.services.load_index import DoctorLoadIndex
+
+    doctors = [
+        _doctor("a", "GENERAL", "09:00", "17:00", queue=2),
+        _doctor("b", "GENERAL", "09:00", "17:00", queue=2),
+        _doctor("c", "GENERAL", "20:00", "23:00", queue=0),
+    ]
+    state = {"doctors": doctors}
+    engine = DecisionEngine()
+    patient = {"department": "GENERAL"}
+    index = DoctorLoadIndex(doctors)
+
+    # ties go to roster order; off-shift "c" is skipped
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == "a"
+    assert engine.assign_appointment(state, patient)["assigned_doctor_id"] == "c"
+
+    index.adjust("a", 1)
+    assert doctors[0]["current_queue_length"] == 3
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == "b"
+
+    for n in range(50):
+        index.set_load("b", 10 + n)
+    index.set_load("c", 99)
+    assert index.least_busy("GENERAL")["id"] == "a"
+    assert engine.activate_emergency_protocol(state, patient)["assigned_doctor_id"] == "a"
+
+
+def test_repeated_observations_see_current_loads():
+    from backend.ai_agent.decision_logic import evaluate_observation
+
+    doctors = [
+        _doctor("a", "GENERAL", None, None),
+        _doctor("b", "GENERAL", None, None),
+    ]
+    observation = {"action": "assign_appointment", "state": {"doctors": doctors}, "patient_data": {"department": "GENERAL"}}
+
+    picks = []
+    for load_a in (0, 5, 0):
+        doctors[0]["current_queue_length"] = load_a
+        picks.append(evaluate_observation(observation)["assigned_doctor_id"])
+    assert picks == ["a", "b", "a"]
+    assert list(observation["state"]) == ["doctors"]
+
+
+def test_evaluate_many_shares_snapshot_and_validates_first():
+    import pytest
+    from backend.ai_agent.decision_logic import decision_engine, evaluate_many, evaluate_observation
+
+    state = {"doctors": [dict(d) for d in ROSTER]}
+    observations = [
+        {"action": "assign_appointment", "patient_data": {"department": "CARDIOLOGY"}, "preferred_time": "14:30"},
+        {"action": "process_walkin", "patient_data": {"department": "CARDIOLOGY", "arrival_time": "23:00"}, "priority": "NORMAL"},
+        {"action": "detect_overload"},
+    ]
+
+    results = evaluate_many(observations, state=state)
+    assert [r.get("assigned_doctor_id") for r in results[:2]] == ["day", "night"]
+    assert results[2] == {"is_overloaded": False}
+    assert results == [evaluate_observation({**o, "state": state}) for o in observations]
+    assert list(state) == ["doctors"]
+    assert decision_engine.evaluate(observations[0], state) == results[0]
+
+    # nothing runs when any observation in the batch is malformed
+    untouched = {"doctors": ROSTER}
+    with pytest.raises(KeyError):
+        evaluate_many([observations[0], {"action": "process_walkin"}], state=untouched)
+    assert untouched == {"doctors": ROSTER}
+    with pytest.raises(ValueError):
+        evaluate_observation({"action": "nope"})
+
+
+def _agent(tmp_path):
+    from backend.ai_agent.agent import AgentConfig, RuleBasedAgent
+    from backend.ai_agent.audit_log import AuditConfig
+
+    return RuleBasedAgent(AgentConfig(audit=AuditConfig(log_path=tmp_path / "ai.jsonl")))
+
+
+WAITING_ROOM = [
+    dict(patient_id="p1", spo2=85, heart_rate=90, systolic_bp=120, diastolic_bp=80, temperature_c=37.0),
+    dict(patient_id="p2", spo2=99, heart_rate=72, systolic_bp=118, diastolic_bp=76, respiratory_rate=14, temperature_c=36.8),
+    dict(patient_id="p3", systolic_bp=70, diastolic_bp=90, spo2=98, heart_rate=80, temperature_c=37.0),
+    dict(patient_id="p4", spo2=92, heart_rate=140, systolic_bp=110, diastolic_bp=70, temperature_c=39.4),
+    dict(patient_id="p5"),
+]
+
+
+def test_decide_batch_matches_decide(tmp_path):
+    import json
+    from backend.ai_agent.observation import Observation
+
+    agent = _agent(tmp_path)
+    observations = [Observation(**o) for o in WAITING_ROOM]
+
+    batch = agent.decide_batch(observations)
+    single = [agent.decide(o) for o in observations]
+
+    assert [r.patient_id for r in batch] == [o.patient_id for o in observations]
+    for b, s in zip(batch, single):
+        assert (b.priority, b.score, b.triggered_rules, b.reasons, b.warnings) == (
+            s.priority, s.score, s.triggered_rules, s.reasons, s.warnings
+        )
+        assert b.recommendations == s.recommendations
+
+    p1, p2, p3, p4, p5 = batch
+    assert p1.priority == "critical" and p1.score >= 80 and "CRIT_SPO2_LT_90" in p1.triggered_rules
+    assert p2.priority == "low" and [r.code for r in p2.recommendations] == ["REC_GENERAL_MONITOR"]
+    assert p3.priority == "critical" and any("verify measurement" in w for w in p3.warnings)
+    assert p4.priority == "high" and p4.triggered_rules == ["MED_SPO2_LT_94", "HIGH_HR_GT_130", "HIGH_TEMP_GT_39"]
+    assert p5.warnings and p5.priority == "low"
+
+    agent.audit.flush()
+    lines = (tmp_path / "ai.jsonl").read_text(encoding="utf-8").splitlines()
+    events = [json.loads(line) for line in lines]
+    assert [e["decision_id"] for e in events[: len(batch)]] == [r.decision_id for r in batch]
+    assert agent.metrics.decisions_total == 2 * len(batch)
+    assert agent.decide_batch([]) == []
+
+
+def test_columnar_scoring_matches_per_observation():
+    import random
+    from backend.ai_agent.observation import Observation
+    from backend.ai_agent.triage import build_default_rules, score_observation
+    from backend.ai_agent.triage_columnar import rescore_audit_events, score_batch
+
+    rng = random.Random(7)
+
+    def vital(lo, hi):
+        return None if rng.random() < 0.2 else rng.randint(lo, hi)
+
+    observations = [Observation(**o) for o in WAITING_ROOM] + [
+        Observation(
+            patient_id=f"r{i}",
+            heart_rate=vital(30, 170),
+            respiratory_rate=vital(5, 35),
+            systolic_bp=vital(60, 200),
+            diastolic_bp=vital(40, 130),
+            spo2=vital(80, 100),
+            temperature_c=None if rng.random() < 0.2 else round(rng.uniform(34, 41), 1),
+        )
+        for i in range(500)
+    ]
+    rules = build_default_rules()
+    expected = [score_observation(o, rules) for o in observations]
+
+    assert score_batch(observations, rules) == expected
+    assert score_batch([o.model_dump() for o in observations], rules) == expected
+
+    events = [
+        {"type": "decision", "decision_id": str(i), "priority": "low", "score": 0, "observation": o.model_dump()}
+        for i, o in enumerate(observations)
+    ]
+    rescored = list(rescore_audit_events(events, rules, chunk_size=64))
+    assert [(r["priority"], r["score"]) for r in rescored] == [(e[1], e[0]) for e in expected]
+
+
+def test_buffered_audit_writer_drops_when_full_and_drains_on_close(tmp_path, monkeypatch):
+    import json
+    import threading
+    import time
+    from backend.ai_agent import audit_log
+
+    path = tmp_path / "audit.jsonl"
+    audit = audit_log.AIAuditLogger(audit_log.AuditConfig(log_path=path, queue_size=4))
+
+    # Hold the writer thread on its first event so the queue fills up
+    gate = threading.Event()
+    to_line = audit_log._to_line
+    monkeypatch.setattr(audit_log, "_to_line", lambda p: gate.wait(5) and to_line(p))
+    try:
+        audit.write_events([{"n": 0}])
+        deadline = time.monotonic() + 5
+        while audit.stats()["queued"] and time.monotonic() < deadline:
+            time.sleep(0.005)
+        audit.write_events([{"n": i} for i in range(1, 11)])
+        stats = audit.stats()
+    finally:
+        gate.set()
+
+    assert stats["dropped"] == 6 and stats["backpressure_waits"] == 6
+    audit.close()
+    audit.write_event({"n": "after-close"})  # synchronous once closed
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2, 3, 4, "after-close"]
+    assert audit.stats()["written"] == 5 and audit.stats()["fsyncs"] >= 1
+
+
+def test_buffered_audit_writer_stops_when_closed_with_a_full_queue(tmp_path, monkeypatch):
+    import json
+    import threading
+    import time
+    from backend.ai_agent import audit_log
+
+    path = tmp_path / "audit.jsonl"
+    audit = audit_log.AIAuditLogger(
+        audit_log.AuditConfig(log_path=path, queue_size=4, put_timeout_s=0.001)
+    )
+
+    gate = threading.Event()
+    to_line = audit_log._to_line
+    monkeypatch.setattr(audit_log, "_to_line", lambda p: gate.wait(5) and to_line(p))
+    try:
+        audit.write_events([{"n": 0}])
+        writer = audit._writer
+        deadline = time.monotonic() + 5
+        while audit.stats()["queued"] and time.monotonic() < deadline:
+            time.sleep(0.005)
+        audit.write_events([{"n": i} for i in range(1, 5)])
+        assert audit.stats()["queued"] == 4
+
+        # No slot for a sentinel; close() must not depend on getting one
+        started = time.monotonic()
+        writer.close(timeout=0.2)
+        assert time.monotonic() - started < 1
+    finally:
+        gate.set()
+
+    writer._thread.join(2)
+    assert not writer._thread.is_alive()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2, 3, 4]
+    assert writer.fsyncs >= 1
+
+
+def test_buffered_audit_writer_totals_under_concurrent_writes(tmp_path):
+    import threading
+    from backend.ai_agent.audit_log import AIAuditLogger, AuditConfig
+
+    path = tmp_path / "audit.jsonl"
+    audit = AIAuditLogger(AuditConfig(log_path=path, queue_size=16, batch_size=8, put_timeout_s=0.001))
+
+    def producer(t):
+        for i in range(100):
+            audit.write_events([{"t": t, "i": i, "k": k} for k in range(3)])
+
+    threads = [threading.Thread(target=producer, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    audit.flush()
+
+    stats = audit.stats()
+    assert stats["submitted"] + stats["dropped"] == 8 * 100 * 3
+    assert stats["written"] == stats["submitted"] > 0
+    assert stats["errors"] == 0 and stats["batches"] >= stats["written"] / 8
+    assert len(path.read_text(encoding="utf-8").splitlines()) == stats["written"]
+    audit.close()
+
+
+def test_audit_segments_rotate_compress_and_index(tmp_path):
+    import gzip
+    from datetime import datetime, timedelta, timezone
+    from backend.ai_agent.audit_log import AIAuditLogger, AuditConfig
+
+    audit = AIAuditLogger(
+        AuditConfig(log_path=tmp_path / "ai.jsonl", buffered=False, rotate_max_bytes=2000, block_bytes=500)
+    )
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(60):
+        audit.write_event(
+            {
+                "type": "decision",
+                "decision_id": f"d{i}",
+                "patient_id": f"p{i % 3}",
+                "created_at": (start + timedelta(days=i)).isoformat(),
+            }
+        )
+    audit.segments.wait_for_compression()
+
+    closed = audit.segments.closed_segments()
+    assert len(closed) == audit.segments.rotations >= 3
+    assert all(p.name.endswith(".jsonl.gz") for p in closed)
+    assert all((tmp_path / p.name.replace(".jsonl.gz", ".idx.json")).exists() for p in closed)
+
+    # Still plain gzip (concatenated members) + the active tail, in order
+    lines = [line for p in closed for line in gzip.open(p, "rt").read().splitlines()]
+    lines += (tmp_path / "ai.jsonl").read_text().splitlines()
+    assert len(lines) == 60 and '"d0"' in lines[0] and '"d59"' in lines[-1]
+
+    assert audit.find_decision("d7")["patient_id"] == "p1"
+    assert audit.find_decision("d59")["decision_id"] == "d59"
+    assert audit.find_decision("missing") is None
+
+    window = list(audit.find_patient("p2", since=start + timedelta(days=10), until=start + timedelta(days=30)))
+    assert [e["decision_id"] for e in window] == [f"d{i}" for i in range(11, 30, 3)]
+    assert len(list(audit.find_patient("p0"))) == 20
+    audit.close()
+
+
+def test_audit_segments_shared_by_two_processes(tmp_path):
+    import json
+    from backend.ai_agent.audit_segments import AuditSegments
+
+    # Two instances stand in for two workers: separate handles, lock files and sizes
+    path = tmp_path / "ai.jsonl"
+    workers = [AuditSegments(path, max_bytes=400, block_bytes=200) for _ in range(2)]
+    for i in range(60):
+        line = json.dumps({"decision_id": f"d{i}", "n": i}) + "\n"
+        workers[i % 2].append(line.encode("utf-8"))
+        if i % 7 == 0:
+            workers[i % 2].wait_for_compression()
+    for w in workers:
+        w.close()
+
+    reader = AuditSegments(path)
+    assert [e["n"] for _, e in reader.records()] == list(range(60))
+    assert all(p.stat().st_size <= 400 for p in [path, *reader.closed_segments()] if p.suffix == ".jsonl")
+    assert sum(w.rotations for w in workers) == len(reader.closed_segments()) >= 3
+
+
+def test_concurrent_compress_segment_claims_once(tmp_path, monkeypatch):
+    import gzip
+    import json
+    import threading
+    import time
+    from backend.ai_agent import audit_segments
+
+    plain = tmp_path / "ai.20260101T000000Z-0000.jsonl"
+    lines = [json.dumps({"decision_id": f"d{i}"}) for i in range(50)]
+    plain.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+    # Slow blocks so both calls overlap (two workers compressing leftovers)
+    compress = gzip.compress
+    monkeypatch.setattr(gzip, "compress", lambda data, **kw: time.sleep(0.02) or compress(data, **kw))
+
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(audit_segments.compress_segment(plain, block_bytes=200))
+        except Exception as e:  # pragma: no cover - the failure being tested
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    target = plain.with_name(plain.name + ".gz")
+    assert errors == []
+    assert target in results and set(results) <= {None, target}
+    assert gzip.open(target, "rt").read().splitlines() == lines
+    assert audit_segments.load_index(target)["events"] == 50
+    assert not plain.exists()
+
+    # Already finished by someone else: nothing to redo
+    assert audit_segments.compress_segment(plain) == target
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_latency_histogram_percentiles_and_sliding_window():
+    import random
+    from backend.ai_agent.metrics import RELATIVE_ERROR, AgentMetrics
+
+    now = [1000.0]
+    metrics = AgentMetrics(window_s=60, window_slices=6, clock=lambda: now[0])
+
+    rng = random.Random(3)
+    xs = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    for x in xs:
+        metrics.observe("low", x)
+
+    snap = metrics.snapshot()
+    ordered = sorted(xs)
+    for p in (50, 90, 95, 99):
+        exact = ordered[max(0, -(-len(xs) * p // 100) - 1)]
+        assert abs(snap["latency_ms"][f"p{p}"] - exact) <= RELATIVE_ERROR * exact + 1e-9
+    assert snap["p95_latency_ms"] == snap["latency_ms"]["p95"] == metrics.p95_latency_ms
+    assert abs(snap["avg_latency_ms"] - sum(xs) / len(xs)) < 1e-6
+    assert snap["window"]["count"] == len(xs)
+
+    # Older slices fall out of the window; lifetime keeps everything
+    now[0] += 30
+    metrics.observe_many(["high"] * 10, 500.0)
+    assert metrics.snapshot()["window"]["count"] == len(xs) + 10
+    now[0] += 45
+    snap = metrics.snapshot()
+    assert snap["window"]["count"] == 10 and abs(snap["window"]["p50"] - 500.0) <= 500.0 * RELATIVE_ERROR
+    assert snap["latency_ms"]["count"] == len(xs) + 10
+    assert snap["decisions_by_priority"] == {"low": len(xs), "high": 10}
+    now[0] += 60
+    assert metrics.snapshot()["window"] == {"seconds": 60, "count": 0, "avg": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0}
@@ -1,6 +1,47 @@
 # tests/test_database.py
-from sqlalchemy import text
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.core.database import install_sqlite_profile, sqlite_profile
+
 
 def test_db_can_connect(db_session):
     result = db_session.execute(text("SELECT 1")).scalar_one()
     assert result == 1
+
+
+def test_sqlite_profile_applied_to_new_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    install_sqlite_profile(engine)
+    install_sqlite_profile(engine)
+
+    profile = sqlite_profile(engine)
+    engine.dispose()
+
+    assert profile["journal_mode"] == "wal"
+    assert profile["synchronous"] == 1  # NORMAL
+    assert profile["busy_timeout"] == 5000
+    assert profile["cache_size"] == -65536
+    assert profile["temp_store"] == 2  # MEMORY
+
+
+def test_read_engine_connections_refuse_writes(tmp_path):
+    from sqlalchemy.exc import OperationalError
+
+    path = tmp_path / "split.db"
+    writer = create_engine(f"sqlite:///{path}")
+    reader = create_engine(f"sqlite:///{path}")
+    install_sqlite_profile(writer)
+    install_sqlite_profile(reader, read_only=True)
+
+    with writer.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+    with reader.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM t").scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("INSERT INTO t VALUES (2)")
+
+    writer.dispose()
+    reader.dispose()
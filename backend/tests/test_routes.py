@@ -2,9 +2,459 @@
 import os
 import pytest
 
+from backend.services.doctor_service import DoctorService
+
+
 @pytest.mark.skipif(
     os.getenv("RUN_API_TESTS") != "1",
     reason="Set RUN_API_TESTS=1 after you share your FastAPI app import path."
 )
 def test_placeholder_routes():
     assert True
+
+
+def _make_doctor(db):
+    return DoctorService().create_doctor(
+        db=db,
+        name="Dr. Bulk",
+        department="GENERAL",
+        shift_start="09:00",
+        shift_end="17:00",
+        status="AVAILABLE",
+    )
+
+
+def test_bulk_walkins_json_reports_per_row(client, app_db):
+    doctor = _make_doctor(app_db)
+    rows = [
+        {"patient_name": "A", "assigned_doctor_id": doctor["id"]},
+        {"patient_name": "", "assigned_doctor_id": doctor["id"]},
+        {"patient_name": "C", "assigned_doctor_id": doctor["id"], "priority": "critical"},
+    ]
+
+    res = client.post("/api/walkins/bulk", json=rows)
+    body = res.json()["data"]
+
+    assert res.status_code == 200
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [r["ok"] for r in body["results"]] == [True, False, True]
+
+    queue = client.get("/api/queue/", params={"doctor_id": doctor["id"]}).json()["data"]
+    assert [q["priority"] for q in queue] == [5, 3]
+    assert DoctorService().get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 2
+
+
+def test_bulk_walkins_csv(client, app_db):
+    doctor = _make_doctor(app_db)
+    csv_body = (
+        "patient_name,assigned_doctor_id,priority\n"
+        f"A,{doctor['id']},5\n"
+        f"B,{doctor['id']},\n"
+    )
+
+    res = client.post(
+        "/api/walkins/bulk",
+        content=csv_body,
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert res.json()["data"]["created"] == 2
+    assert [r["priority"] for r in res.json()["data"]["results"]] == [5, 3]
+
+
+def test_bulk_appointments_rejects_unknown_doctor(client, app_db):
+    doctor = _make_doctor(app_db)
+    base = {"patient_name": "A", "patient_phone": "1", "preferred_date": "2026-01-05"}
+    rows = [
+        {**base, "doctor_id": doctor["id"], "preferred_time": "10:30"},
+        {**base, "doctor_id": "nope"},
+        {**base, "doctor_id": doctor["id"], "preferred_date": "not-a-date"},
+    ]
+
+    body = client.post("/api/appointments/bulk", json=rows).json()["data"]
+
+    assert (body["created"], body["failed"]) == (1, 2)
+    assert body["results"][1]["error"] == "Invalid doctor_id"
+    assert DoctorService().get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 1
+
+    bad = client.post("/api/appointments/bulk", content="[1", headers={"Content-Type": "application/json"})
+    assert bad.status_code == 422 and bad.json()["success"] is False
+
+
+def test_dashboard_summary_counts_and_cache_invalidation(client, app_db):
+    doctor = _make_doctor(app_db)
+
+    first = client.get("/api/dashboard/summary").json()["data"]
+    assert first["doctors"] == {"total": 1, "available": 1}
+    assert first["counts"]["queue_waiting"] == 0
+
+    client.post("/api/walkins/", json={"patient_name": "A", "assigned_doctor_id": doctor["id"]})
+    client.post("/api/emergency/", json={"patient_name": "E", "assigned_doctor_id": doctor["id"]})
+
+    second = client.get("/api/dashboard/overview").json()["data"]
+    assert second["counts"] == {
+        "appointments_open": 0,
+        "walkins_waiting": 1,
+        "emergency_open": 1,
+        "queue_waiting": 1,
+    }
+
+    # Booked as SCHEDULED, stored lower case after a status update
+    base = {"patient_name": "P", "patient_phone": "1", "doctor_id": doctor["id"], "preferred_date": "2026-01-05"}
+    booked = client.post("/api/appointments/bulk", json=[base, base]).json()["data"]["results"]
+    client.patch(f"/api/appointments/{booked[0]['appointment_id']}/status", json={"status": "checked_in"})
+    assert client.get("/api/dashboard/summary").json()["data"]["counts"]["appointments_open"] == 2
+
+    # Lower-case status from the payload, and a row stored that way earlier
+    from backend.models.emergency import EmergencyCase
+
+    client.post("/api/emergency/", json={"patient_name": "F", "status": "open"})
+    app_db.add(EmergencyCase(patient_name="G", triage_level="URGENT", priority=3, status="open"))
+    app_db.commit()
+    assert client.get("/api/dashboard/summary").json()["data"]["counts"]["emergency_open"] == 3
+
+    from sqlalchemy import text
+    from backend.routes.dashboard import _SUMMARY_SQL
+
+    plan = " ".join(
+        str(row[-1]) for row in app_db.execute(text("EXPLAIN QUERY PLAN " + _SUMMARY_SQL.text), {"available": "AVAILABLE"})
+    )
+    for table in ("appointments", "walkins", "emergency_cases", "queue_items"):
+        assert f"SEARCH {table} USING COVERING INDEX" in plan
+
+
+def test_etag_read_interleaved_with_commit_is_not_pinned(client, app_db, monkeypatch):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from backend.core.config import settings
+    from backend.routes.dashboard import _summary_cache
+
+    monkeypatch.setattr(settings, "ETAG_WINDOW_SECONDS", 3600)
+    _summary_cache.clear()
+    bind = app_db.get_bind()
+    during = []
+
+    def read_mid_commit(conn):
+        # Writer has sent its rows but the DBAPI commit has not run yet
+        if not during:
+            during.append(client.get("/api/dashboard/summary"))
+
+    writer = Session(bind)
+    event.listen(bind, "commit", read_mid_commit)
+    try:
+        _make_doctor(writer)
+    finally:
+        event.remove(bind, "commit", read_mid_commit)
+        writer.close()
+
+    mid = during[0]
+    assert mid.json()["data"]["doctors"]["total"] == 0
+
+    after = client.get("/api/dashboard/summary", headers={"If-None-Match": mid.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["data"]["doctors"]["total"] == 1
+    assert after.headers["ETag"] != mid.headers["ETag"]
+
+
+def test_polling_endpoints_answer_304_while_unchanged(client, app_db, async_app_engine, monkeypatch):
+    from sqlalchemy import event
+    from backend.core.config import settings
+
+    monkeypatch.setattr(settings, "ETAG_WINDOW_SECONDS", 0)
+    doctor = _make_doctor(app_db)
+
+    for url in ("/api/availability", "/api/queue/", "/api/dashboard/summary", "/api/doctors/"):
+        first = client.get(url)
+        etag = first.headers["ETag"]
+
+        statements = []
+        listener = lambda *a: statements.append(a[2])
+        binds = (app_db.get_bind(), async_app_engine.sync_engine)
+        for bind in binds:
+            event.listen(bind, "before_cursor_execute", listener)
+        try:
+            again = client.get(url, headers={"If-None-Match": etag})
+        finally:
+            for bind in binds:
+                event.remove(bind, "before_cursor_execute", listener)
+
+        assert again.status_code == 304, url
+        assert statements == [], url
+
+    queue_etag = client.get("/api/queue/").headers["ETag"]
+    client.post("/api/walkins/", json={"patient_name": "A", "assigned_doctor_id": doctor["id"]})
+
+    after = client.get("/api/queue/", headers={"If-None-Match": queue_etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != queue_etag
+
+
+def test_etag_is_the_same_on_every_worker(monkeypatch):
+    import importlib
+    from backend.core.config import settings
+    from backend.utils import etag_utils
+
+    monkeypatch.setattr(settings, "ETAG_WINDOW_SECONDS", 0)
+    tag = etag_utils.make_etag(("doctors", "queue_items"), extra="x")
+    # A fresh import stands in for another worker process
+    assert importlib.reload(etag_utils).make_etag(("doctors", "queue_items"), extra="x") == tag
+
+
+def test_availability_304_skips_pending_resync(client, app_db, monkeypatch):
+    from sqlalchemy import event
+    from backend.core.config import settings
+    from backend.services.availability_index import availability_index
+
+    monkeypatch.setattr(settings, "ETAG_WINDOW_SECONDS", 0)
+    doctor = _make_doctor(app_db)
+    etag = client.get("/api/availability").headers["ETag"]
+
+    # Index due for its periodic resync: a conditional hit still reads nothing
+    monkeypatch.setattr(availability_index, "resync_seconds", 1e-9)
+    statements = []
+    listener = lambda *a: statements.append(a[2])
+    event.listen(app_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert client.get("/api/availability", headers={"If-None-Match": etag}).status_code == 304
+    finally:
+        event.remove(app_db.get_bind(), "before_cursor_execute", listener)
+    assert statements == []
+
+    # A roster change moves the tag before the index is rebuilt
+    client.patch(f"/api/doctors/{doctor['id']}", json={"shift_start": "20:00", "shift_end": "23:00"})
+    after = client.get("/api/availability", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json()["data"][0]["shift_start"] == "20:00"
+
+
+def test_queue_engine_loads_from_primary_not_lagging_replica(client, app_db, tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from backend.app import app
+    from backend.core.database import Base, get_read_db
+    from backend.services import queue_service
+
+    # Replica that has not caught up yet: schema only, no rows
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica_engine)
+    replica = Session(replica_engine)
+
+    item = queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1")
+    queue_service.queue_engine.invalidate()
+
+    app.dependency_overrides[get_read_db] = lambda: replica
+    try:
+        waiting = client.get("/api/queue/").json()["data"]
+        history = client.get("/api/queue/", params={"only_waiting": False}).json()["data"]
+    finally:
+        app.dependency_overrides[get_read_db] = lambda: app_db
+        replica.close()
+        replica_engine.dispose()
+
+    assert [q["id"] for q in waiting] == [item.id]
+    assert history == []
+
+
+def test_async_booking_and_status_keep_counter_in_sync(client, app_db):
+    doctor = _make_doctor(app_db)
+
+    booked = client.post(
+        "/api/appointments/book",
+        json={
+            "patient_name": "A",
+            "patient_phone": "1",
+            "doctor_id": doctor["id"],
+            "preferred_date": "2026-01-05",
+            "preferred_time": "10:30",
+        },
+    ).json()
+    appt_id = booked["appointment"]["id"]
+    assert DoctorService().get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 1
+
+    listed = client.get("/api/appointments/", params={"date": "2026-01-05"}).json()
+    assert [a["id"] for a in listed["appointments"]] == [appt_id]
+
+    client.patch(f"/api/appointments/{appt_id}/status", json={"status": "COMPLETED"})
+    client.patch(f"/api/appointments/{appt_id}/status", json={"status": "COMPLETED"})
+
+    assert client.get(f"/api/appointments/{appt_id}").json()["appointment"]["status"] == "completed"
+    assert client.get(f"/api/doctors/{doctor['id']}").json()["doctor"]["current_queue_length"] == 0
+
+
+def test_all_department_summaries_route(client, app_db):
+    _make_doctor(app_db)
+
+    from backend.core.config import settings
+
+    body = client.get("/api/doctors/departments/summary").json()
+
+    assert [d["department"] for d in body["departments"]] == list(settings.DEPARTMENTS)
+    assert sum(d["doctors_total"] for d in body["departments"]) == 1
+
+
+def test_all_workloads_match_per_doctor_endpoint(client, app_db):
+    a = _make_doctor(app_db)
+    b = _make_doctor(app_db)
+    client.post("/api/walkins/", json={"patient_name": "P1", "assigned_doctor_id": a["id"]})
+    client.post("/api/walkins/", json={"patient_name": "P2", "assigned_doctor_id": a["id"]})
+
+    grid = client.get("/api/doctors/workload").json()["workloads"]
+
+    assert {w["doctor_id"]: w["current_queue_length"] for w in grid} == {a["id"]: 2, b["id"]: 0}
+    for w in grid:
+        single = client.get(f"/api/doctors/{w['doctor_id']}/workload").json()["workload"]
+        assert w == single
+
+    client.post("/api/walkins/", json={"patient_name": "P3", "assigned_doctor_id": b["id"]})
+    grid = client.get("/api/doctors/workload").json()["workloads"]
+    assert {w["doctor_id"]: w["current_queue_length"] for w in grid}[b["id"]] == 1
+
+
+def test_availability_on_shift_filter(client, app_db):
+    service = DoctorService()
+    service.create_doctor(
+        db=app_db, name="Dr. Day", department="CARDIOLOGY",
+        shift_start="09:00", shift_end="17:00", status="AVAILABLE",
+    )
+    service.create_doctor(
+        db=app_db, name="Dr. Night", department="CARDIOLOGY",
+        shift_start="22:00", shift_end="06:00", status="AVAILABLE",
+    )
+    _make_doctor(app_db)
+
+    everyone = client.get("/api/availability").json()["data"]
+    assert [d["name"] for d in everyone] == ["Dr. Bulk", "Dr. Day", "Dr. Night"]
+
+    res = client.get("/api/availability?department=CARDIOLOGY&on_shift_only=true&at=23:30")
+    assert [d["name"] for d in res.json()["data"]] == ["Dr. Night"]
+
+    res = client.get("/api/availability?on_shift_only=true&at=10:00")
+    assert [d["name"] for d in res.json()["data"]] == ["Dr. Bulk", "Dr. Day"]
+
+    assert client.get("/api/availability?at=25:99").status_code == 422
+
+
+def test_ai_decide_batch_endpoint(client, tmp_path, monkeypatch):
+    from backend.ai_agent.agent import ai_agent
+    from backend.ai_agent.audit_log import AIAuditLogger, AuditConfig
+
+    monkeypatch.setattr(ai_agent, "audit", AIAuditLogger(AuditConfig(log_path=tmp_path / "ai.jsonl")))
+
+    res = client.post(
+        "/api/ai/decide/batch",
+        json={"observations": [{"patient_id": "a", "spo2": 85}, {"patient_id": "b", "spo2": 99}]},
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert body["count"] == 2
+    assert [d["priority"] for d in body["decisions"]] == ["critical", "low"]
+    ai_agent.audit.flush()
+    assert len((tmp_path / "ai.jsonl").read_text().splitlines()) == 2
+
+    metrics = client.get("/api/ai/metrics").json()["data"]
+    assert metrics["agent"]["decisions_total"] >= 2
+    assert metrics["audit"]["written"] >= 2 and metrics["audit"]["dropped"] == 0
+
+    bad = client.post("/api/ai/decide/batch", json={"observations": [{"spo2": 85}]})
+    assert bad.status_code == 422
+
+
+def test_ai_audit_stream_filters(client, tmp_path, monkeypatch):
+    import json
+    from datetime import datetime, timedelta, timezone
+    from backend.ai_agent.agent import ai_agent
+    from backend.ai_agent.audit_log import AIAuditLogger, AuditConfig
+
+    audit = AIAuditLogger(AuditConfig(log_path=tmp_path / "ai.jsonl", buffered=False, rotate_max_bytes=1500))
+    monkeypatch.setattr(ai_agent, "audit", audit)
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(40):
+        audit.write_event(
+            {
+                "type": "decision",
+                "decision_id": f"d{i}",
+                "patient_id": f"p{i % 4}",
+                "created_at": (start + timedelta(days=i)).isoformat(),
+                "priority": "critical" if i % 5 == 0 else "low",
+                "triggered_rules": ["CRIT_SPO2_LT_90"] if i % 5 == 0 else [],
+            }
+        )
+    audit.write_event({"type": "audit_log_error", "patient_id": "p0"})
+    audit.segments.wait_for_compression()
+    assert audit.segments.rotations >= 2
+
+    def ids(**params):
+        res = client.get("/api/ai-logs/audit", params=params)
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line)["decision_id"] for line in res.text.splitlines()]
+
+    assert ids() == [f"d{i}" for i in range(40)]
+    assert ids(priority="critical") == [f"d{i}" for i in range(0, 40, 5)]
+    assert ids(rule="CRIT_SPO2_LT_90", patient_id="p0") == ["d0", "d20"]
+    assert ids(patient_id="p1", since="2026-01-10T00:00:00", until="2026-01-30T00:00:00Z") == ["d9", "d13", "d17", "d21", "d25", "d29"]
+    assert ids(limit=3) == ["d0", "d1", "d2"]
+    assert client.get("/api/ai-logs/audit", params={"since": "2026-02-01T00:00:00", "until": "2026-01-01T00:00:00"}).status_code == 422
+    audit.close()
+
+
+def test_ai_logs_keyset_pages_and_filters(client, app_db):
+    from sqlalchemy import text
+
+    for i in range(25):
+        res = client.post(
+            "/api/ai-logs/",
+            json={"event_type": "walkin" if i % 2 else "emergency", "confidence": 50 + i},
+        )
+        assert res.status_code == 200
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/ai-logs/", params=params).json()
+        seen += [int(row["id"]) for row in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(seen, reverse=True) and len(seen) == 25
+
+    body = client.get(
+        "/api/ai-logs/decisions",
+        params={"event_type": "walkin", "min_confidence": 60, "max_confidence": 70, "limit": 3},
+    ).json()
+    assert [r["confidence"] for r in body["data"]] == [69, 67, 65]
+    assert body["next_cursor"] is not None
+
+    future = client.get("/api/ai-logs/", params={"since": "2999-01-01T00:00:00Z"}).json()
+    assert future["data"] == [] and future["next_cursor"] is None
+
+    # Rows exactly on the bounds, in both stored spellings
+    for event_type, created_at in (
+        ("at", "2026-01-01 10:00:00"),
+        ("at_orm", "2026-01-01 10:00:00.000000"),
+        ("before", "2026-01-01 09:59:59"),
+        ("after", "2026-01-01 10:00:00.500000"),
+    ):
+        app_db.execute(
+            text("INSERT INTO ai_decisions (event_type, confidence, created_at) VALUES (:t, 50, :c)"),
+            {"t": event_type, "c": created_at},
+        )
+    app_db.commit()
+
+    def window(**params):
+        body = client.get("/api/ai-logs/", params={"event_type": "at,at_orm,before,after", **params}).json()
+        return sorted(r["triggerEvent"] for r in body["data"])
+
+    assert window(since="2026-01-01T10:00:00Z") == ["after", "at", "at_orm"]
+    assert window(since="2026-01-01T11:00:00+01:00", until="2026-01-01T10:00:00") == ["at", "at_orm"]
+    assert window(since="2026-01-01T10:00:00.250Z") == ["after"]
+    assert window(until="2026-01-01T09:59:59Z") == ["before"]
+
+    plan = " ".join(
+        str(r[-1])
+        for r in app_db.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM ai_decisions WHERE event_type = 'walkin' AND id < 10 ORDER BY id DESC")
+        )
+    )
+    assert "ix_ai_decisions_event_type_id" in plan
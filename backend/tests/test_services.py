@@ -1,3 +1,510 @@
 # tests/test_services.py
+import pytest
+from sqlalchemy import select
+
+from backend.models.queue import QueueItem
+from backend.services import queue_service
+from backend.services.doctor_service import DoctorService
+from backend.services.intake_service import intake_walkin
+
+
 def test_placeholder_services():
     assert True
+
+
+def _sql_order(db, doctor_id=None):
+    stmt = select(QueueItem).where(QueueItem.status == "WAITING")
+    if doctor_id:
+        stmt = stmt.where(QueueItem.doctor_id == doctor_id)
+    stmt = stmt.order_by(
+        QueueItem.priority.desc(), QueueItem.position.asc(), QueueItem.id.asc()
+    )
+    return [q.id for q in db.execute(stmt).scalars().all()]
+
+
+def test_queue_engine_matches_sql_order(app_db, fresh_engine):
+    a = queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1", priority=3)
+    queue_service.enqueue(app_db, "walkin", 2, doctor_id="d1", priority=4)
+    queue_service.enqueue(app_db, "walkin", 3, doctor_id="d2", priority=3)
+    queue_service.emergency_jump(app_db, "emergency", 9, doctor_id="d1")
+    queue_service.enqueue(app_db, "walkin", 4, doctor_id="d1", priority=3)
+    queue_service.mark_in_progress(app_db, a.id)
+
+    for doctor_id in ("d1", "d2", None):
+        got = [e.id for e in queue_service.list_queue(app_db, doctor_id=doctor_id)]
+        assert got == _sql_order(app_db, doctor_id)
+
+
+def test_queue_engine_loads_existing_rows(app_db, fresh_engine):
+    app_db.add_all(
+        [
+            QueueItem(source_type="walkin", source_id=1, doctor_id="d1", priority=3, position=2, status="WAITING"),
+            QueueItem(source_type="walkin", source_id=2, doctor_id="d1", priority=3, position=1, status="WAITING"),
+            QueueItem(source_type="walkin", source_id=3, doctor_id="d1", priority=5, position=9, status="COMPLETED"),
+        ]
+    )
+    app_db.commit()
+
+    items = queue_service.list_queue(app_db, doctor_id="d1")
+    assert [e.source_id for e in items] == [2, 1]
+    assert fresh_engine.next_position("d1") == 3
+
+
+def test_completed_item_leaves_engine(app_db, fresh_engine):
+    item = queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1")
+    queue_service.complete_item(app_db, item.id)
+
+    assert queue_service.list_queue(app_db, doctor_id="d1") == []
+    assert fresh_engine.count("d1") == 0
+
+
+def test_emergency_jump_touches_only_new_row(app_db, fresh_engine):
+    first = queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1", priority=5)
+    queue_service.enqueue(app_db, "walkin", 2, doctor_id="d1", priority=3)
+    e1 = queue_service.emergency_jump(app_db, "emergency", 8, doctor_id="d1")
+    e2 = queue_service.emergency_jump(app_db, "emergency", 9, doctor_id="d1")
+
+    app_db.refresh(first)
+    assert first.position == 1  # untouched
+    assert e2.position < e1.position < first.position
+
+    order = [e.id for e in queue_service.list_queue(app_db, doctor_id="d1")]
+    assert order[:3] == [e2.id, e1.id, first.id]
+    assert order == _sql_order(app_db, "d1")
+
+
+def test_positions_come_from_db_not_stale_engine(app_db, fresh_engine):
+    queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1")
+    # Rows written by another worker: this engine has not seen them
+    app_db.add_all(
+        [
+            QueueItem(source_type="walkin", source_id=2, doctor_id="d1", priority=3, position=7, status="WAITING"),
+            QueueItem(source_type="emergency", source_id=3, doctor_id="d1", priority=5, position=-4, status="WAITING"),
+        ]
+    )
+    app_db.commit()
+
+    late = queue_service.enqueue(app_db, "walkin", 4, doctor_id="d1")
+    jump = queue_service.emergency_jump(app_db, "emergency", 5, doctor_id="d1")
+    assert (late.position, jump.position) == (8, -5)
+
+
+def test_compact_positions_keeps_order(app_db, fresh_engine):
+    queue_service.enqueue(app_db, "walkin", 1, doctor_id="d1", priority=3)
+    queue_service.emergency_jump(app_db, "emergency", 8, doctor_id="d1")
+    queue_service.emergency_jump(app_db, "emergency", 9, doctor_id="d1")
+    queue_service.enqueue(app_db, "walkin", 2, doctor_id="d2", priority=3)
+    before = {d: _sql_order(app_db, d) for d in ("d1", "d2")}
+
+    assert queue_service.compact_positions(app_db) == 3
+    for d in ("d1", "d2"):
+        assert _sql_order(app_db, d) == before[d]
+        assert [e.id for e in queue_service.list_queue(app_db, doctor_id=d)] == before[d]
+    positions = sorted(
+        q.position for q in app_db.execute(select(QueueItem).where(QueueItem.doctor_id == "d1")).scalars()
+    )
+    assert positions == [1, 2, 3]
+    assert queue_service.compact_positions(app_db) == 0
+
+
+def test_compact_positions_never_lowers_lane_max(app_db, fresh_engine):
+    from sqlalchemy import event, insert
+
+    app_db.add_all(
+        [
+            QueueItem(source_type="emergency", source_id=1, doctor_id="d1", priority=5, position=-1, status="WAITING"),
+            QueueItem(source_type="emergency", source_id=2, doctor_id="d1", priority=5, position=0, status="WAITING"),
+            QueueItem(source_type="walkin", source_id=3, doctor_id="d1", priority=3, position=10, status="WAITING"),
+        ]
+    )
+    app_db.commit()
+
+    # Another worker queues a walk-in between compaction's read and write
+    bind = app_db.get_bind()
+    fired = []
+
+    def late_enqueue(conn, cursor, statement, *args):
+        if not fired and statement.lstrip().startswith("SELECT queue_items.id"):
+            fired.append(True)
+            with bind.begin() as other:
+                other.execute(
+                    insert(QueueItem).values(
+                        source_type="walkin", source_id=4, doctor_id="d1", priority=3, position=11, status="WAITING"
+                    )
+                )
+
+    event.listen(bind, "after_cursor_execute", late_enqueue)
+    try:
+        assert queue_service.compact_positions(app_db) == 0
+    finally:
+        event.remove(bind, "after_cursor_execute", late_enqueue)
+
+    assert queue_service.compact_positions(app_db) == 2
+    positions = [q.position for q in app_db.execute(select(QueueItem).order_by(QueueItem.id)).scalars()]
+    assert positions == [8, 9, 10, 11]
+    assert queue_service.enqueue(app_db, "walkin", 5, doctor_id="d1").position == 12
+
+
+def _make_doctor(db, name="Dr. Test", department="GENERAL"):
+    return DoctorService().create_doctor(
+        db=db,
+        name=name,
+        department=department,
+        shift_start="09:00",
+        shift_end="17:00",
+        status="AVAILABLE",
+    )
+
+
+def test_decision_engine_uses_shared_availability_index(app_db, fresh_engine, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from backend.ai_agent.decision_logic import DecisionEngine
+    from backend.services.availability_index import availability_index
+
+    monkeypatch.setattr(availability_index, "session_factory", sessionmaker(bind=app_db.get_bind()))
+    engine = DecisionEngine()
+    service = DoctorService()
+    a = _make_doctor(app_db, "Dr. A")
+    b = _make_doctor(app_db, "Dr. B")
+    patient = {"department": "GENERAL"}
+
+    state = {}
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == a["id"]
+    assert engine.detect_overload(state) == {"is_overloaded": False}
+    loads = availability_index.loads()
+
+    # committed counter changes reach the live index without a rebuild
+    service.update_queue_length(app_db, a["id"], 2)
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == a["id"]
+    app_db.commit()
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == b["id"]
+    service.update_queue_length(app_db, a["id"], -2)
+    app_db.commit()
+    assert engine.assign_appointment(state, patient, "10:00")["assigned_doctor_id"] == a["id"]
+    service.update_queue_length(app_db, a["id"], 5)
+    app_db.rollback()
+    assert availability_index.loads() is loads
+    assert loads.load(a["id"]) == 0
+
+    # a shift write rebuilds it
+    service.update_doctor(app_db, b["id"], shift_start="20:00", shift_end="23:00")
+    service.update_doctor(app_db, a["id"], shift_start="20:00", shift_end="23:00")
+    assert engine.assign_appointment(state, patient, "10:00")["status"] == "NO_DOCTOR_AVAILABLE"
+    walkin = engine.process_walkin(state, {**patient, "arrival_time": "21:00"}, "NORMAL")
+    assert walkin["assigned_doctor_id"] == a["id"]
+    assert availability_index.loads() is not loads
+    assert state == {}
+
+
+def test_update_queue_length_is_clamped_at_zero(app_db):
+    service = DoctorService()
+    doctor = _make_doctor(app_db)
+
+    service.update_queue_length(app_db, doctor["id"], 2)
+    service.update_queue_length(app_db, doctor["id"], -5)
+    app_db.commit()
+
+    assert service.get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 0
+
+
+def test_reconcile_queue_lengths_repairs_drift(app_db, fresh_engine):
+    service = DoctorService()
+    doctor = _make_doctor(app_db)
+    queue_service.enqueue(app_db, "walkin", 1, doctor_id=doctor["id"])
+    queue_service.enqueue(app_db, "walkin", 2, doctor_id=doctor["id"])
+    service.update_queue_length(app_db, doctor["id"], 7)
+    app_db.commit()
+
+    assert service.reconcile_queue_lengths(app_db) == 1
+    assert service.get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 2
+    assert service.reconcile_queue_lengths(app_db) == 0
+
+
+def test_reconcile_counts_appointments_and_emergencies(app_db, fresh_engine):
+    from datetime import datetime
+    from backend.services import appointment_service, emergency_service
+
+    service = DoctorService()
+    doctor = _make_doctor(app_db)
+    booked = appointment_service.create_appointments_bulk(
+        app_db,
+        [
+            {"patient_name": f"P{i}", "doctor_id": doctor["id"], "scheduled_at": datetime(2026, 1, 10, 9), "status": "SCHEDULED"}
+            for i in range(2)
+        ],
+    )
+    intake_walkin(app_db, {"patient_name": "Ravi", "assigned_doctor_id": doctor["id"]})
+    emergency_service.create_emergency(app_db, {"patient_name": "E", "assigned_doctor_id": doctor["id"]})
+
+    def length():
+        return service.get_doctor_by_id(app_db, doctor["id"])["current_queue_length"]
+
+    assert length() == 4
+    assert service.reconcile_queue_lengths(app_db) == 0
+    assert length() == 4
+
+    service.update_queue_length(app_db, doctor["id"], -3)
+    app_db.commit()
+    assert service.reconcile_queue_lengths(app_db) == 1
+    assert length() == 4
+
+    appointment_service.update_status(app_db, booked[0]["appointment_id"], "completed")
+    app_db.commit()
+    assert length() == 3
+    assert service.reconcile_queue_lengths(app_db) == 0
+
+
+def test_completed_walkin_stays_out_of_reconciled_count(app_db, fresh_engine):
+    from backend.services import walkin_service
+
+    service = DoctorService()
+    doctor = _make_doctor(app_db)
+    fresh_engine.ensure_loaded(app_db)
+    walkin = intake_walkin(app_db, {"patient_name": "Ravi", "assigned_doctor_id": doctor["id"]})
+
+    walkin_service.update_status(app_db, walkin["walkin_id"], "completed")
+    assert service.get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 0
+    item = app_db.get(QueueItem, walkin["queue_item_id"])
+    app_db.refresh(item)
+    assert item.status == "COMPLETED"
+    assert fresh_engine.count(doctor["id"]) == 0
+
+    assert service.reconcile_queue_lengths(app_db) == 0
+    assert service.get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 0
+
+
+def test_intake_walkin_is_single_transaction(app_db, fresh_engine):
+    doctor = _make_doctor(app_db)
+
+    result = intake_walkin(
+        app_db,
+        {"patient_name": "Ravi", "assigned_doctor_id": doctor["id"], "priority": "high"},
+    )
+
+    item = app_db.get(QueueItem, result["queue_item_id"])
+    assert item.source_type == "walkin" and item.source_id == result["walkin_id"]
+    assert item.priority == 4 and item.position == 1
+    assert DoctorService().get_doctor_by_id(app_db, doctor["id"])["current_queue_length"] == 1
+    assert [e.id for e in queue_service.list_queue(app_db, doctor_id=doctor["id"])] == [item.id]
+
+
+def test_bulk_intake_positions_follow_db_rows(app_db, fresh_engine):
+    from backend.services.intake_service import intake_walkins_bulk
+
+    queue_service.list_queue(app_db)  # engine loaded (and then goes stale)
+    app_db.add(QueueItem(source_type="walkin", source_id=1, doctor_id="d1", priority=3, position=5, status="WAITING"))
+    app_db.commit()
+
+    out = intake_walkins_bulk(
+        app_db,
+        [
+            {"patient_name": "A", "assigned_doctor_id": "d1"},
+            {"patient_name": "B"},
+            {"patient_name": "C", "assigned_doctor_id": "d1"},
+        ],
+    )
+    assert [(r["doctor_id"], r["position"]) for r in out] == [("d1", 6), (None, 1), ("d1", 7)]
+
+
+def test_intake_walkin_rolls_back_on_failure(app_db, fresh_engine, monkeypatch):
+    from backend.models.walkin import WalkIn
+    from backend.services import intake_service
+
+    def boom(**kwargs):
+        raise RuntimeError("counter failed")
+
+    monkeypatch.setattr(intake_service.doctor_service, "update_queue_length", boom)
+
+    with pytest.raises(RuntimeError):
+        intake_walkin(app_db, {"patient_name": "Ravi", "assigned_doctor_id": "d1"})
+
+    assert app_db.execute(select(WalkIn)).first() is None
+    assert app_db.execute(select(QueueItem)).first() is None
+
+
+def test_broadcaster_delivers_committed_changes_only(app_db):
+    import asyncio
+    import threading
+
+    from backend.core.events import broadcaster
+
+    doctor = _make_doctor(app_db)
+
+    async def scenario():
+        sub = broadcaster.subscribe(topics=["queue", "doctor"])
+        try:
+            DoctorService().update_queue_length(app_db, doctor["id"], 1)
+            app_db.rollback()
+
+            t = threading.Thread(target=queue_service.enqueue, args=(app_db, "walkin", 1, "d1"))
+            t.start()
+            await asyncio.to_thread(t.join)
+
+            broadcaster.publish("walkin.created", {"ignored": True})
+            evt = await asyncio.wait_for(sub.queue.get(), timeout=2)
+            return evt, sub.queue.qsize()
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    evt, remaining = asyncio.run(scenario())
+    assert evt["type"] == "queue.upsert"
+    assert evt["data"]["doctor_id"] == "d1"
+    assert remaining == 0
+
+
+def test_data_versions_bump_only_after_commit(app_db):
+    from sqlalchemy import event
+    from backend.core import data_versions
+
+    bind = app_db.get_bind()
+    before = data_versions.version("doctors")
+    seen_during_commit = []
+    listener = lambda conn: seen_during_commit.append(data_versions.version("doctors"))
+    event.listen(bind, "commit", listener)
+    try:
+        _make_doctor(app_db)
+    finally:
+        event.remove(bind, "commit", listener)
+
+    # The engine "commit" event runs before the DBAPI commit
+    assert seen_during_commit == [before]
+    assert data_versions.version("doctors") > before
+
+    app_db.execute(QueueItem.__table__.insert().values(source_type="walkin", source_id=1, position=1, status="WAITING"))
+    queue_before = data_versions.version("queue_items")
+    app_db.rollback()
+    assert data_versions.version("queue_items") == queue_before
+
+
+def test_async_doctor_service_matches_sync(app_db, async_app_engine):
+    import asyncio
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from backend.services.doctor_service import AsyncDoctorService
+
+    doctor = _make_doctor(app_db)
+    service = DoctorService()
+
+    async def run():
+        async with AsyncSession(async_app_engine) as db:
+            svc = AsyncDoctorService()
+            return (
+                await svc.get_doctors(db),
+                await svc.get_doctor_workload(db, doctor["id"]),
+                await svc.get_statistics(db),
+            )
+
+    doctors, workload, stats = asyncio.run(run())
+
+    assert doctors == service.get_doctors(app_db)
+    assert workload == service.get_doctor_workload(app_db, doctor["id"])
+    assert stats == service.get_statistics(app_db)
+
+
+def test_doctor_not_found_releases_the_write_transaction(app_db, async_app_engine):
+    import asyncio
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from backend.services.doctor_service import AsyncDoctorService
+
+    service = DoctorService()
+    doctor = _make_doctor(app_db)
+
+    assert service.update_doctor(app_db, "missing", name="X") is None
+    assert not app_db.in_transaction()
+    assert service.delete_doctor(app_db, "missing") is False
+    assert not app_db.in_transaction()
+
+    # the same session keeps working, and nothing else lands with its commit
+    assert service.update_doctor(app_db, doctor["id"], name="Dr. Renamed")["name"] == "Dr. Renamed"
+    with sessionmaker(bind=app_db.get_bind())() as other:
+        assert service.get_doctor_by_id(other, doctor["id"])["name"] == "Dr. Renamed"
+
+    async def run():
+        async with AsyncSession(async_app_engine) as db:
+            svc = AsyncDoctorService()
+            results = [await svc.update_doctor(db, "missing", name="X"), db.in_transaction()]
+            results += [await svc.delete_doctor(db, "missing"), db.in_transaction()]
+            results.append((await svc.update_doctor(db, doctor["id"], name="Dr. Async"))["name"])
+            return results
+
+    assert asyncio.run(run()) == [None, False, False, False, "Dr. Async"]
+    assert service.get_doctor_by_id(app_db, doctor["id"])["name"] == "Dr. Async"
+
+
+def test_doctor_service_rows_match_raw_sql_shape(app_db):
+    from sqlalchemy import text
+
+    doctor = _make_doctor(app_db)
+    service = DoctorService()
+
+    updated = service.update_doctor(app_db, doctor["id"], name="Dr. Renamed", status="ON_LEAVE")
+    raw = dict(
+        app_db.execute(text("SELECT * FROM doctors WHERE id = :id"), {"id": doctor["id"]})
+        .mappings()
+        .one()
+    )
+
+    assert {k: updated[k] for k in raw} == raw
+    assert updated["name"] == "Dr. Renamed" and updated["is_available"] == 0
+    assert service.update_doctor(app_db, doctor["id"]) == updated
+
+    assert service.delete_doctor(app_db, doctor["id"]) is True
+    assert service.get_doctor_by_id(app_db, doctor["id"]) is None
+    assert service.delete_doctor(app_db, doctor["id"]) is False
+
+
+def test_department_summaries_single_pass(app_db):
+    service = DoctorService()
+    a = _make_doctor(app_db, name="A", department="GENERAL")
+    _make_doctor(app_db, name="B", department="GENERAL")
+    service.update_doctor(app_db, a["id"], status="ON_LEAVE")
+    service.update_queue_length(app_db, a["id"], 12)
+    app_db.commit()
+
+    general = service.get_department_summary(app_db, "GENERAL")
+    assert general == {
+        "department": "GENERAL",
+        "doctors_total": 2,
+        "doctors_available": 1,
+        "doctors_overloaded": 1,
+        "average_queue_length": 6.0,
+        "queue_threshold": 10,
+    }
+
+    everything = {
+        s["department"]: s
+        for s in service.get_all_department_summaries(app_db, departments=["DENTAL"])
+    }
+    assert everything["GENERAL"] == general
+    assert everything["DENTAL"] == service.get_department_summary(app_db, "DENTAL")
+    assert everything["DENTAL"]["doctors_total"] == 0
+
+    assert service.get_statistics(app_db) == {
+        "doctors": {"total": 2, "available": 1, "on_leave": 1},
+        "queue": {"waiting": 0},
+    }
+
+
+def test_doctor_mutations_are_single_statements(app_db):
+    from sqlalchemy import event
+
+    service = DoctorService()
+    statements = []
+    listener = lambda *a: statements.append(a[2].split()[0].upper())
+    event.listen(app_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        doctor = _make_doctor(app_db)
+        assert statements == ["INSERT"]
+
+        statements.clear()
+        assert service.update_doctor(app_db, doctor["id"], shift_end="18:00")["shift_end"] == "18:00"
+        assert statements == ["UPDATE"]
+
+        statements.clear()
+        assert service.delete_doctor(app_db, doctor["id"]) is True
+        assert statements == ["UPDATE"]
+    finally:
+        event.remove(app_db.get_bind(), "before_cursor_execute", listener)
+
+    assert service.update_doctor(app_db, doctor["id"], name="Ghost") is None
+    assert service.delete_doctor(app_db, doctor["id"]) is False
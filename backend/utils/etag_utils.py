@@ -0,0 +1,65 @@
+# backend/utils/etag_utils.py
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Optional, Sequence
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from backend.core import data_versions
+from backend.core.config import settings
+
+def make_etag(tables: Sequence[str], extra: str = "") -> str:
+    """
+    Strong ETag from the write versions of the given tables
+    (plus `extra`, for responses that also depend on something else).
+
+    Versions only move once a commit has returned (core.data_versions),
+    so a tag never pairs a new version with pre-commit data.
+    Nothing process-specific goes in: versions are last-write timestamps,
+    so every worker that saw the same writes issues the same tag and a
+    client switching workers still gets 304s. A worker does not see
+    writes handled by another one, so the tag also rolls over every
+    ETAG_WINDOW_SECONDS; that bounds how long it can answer 304 after
+    such a write.
+    """
+    window = int(getattr(settings, "ETAG_WINDOW_SECONDS", 0) or 0)
+    bucket = int(time.time() // window) if window > 0 else 0
+    raw = f"{','.join(tables)}|{data_versions.versions(tables)}|{bucket}|{extra}"
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        c = candidate.strip()
+        if c == "*":
+            return True
+        if c.startswith("W/"):
+            c = c[2:]
+        if c == etag:
+            return True
+    return False
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    tables: Sequence[str],
+    extra: str = "",
+) -> Optional[Response]:
+    """
+    Set ETag on the outgoing response.
+    Returns a ready 304 response if the client's copy is current
+    (caller returns it immediately, before touching the database).
+    """
+    etag = make_etag(tables, extra)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,60 @@
+# backend/utils/import_utils.py
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def parse_import_rows(body: bytes, content_type: str | None = None) -> List[Dict[str, Any]]:
+    """
+    Parse a bulk-import payload into a list of row dicts.
+
+    Accepts:
+      - JSON array of objects (default)
+      - JSON object with a "rows" array
+      - CSV with a header line (Content-Type: text/csv)
+        -> empty cells become None
+
+    Raises ValueError on malformed input.
+    """
+    ctype = (content_type or "").split(";")[0].strip().lower()
+    text = body.decode("utf-8-sig")
+
+    if ctype in ("text/csv", "application/csv"):
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise ValueError("csv header row is required")
+        return [
+            {
+                str(k).strip(): (v.strip() if isinstance(v, str) and v.strip() else None)
+                for k, v in row.items()
+                if k is not None
+            }
+            for row in reader
+        ]
+
+    try:
+        data = json.loads(text or "null")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid json: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("rows")
+
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON array of rows")
+
+    if not all(isinstance(r, dict) for r in data):
+        raise ValueError("every row must be a JSON object")
+
+    return data
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    size = max(1, int(size))
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
@@ -0,0 +1,104 @@
+# scripts/bench_doctor_service.py
+"""
+Micro-benchmark: per-call overhead of DoctorService reads.
+
+Compares the previous raw text() + RowMapping approach (inlined below as
+the baseline) against the current Core statements on an in-memory SQLite
+database, so the numbers are dominated by Python-side overhead.
+
+    python -m scripts.bench_doctor_service [--doctors 50] [--calls 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.database import Base, _import_models
+from backend.services.doctor_service import DoctorService, _with_workload
+
+
+def _legacy_get_doctors(db, department=None):
+    query = "SELECT * FROM doctors WHERE deleted_at IS NULL"
+    params = {}
+    if department:
+        query += " AND department = :department"
+        params["department"] = department
+    query += " ORDER BY name"
+    rows = db.execute(text(query), params).mappings().all()
+    return [_with_workload(dict(r)) for r in rows]
+
+
+def _legacy_get_doctor_by_id(db, doctor_id):
+    row = db.execute(
+        text("SELECT * FROM doctors WHERE id = :id AND deleted_at IS NULL"),
+        {"id": doctor_id},
+    ).mappings().first()
+    return _with_workload(dict(row)) if row else None
+
+
+def _per_call_us(fn, calls: int) -> float:
+    fn()  # warm the compiled cache
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    _import_models()
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    service = DoctorService()
+    ids = [
+        service.create_doctor(
+            db,
+            name=f"Dr. {i:03d}",
+            department="GENERAL" if i % 2 else "CARDIOLOGY",
+            shift_start="09:00",
+            shift_end="17:00",
+            status="AVAILABLE",
+        )["id"]
+        for i in range(args.doctors)
+    ]
+
+    cases = [
+        (
+            "get_doctors(department)",
+            lambda: _legacy_get_doctors(db, "GENERAL"),
+            lambda: service.get_doctors(db, department="GENERAL"),
+        ),
+        (
+            "get_doctor_by_id",
+            lambda: _legacy_get_doctor_by_id(db, ids[0]),
+            lambda: service.get_doctor_by_id(db, ids[0]),
+        ),
+    ]
+
+    print(f"{'call':<28}{'text() us':>12}{'core us':>12}{'ratio':>8}")
+    for name, legacy, current in cases:
+        before = _per_call_us(legacy, args.calls)
+        after = _per_call_us(current, args.calls)
+        print(f"{name:<28}{before:>12.1f}{after:>12.1f}{before / after:>8.2f}")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()